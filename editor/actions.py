@@ -34,7 +34,6 @@ class AddRemoveBase(Edit):
             self.obj.remove_edge(edge)
         for node in self.tweak.nodes:
             self.obj.remove_node(node)
-        self.obj.update()
         return self.flags
 
     def add(self):
@@ -44,7 +43,6 @@ class AddRemoveBase(Edit):
             self.obj.add_edge(edge, **self.tweak.edge_attrs.get(edge, {}))
         for face in self.tweak.faces:
             self.obj.add_face(face, **self.tweak.face_attrs.get(face, {}))
-        self.obj.update()
         return self.flags
 
 
@@ -1,15 +1,19 @@
 import logging
 import subprocess
+import threading
 import time
 from abc import abstractmethod, ABCMeta
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Type
+from typing import Any, Callable, Type
 
+import numpy as np
 from PySide6.QtGui import QIcon, QImage, QPixmap
 
 from applicationframework.mixins import HasAppMixin
 from editor.graph import Graph
+from editor.lazymapping import LazyMapping
+from editor.texturecache import TextureCache
 
 # noinspection PyUnresolvedReferences
 from __feature__ import snake_case
@@ -18,6 +22,33 @@ from __feature__ import snake_case
 logger = logging.getLogger(__name__)
 
 
+ICON_SIZE = 32
+MAX_CACHED_PIXMAPS = 256
+MAX_CACHED_ICONS = 1024
+
+
+class LoadCancelled(Exception):
+
+    """Raised from build_textures when the load has been cancelled."""
+
+
+def report_progress(
+    num_done: int,
+    total: int,
+    cancel_event: threading.Event | None = None,
+    progress: Callable[[int, int], None] | None = None,
+):
+    """
+    Report the number of textures decoded so far. Called between textures so
+    a cancelled load stops without decoding the rest.
+
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise LoadCancelled()
+    if progress is not None:
+        progress(num_done, total)
+
+
 @dataclass
 class AdaptorSettingsBase:
 
@@ -43,10 +74,13 @@ class AdaptorBase(HasAppMixin, metaclass=ABCMeta):
         # settings and they would be updated via an event.
         self._settings = self.settings_cls()
 
+        # Images, pixmaps and icons are only built when first accessed as a
+        # session typically uses a handful of the available textures.
         self.textures = {}
-        self.images = {}
-        self.pixmaps = {}
-        self.icons = {}
+        self.images = LazyMapping(self.textures, self.build_image)
+        self.pixmaps = LazyMapping(self.textures, self.build_pixmap, MAX_CACHED_PIXMAPS)
+        self.icons = LazyMapping(self.textures, self.build_icon, MAX_CACHED_ICONS)
+        self.texture_cache = TextureCache()
 
     @property
     @abstractmethod
@@ -67,34 +101,90 @@ class AdaptorBase(HasAppMixin, metaclass=ABCMeta):
     def settings(self) -> AdaptorSettingsBase:
         return self._settings
 
+    @property
+    def source_paths(self) -> tuple[str, ...]:
+        """
+        Files the textures are decoded from. Textures are cached against a hash
+        of their contents, so return an empty tuple to disable caching.
+
+        """
+        return ()
+
     @abstractmethod
-    def build_textures(self):
+    def build_textures(
+        self,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[Any, np.ndarray]:
+        """
+        Decode and return all textures. May be called from a worker thread so
+        must not touch any Qt GUI objects or adaptor state. Implementations
+        should call report_progress after each texture.
+
+        """
         ...
 
-    def build_images(self):
-        for id_, texture in self.textures.items():
-            img = QImage(texture, texture.shape[1], texture.shape[0], 3 * texture.shape[1], QImage.Format_RGB888)
-            self.images[id_] = img
+    def load_textures(
+        self,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[Any, np.ndarray]:
+        """
+        Load textures from the cache if possible, otherwise decode them and
+        populate the cache. Safe to call from a worker thread. Raises
+        LoadCancelled if the cancel event is set part way through.
+
+        """
+        key = None
+        if self.source_paths:
+            try:
+                key = self.texture_cache.get_key(self.name, self.source_paths)
+            except OSError:
+                pass
+        if key is not None:
+            textures = self.texture_cache.load(key)
+            if textures is not None:
+                logger.info(f'Loaded {len(textures)} textures from cache')
+                return textures
+
+        textures = self.build_textures(cancel_event, progress)
+        if key is not None and textures:
+            try:
+                self.texture_cache.save(key, textures)
+            except OSError as e:
+                logger.warning('Cannot save texture cache')
+                logger.exception(e)
+        return textures
+
+    def set_textures(self, textures: dict[Any, np.ndarray]):
+        """
+        Swap in newly loaded textures, discarding any images, pixmaps and icons
+        built from the old ones. Must be called from the GUI thread.
+
+        """
+        self.textures.clear()
+        self.images.clear()
+        self.pixmaps.clear()
+        self.icons.clear()
+        self.textures.update(textures)
+
+    def build_image(self, id_) -> QImage:
+        texture = self.textures[id_]
+        return QImage(texture, texture.shape[1], texture.shape[0], 3 * texture.shape[1], QImage.Format_RGB888)
 
-    def build_pixmaps(self):
-        for id_, img in self.images.items():
-            self.pixmaps[id_] = QPixmap.from_image(img)
+    def build_pixmap(self, id_) -> QPixmap:
+        return QPixmap.from_image(self.images[id_])
 
-    def build_icons(self):
-        for id_, pixmap in self.pixmaps.items():
-            self.icons[id_] = QIcon(pixmap.scaled(32, 32))
+    def build_icon(self, id_) -> QIcon:
+
+        # Scale the image rather than the pixmap so building an icon doesn't
+        # churn the pixmap cache.
+        return QIcon(QPixmap.from_image(self.images[id_].scaled(ICON_SIZE, ICON_SIZE)))
 
     def build_resources(self):
         logger.info('Rebuilding adaptor resources...')
         start = time.time()
-        self.textures.clear()
-        self.images.clear()
-        self.pixmaps.clear()
-        self.icons.clear()
-        self.build_textures()
-        self.build_images()
-        self.build_pixmaps()
-        self.build_icons()
+        self.set_textures(self.load_textures())
         logger.info(f'Rebuilt adaptor resources in : {time.time() - start}')
 
     @abstractmethod
@@ -1,12 +1,14 @@
 import logging
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Type
+from typing import Any, Callable, Type
 
+import numpy as np
 from gameengines.build.grp import Grp
 from gameengines.build.palette import Palette
 
-from editor.adaptors.base import AdaptorBase, AdaptorSettingsBase
+from editor.adaptors.base import AdaptorBase, AdaptorSettingsBase, report_progress
 from editor.constants import MapFormat
 from editor.graph import Graph
 from editor.mapio import build
@@ -61,14 +63,22 @@ class DukeAdaptor(AdaptorBase):
     def subprocess_args(self):
         return ['-map', 'out.map']
 
-    def build_textures(self):
+    @property
+    def source_paths(self) -> tuple[str, ...]:
+        return (self.settings.grp_path, self.settings.palette_path)
+
+    def build_textures(
+        self,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[Any, np.ndarray]:
         try:
             grp = Grp()
             grp.load(self.settings.grp_path)
         except Exception as e:
             logger.error(f'Cannot load group: {self.settings.grp_path}')
             logger.exception(e)
-            return
+            return {}
 
         try:
             palette = Palette()
@@ -76,11 +86,15 @@ class DukeAdaptor(AdaptorBase):
         except Exception as e:
             logger.error(f'Cannot load palette: {self.settings.palette_path}')
             logger.exception(e)
-            return
+            return {}
 
+        textures = {}
+        num_textures = len(grp.textures)
         for i, texture in enumerate(grp.textures):
-            self.textures[i] = palette.data[texture]
+            textures[i] = palette.data[texture]
             logger.debug(f'Loaded build texture: {i}')
+            report_progress(i + 1, num_textures, cancel_event, progress)
+        return textures
 
 
 class BloodAdaptor(AdaptorBase):
@@ -110,14 +124,22 @@ class BloodAdaptor(AdaptorBase):
     def subprocess_args(self):
         return ['-map', 'out.map']
 
-    def build_textures(self):
+    @property
+    def source_paths(self) -> tuple[str, ...]:
+        return (self.settings.grp_path, self.settings.palette_path)
+
+    def build_textures(
+        self,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[Any, np.ndarray]:
         try:
             grp = Grp()
             grp.load(self.settings.grp_path)
         except Exception as e:
             logger.error(f'Cannot load group: {self.settings.grp_path}')
             logger.exception(e)
-            return
+            return {}
 
         try:
             palette = Palette()
@@ -125,8 +147,12 @@ class BloodAdaptor(AdaptorBase):
         except Exception as e:
             logger.error(f'Cannot load palette: {self.settings.palette_path}')
             logger.exception(e)
-            return
+            return {}
 
+        textures = {}
+        num_textures = len(grp.textures)
         for i, texture in enumerate(grp.textures):
-            self.textures[i] = palette.data[texture]
+            textures[i] = palette.data[texture]
             logger.debug(f'Loaded build texture: {i}')
+            report_progress(i + 1, num_textures, cancel_event, progress)
+        return textures
@@ -1,13 +1,15 @@
 import logging
+import struct
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Type
+from typing import Any, Callable, Iterable, Type
 
 import numpy as np
 import omg
 from omg.txdef import Textures
 
-from editor.adaptors.base import AdaptorBase, AdaptorSettingsBase
+from editor.adaptors.base import AdaptorBase, AdaptorSettingsBase, report_progress
 from editor.constants import MapFormat
 from editor.graph import Graph
 from editor.mapio import doom
@@ -28,6 +30,59 @@ class DoomAdaptorSettings(AdaptorSettingsBase):
     doom_wad_path: str = 'DOOM.WAD'
 
 
+def decode_patch(data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a Doom format picture into palette indices and an opacity mask.
+    Each post is copied into the column as a single slice rather than pixel by
+    pixel.
+
+    """
+    width, height = struct.unpack_from('<hh', data, 0)
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    indices = np.zeros((height, width), dtype=np.uint8)
+    mask = np.zeros((height, width), dtype=bool)
+    pointers = struct.unpack_from(f'<{width}i', data, 8)
+    size = len(data)
+    for x, pointer in enumerate(pointers):
+        y = -1
+        while 0 <= pointer < size - 1 and data[pointer] != 0xff:
+
+            # Offsets less than the current row are relative for tall patches.
+            offset = data[pointer]
+            y = y + offset if offset <= y else offset
+            length = data[pointer + 1]
+            start = pointer + 3
+            post = buffer[start:start + length]
+            end = min(y + len(post), height)
+            if end > y:
+                indices[y:end, x] = post[:end - y]
+                mask[y:end, x] = True
+            pointer = start + length + 1
+    return indices, mask
+
+
+def composite_texture(
+    width: int,
+    height: int,
+    patches: Iterable[tuple[int, int, np.ndarray, np.ndarray]],
+) -> np.ndarray:
+    """
+    Blit each (x, y, indices, mask) patch into a texture, clipped to the edges
+    of the canvas. Only the opaque pixels of each patch are copied.
+
+    """
+    canvas = np.zeros((height, width), dtype=np.uint8)
+    for x, y, indices, mask in patches:
+        h, w = indices.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, width), min(y + h, height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        src = np.s_[y0 - y:y1 - y, x0 - x:x1 - x]
+        np.copyto(canvas[y0:y1, x0:x1], indices[src], where=mask[src])
+    return canvas
+
+
 class DoomAdaptor(AdaptorBase):
 
     @property
@@ -53,45 +108,60 @@ class DoomAdaptor(AdaptorBase):
     def subprocess_args(self):
         return ['-iwad', "DOOM.WAD", '-file', 'out.wad', '+map', 'MAP01']
 
-    def _build_flats(self, wad: omg.WAD, palette: np.ndarray):
-        for name, flat in wad.flats.items():
-            indices = np.array([p if p is not None else 0 for p in flat.to_raw()], dtype=np.uint8)
-            w, h = flat.get_dimensions()
-            self.textures[name] = palette[indices].reshape((h, w, 3))
-            logger.debug(f'Loaded doom flat: {name}')
-
-    def _build_txdefs(self, wad: omg.WAD, palette: np.ndarray):
-        for name, texture in Textures(wad.txdefs).items():
-            indices = np.zeros((texture.height, texture.width), dtype=np.uint8)
-            for patch_def in texture.patches:
-                patch = wad.patches[patch_def.name]
-                patch_indices = np.array([p if p is not None else 0 for p in patch.to_pixels()], dtype=np.uint8)
-                patch_indices.shape = (patch.height, patch.width)
-
-                # Blit the patch into the texture, making sure we don't attempt
-                # to blit past the edge of the canvas.
-                x_offset = patch_def.x
-                y_offset = patch_def.y
-                w = patch_indices.shape[1]
-                h = patch_indices.shape[0]
-                space_x = min(w, indices.shape[1] - x_offset)
-                space_y = min(h, indices.shape[0] - y_offset)
-                try:
-                    indices[y_offset:min(y_offset + h, indices.shape[0]), x_offset:min(x_offset + w, indices.shape[1])] = patch_indices[0:space_y, 0:space_x]
-                except Exception as e:
-                    print(e)
+    def _build_flat(self, flat, palette: np.ndarray) -> np.ndarray:
+        w, h = flat.get_dimensions()
+        indices = np.frombuffer(flat.data, dtype=np.uint8, count=w * h).reshape((h, w))
+        return palette[indices]
+
+    def _build_txdef(
+        self,
+        wad: omg.WAD,
+        texture,
+        palette: np.ndarray,
+        patches: dict[str, tuple[np.ndarray, np.ndarray]],
+    ) -> np.ndarray:
+        placed_patches = []
+        for patch_def in texture.patches:
+            if patch_def.name not in patches:
+                if patch_def.name not in wad.patches:
+                    logger.warning(f'Cannot find patch: {patch_def.name}')
                     continue
+                patches[patch_def.name] = decode_patch(wad.patches[patch_def.name].data)
+            placed_patches.append((patch_def.x, patch_def.y, *patches[patch_def.name]))
+        indices = composite_texture(texture.width, texture.height, placed_patches)
+        return palette[indices]
 
-                self.textures[texture.name] = palette[indices]
-                logger.debug(f'Built doom patch def: {texture.name}')
-
-    def build_textures(self):
+    @property
+    def source_paths(self) -> tuple[str, ...]:
+        return (self.settings.doom_wad_path,)
+
+    def build_textures(
+        self,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[Any, np.ndarray]:
         try:
             wad = omg.WAD(self.settings.doom_wad_path)
         except Exception as e:
             logger.error(f'Cannot load wad: {self.settings.doom_wad_path}')
             logger.exception(e)
-            return
+            return {}
         palette = np.array(wad.palette.colors, dtype=np.uint8)
-        self._build_flats(wad, palette)
-        self._build_txdefs(wad, palette)
+        txdefs = Textures(wad.txdefs)
+        num_textures = len(wad.flats) + len(txdefs)
+        num_done = 0
+        textures = {}
+        for name, flat in wad.flats.items():
+            textures[name] = self._build_flat(flat, palette)
+            logger.debug(f'Loaded doom flat: {name}')
+            num_done += 1
+            report_progress(num_done, num_textures, cancel_event, progress)
+
+        # Patches are shared between many textures so only decode each once.
+        patches = {}
+        for texture in txdefs.values():
+            textures[texture.name] = self._build_txdef(wad, texture, palette, patches)
+            logger.debug(f'Built doom patch def: {texture.name}')
+            num_done += 1
+            report_progress(num_done, num_textures, cancel_event, progress)
+        return textures
@@ -2,13 +2,18 @@ import importlib
 import inspect
 import logging
 import pkgutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from types import ModuleType
 
+from PySide6.QtCore import QObject, Signal
+
 from applicationframework.document import Document
 from applicationframework.mixins import HasAppMixin
 from editor import adaptors
-from editor.adaptors.base import AdaptorBase
+from editor.adaptors.base import AdaptorBase, LoadCancelled
 from editor.updateflag import UpdateFlag
 
 
@@ -21,6 +26,93 @@ class AdaptorSettings:
     current_adaptor: str | None = None
 
 
+class ResourceLoader(QObject):
+
+    """
+    Loads adaptor textures on a worker thread. Signals are emitted from the
+    worker but delivered on the GUI thread, where the results are swapped into
+    the adaptor.
+
+    Starting a new load cancels the one in flight. The adaptor checks for
+    cancellation between textures, so a stale load stops decoding rather than
+    holding up the next one.
+
+    """
+
+    # Number of textures decoded, total number of textures. The total is zero
+    # until the adaptor knows how many textures there are.
+    progress = Signal(int, int)
+
+    # Adaptor, textures, cancel event.
+    loaded = Signal(object, object, object)
+
+    # Adaptor.
+    finished = Signal(object)
+    cancelled = Signal(object)
+    failed = Signal(object)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ResourceLoader')
+        self._cancel_event = None
+        self.loaded.connect(self._on_loaded)
+
+    @property
+    def is_loading(self) -> bool:
+        return self._cancel_event is not None
+
+    def cancel(self):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def load(self, adaptor: AdaptorBase):
+        self.cancel()
+        self._cancel_event = threading.Event()
+        self._executor.submit(self._load, adaptor, self._cancel_event)
+
+    def _load(self, adaptor: AdaptorBase, cancel_event: threading.Event):
+        if cancel_event.is_set():
+            self.cancelled.emit(adaptor)
+            return
+        logger.info(f'Loading adaptor resources: {adaptor.name}')
+        start = time.time()
+        self.progress.emit(0, 0)
+        try:
+            textures = adaptor.load_textures(cancel_event, self.progress.emit)
+        except LoadCancelled:
+            logger.info(f'Cancelled loading adaptor resources: {adaptor.name}')
+            self.cancelled.emit(adaptor)
+            return
+        except Exception as e:
+            logger.error(f'Cannot load adaptor resources: {adaptor.name}')
+            logger.exception(e)
+            self.failed.emit(adaptor)
+            return
+        if cancel_event.is_set():
+            logger.info(f'Cancelled loading adaptor resources: {adaptor.name}')
+            self.cancelled.emit(adaptor)
+            return
+        logger.info(f'Loaded adaptor resources in: {time.time() - start}')
+        self.loaded.emit(adaptor, textures, cancel_event)
+
+    def _on_loaded(self, adaptor: AdaptorBase, textures: dict, cancel_event: threading.Event):
+
+        # Runs on the GUI thread. The load may have been cancelled since the
+        # signal was queued.
+        if cancel_event.is_set():
+            self.cancelled.emit(adaptor)
+            return
+        self._cancel_event = None
+        adaptor.set_textures(textures)
+        self.finished.emit(adaptor)
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
 class AdaptorManager(HasAppMixin):
 
     def __init__(self):
@@ -29,6 +121,8 @@ class AdaptorManager(HasAppMixin):
         for cls in self._find_adaptor_classes(adaptors):
             adaptor = cls()
             self.adaptors[adaptor.name] = adaptor
+        self.loader = ResourceLoader()
+        self.loader.finished.connect(self.on_resources_loaded)
         self.app().updated.connect(self.update_event)
 
     @property
@@ -50,6 +144,16 @@ class AdaptorManager(HasAppMixin):
                     logger.info(f'Found adaptor class: {obj}')
         return tuple(adaptors)
 
+    def on_resources_loaded(self, adaptor: AdaptorBase):
+        if adaptor is not self.current_adaptor:
+            return
+
+        # Let listeners know that the new resources are ready to use.
+        self.app().doc.updated(UpdateFlag.ADAPTOR_RESOURCES, dirty=False)
+
     def update_event(self, doc: Document, flags: UpdateFlag):
-        if UpdateFlag.ADAPTOR_TEXTURES in flags and self.current_adaptor is not None:
-            self.current_adaptor.build_resources()
+        if UpdateFlag.ADAPTOR_TEXTURES in flags:
+            if self.current_adaptor is not None:
+                self.loader.load(self.current_adaptor)
+            else:
+                self.loader.cancel()
@@ -1,11 +1,13 @@
 import logging
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Type
+from typing import Any, Callable, Type
 
+import numpy as np
 from jjaro.shpA import ShpA
 
-from editor.adaptors.base import AdaptorBase, AdaptorSettingsBase
+from editor.adaptors.base import AdaptorBase, AdaptorSettingsBase, report_progress
 from editor.graph import Graph
 
 # noinspection PyUnresolvedReferences
@@ -48,15 +50,27 @@ class MarathonAdaptor(AdaptorBase):
     def subprocess_args(self):
         return None
 
-    def build_textures(self):
+    @property
+    def source_paths(self) -> tuple[str, ...]:
+        return (self.settings.shapes_path,)
+
+    def build_textures(
+        self,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[Any, np.ndarray]:
         try:
             shapes = ShpA()
             shapes.load(self.settings.shapes_path)
         except Exception as e:
             logger.error(f'Cannot load shapes: {self.settings.shapes_path}')
             logger.exception(e)
-            return
+            return {}
 
+        textures = {}
+        num_textures = len(shapes.textures)
         for i, texture in enumerate(shapes.textures):
-            self.textures[i] = texture
+            textures[i] = texture
             logger.debug(f'Loaded marathon texture: {i}')
+            report_progress(i + 1, num_textures, cancel_event, progress)
+        return textures
@@ -0,0 +1,322 @@
+import copy
+from typing import Any, Iterable
+
+import numpy as np
+
+from editor.texture import Texture
+
+
+# Defaults of these types are shared between rows rather than copied.
+IMMUTABLE_TYPES = (bool, int, float, str, bytes, tuple, frozenset, type(None), Texture)
+
+
+def _get_dtype(value: Any) -> np.dtype:
+    if type(value) is bool:
+        return np.dtype(np.bool_)
+    if type(value) is int:
+        return np.dtype(np.int64)
+    if type(value) is float:
+        return np.dtype(np.float64)
+    return np.dtype(object)
+
+
+def _fits(dtype: np.dtype, value: Any) -> bool:
+    """
+    Return True if the value can be stored in a column of the given dtype and
+    read back as the same type.
+
+    """
+    if dtype.kind == 'O':
+        return True
+    if dtype.kind == 'b':
+        return type(value) is bool
+    if dtype.kind == 'i':
+        return type(value) is int and -2 ** 63 <= value < 2 ** 63
+    return type(value) is float
+
+
+class AttributeTable:
+
+    """
+    Columnar store for the attributes of one element type.
+
+    Every attribute in the schema, ie the element defaults, is held in a
+    column typed from its default value along with a mask of which rows have
+    it set. Anything else, or a value that doesn't match its column's type, is
+    held in the row's overrides dict, which is the element's attributes dict in
+    the networkx graph. So a freshly added element costs a row in each column
+    rather than a deep copy of the defaults.
+
+    Rows are packed so removing an element moves the last row into its slot.
+
+    """
+
+    def __init__(self, schema: dict | None = None):
+        self.schema = {}
+        self._columns = {}
+        self._present = {}
+        self._row_to_key = []
+        self._overrides = []
+        self.key_to_row = {}
+        self._capacity = 0
+        self.set_schema(schema or {})
+
+    def __len__(self) -> int:
+        return len(self._row_to_key)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.key_to_row
+
+    def _get_row_default(self, name: str) -> Any:
+        default = self.schema[name]
+        if self._columns[name].dtype.kind == 'O' and not isinstance(default, IMMUTABLE_TYPES):
+            default = copy.deepcopy(default)
+        return default
+
+    def _grow(self, capacity: int):
+        for name, column in self._columns.items():
+            new_column = np.empty(capacity, dtype=column.dtype)
+            new_column[:len(self)] = column[:len(self)]
+            self._columns[name] = new_column
+            new_present = np.zeros(capacity, dtype=np.bool_)
+            new_present[:len(self)] = self._present[name][:len(self)]
+            self._present[name] = new_present
+        self._capacity = capacity
+
+    def set_schema(self, schema: dict):
+        """
+        Create or retype columns to match the schema. Existing rows don't get
+        values for new columns, and a column whose default changes type keeps
+        its values by becoming an object column.
+
+        """
+        self.schema = schema
+
+        # Move the values of columns no longer in the schema into overrides.
+        for name in [name for name in self._columns if name not in schema]:
+            column = self._columns.pop(name)
+            present = self._present.pop(name)
+            for row in np.flatnonzero(present[:len(self)]).tolist():
+                value = column[row]
+                self._overrides[row].setdefault(name, value if column.dtype.kind == 'O' else value.item())
+
+        for name, default in schema.items():
+            dtype = _get_dtype(default)
+            column = self._columns.get(name)
+            if column is None:
+                self._columns[name] = np.empty(self._capacity, dtype=dtype)
+                self._present[name] = np.zeros(self._capacity, dtype=np.bool_)
+            elif column.dtype != dtype:
+                if not len(self):
+                    self._columns[name] = np.empty(self._capacity, dtype=dtype)
+                elif column.dtype.kind != 'O':
+                    self._columns[name] = np.array(column.tolist(), dtype=object)
+
+    def add_row(self, key: Any, overrides: dict) -> int:
+        """
+        Add or reset a row, setting every column to its default. Any values in
+        the overrides dict that fit their column are moved into it.
+
+        """
+        row = self.key_to_row.get(key)
+        if row is None:
+            row = len(self)
+            if row >= self._capacity:
+                self._grow(max(16, row * 2))
+            self._row_to_key.append(key)
+            self._overrides.append(overrides)
+            self.key_to_row[key] = row
+        else:
+            self._overrides[row] = overrides
+        for name, column in self._columns.items():
+            column[row] = self._get_row_default(name)
+            self._present[name][row] = True
+        self._absorb(row)
+        return row
+
+    def add_rows(self, items: Iterable[tuple[Any, dict]]):
+        """
+        Add rows from (key, overrides) pairs. Columns are grown once and new
+        rows are filled with their defaults a column at a time, so this is
+        much cheaper than calling add_row for each. Keys that already have a
+        row are reset as per add_row.
+
+        """
+        new_items = {}
+        for key, overrides in items:
+            if key in self.key_to_row:
+                self.add_row(key, overrides)
+            else:
+                new_items[key] = overrides
+        start = len(self)
+        end = start + len(new_items)
+        if end > self._capacity:
+            self._grow(max(16, end, self._capacity * 2))
+        for key, overrides in new_items.items():
+            self.key_to_row[key] = len(self._row_to_key)
+            self._row_to_key.append(key)
+            self._overrides.append(overrides)
+        self._fill_defaults(np.arange(start, end))
+        for row in range(start, end):
+            if self._overrides[row]:
+                self._absorb(row)
+
+    def remove_row(self, key: Any):
+        row = self.key_to_row.pop(key, None)
+        if row is None:
+            return
+        last_key = self._row_to_key.pop()
+        last_overrides = self._overrides.pop()
+        last_row = len(self)
+        if row != last_row:
+            for name, column in self._columns.items():
+                column[row] = column[last_row]
+                self._present[name][row] = self._present[name][last_row]
+            self._row_to_key[row] = last_key
+            self._overrides[row] = last_overrides
+            self.key_to_row[last_key] = row
+
+        # Release object references.
+        for column in self._columns.values():
+            if column.dtype.kind == 'O':
+                column[last_row] = None
+
+    def _fill_defaults(self, rows: np.ndarray):
+        for name, column in self._columns.items():
+            default = self.schema[name]
+            if column.dtype.kind != 'O':
+                column[rows] = default
+            elif isinstance(default, IMMUTABLE_TYPES):
+                values = np.empty(len(rows), dtype=object)
+                values.fill(default)
+                column[rows] = values
+            else:
+                for row in rows.tolist():
+                    column[row] = copy.deepcopy(default)
+            self._present[name][rows] = True
+
+    def _absorb(self, row: int):
+        overrides = self._overrides[row]
+        for name in [name for name in overrides if name in self._columns]:
+            value = overrides[name]
+            column = self._columns[name]
+            if _fits(column.dtype, value):
+                column[row] = value
+                self._present[name][row] = True
+                del overrides[name]
+            else:
+                self._present[name][row] = False
+
+    def rebuild(self, items: Iterable[tuple[Any, dict]]):
+        """
+        Rebuild rows from (key, overrides) pairs, eg after the networkx graph
+        has been written to directly. Rows whose overrides dict is the same
+        object as before keep their column values, otherwise the row is built
+        from scratch from the dict. Either way any column values written to
+        the dict are absorbed.
+
+        """
+        old_key_to_row = self.key_to_row
+        old_overrides = self._overrides
+        old_columns = self._columns
+        old_present = self._present
+
+        items = list(items)
+        self._row_to_key = [key for key, _ in items]
+        self._overrides = [overrides for _, overrides in items]
+        self.key_to_row = {key: row for row, key in enumerate(self._row_to_key)}
+        self._capacity = max(16, len(items))
+
+        old_rows = np.array([
+            old_key_to_row[key] if key in old_key_to_row and old_overrides[old_key_to_row[key]] is overrides else -1
+            for key, overrides in items
+        ], dtype=np.int64)
+        kept = old_rows >= 0
+        self._columns = {}
+        self._present = {}
+        for name, old_column in old_columns.items():
+            column = np.empty(self._capacity, dtype=old_column.dtype)
+            present = np.zeros(self._capacity, dtype=np.bool_)
+            column[:len(items)][kept] = old_column[old_rows[kept]]
+            present[:len(items)][kept] = old_present[name][old_rows[kept]]
+            self._columns[name] = column
+            self._present[name] = present
+
+        # New rows get their defaults.
+        self._fill_defaults(np.flatnonzero(~kept))
+
+        for row in range(len(items)):
+            if self._overrides[row]:
+                self._absorb(row)
+
+    def get_value(self, key: Any, name: str, default: Any = None) -> Any:
+        row = self.key_to_row[key]
+        overrides = self._overrides[row]
+        if name in overrides:
+            return overrides[name]
+        column = self._columns.get(name)
+        if column is None or not self._present[name][row]:
+            return default
+        value = column[row]
+        return value if column.dtype.kind == 'O' else value.item()
+
+    def set_value(self, key: Any, name: str, value: Any):
+        row = self.key_to_row[key]
+        column = self._columns.get(name)
+        if column is not None and _fits(column.dtype, value):
+            column[row] = value
+            self._present[name][row] = True
+            self._overrides[row].pop(name, None)
+        else:
+            self._overrides[row][name] = value
+            if column is not None:
+                self._present[name][row] = False
+
+    def get_values(self, key: Any) -> dict:
+        """
+        Return a new dict of every attribute set on the given row.
+
+        """
+        row = self.key_to_row[key]
+        values = {}
+        for name, column in self._columns.items():
+            if self._present[name][row]:
+                value = column[row]
+                values[name] = value if column.dtype.kind == 'O' else value.item()
+        values.update(self._overrides[row])
+        return values
+
+    def get_column(self, name: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return live views of a column's values and present mask, indexed by
+        key_to_row. Rows that aren't present or that hold an override have
+        arbitrary values.
+
+        """
+        return self._columns[name][:len(self)], self._present[name][:len(self)]
+
+    def get_rows(self, keys: Iterable[Any]) -> np.ndarray:
+        return np.fromiter((self.key_to_row[key] for key in keys), dtype=np.int64)
+
+    def get_column_values(self, rows: np.ndarray, name: str, default: Any = None) -> np.ndarray:
+        """
+        Return a new array of a column's values for the given rows, eg from
+        get_rows. Rows without a value in the column fall back to get_value, in
+        which case the array is of objects unless every fallback value fits the
+        column's type.
+
+        """
+        column = self._columns.get(name)
+        if column is None:
+            values = np.empty(len(rows), dtype=object)
+            missing = np.arange(len(rows))
+        else:
+            values = column[rows]
+            missing = np.flatnonzero(~self._present[name][rows])
+        if not len(missing):
+            return values
+        fallbacks = [self.get_value(self._row_to_key[row], name, default) for row in rows[missing].tolist()]
+        if values.dtype.kind != 'O' and not all(_fits(values.dtype, value) for value in fallbacks):
+            values = values.astype(object)
+        values[missing] = fallbacks
+        return values
@@ -0,0 +1,81 @@
+"""
+Helpers shared by the benchmarks.
+
+"""
+import time
+
+from editor.graph import Graph
+from editor.texture import Texture
+
+
+EDGE_ATTRIBUTES = {
+    'cstat': 0, 'pal': 0, 'shade': 1, 'xrepeat': 32, 'yrepeat': 32, 'xpanning': 0, 'ypanning': 0,
+    'lotag': 0, 'hitag': 0, 'extra': -1,
+}
+FACE_ATTRIBUTES = {
+    'ceilingz': 1024, 'floorz': 0, 'ceilingstat': 0, 'floorstat': 0, 'ceilingheinum': 0,
+    'ceilingshade': 0.9, 'ceilingpal': 0, 'ceilingxpanning': 0, 'ceilingypanning': 0, 'floorheinum': 0,
+    'floorshade': 0.9, 'floorpal': 0, 'floorxpanning': 0, 'floorypanning': 0, 'visibility': 0,
+    'filler': 0, 'lotag': 0, 'hitag': 0, 'extra': -1,
+}
+
+
+def time_call(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def create_empty_graph() -> Graph:
+    g = Graph()
+    for attr_name in ('low_tex', 'mid_tex', 'top_tex'):
+        g.add_edge_attribute_definition(attr_name, Texture(0))
+    for attr_name in ('floor_tex', 'ceiling_tex'):
+        g.add_face_attribute_definition(attr_name, Texture(0))
+    for attr_name, default in EDGE_ATTRIBUTES.items():
+        g.add_edge_attribute_definition(attr_name, default)
+    for attr_name, default in FACE_ATTRIBUTES.items():
+        g.add_face_attribute_definition(attr_name, default)
+    return g
+
+
+def create_grid(size: int, subdivisions: int) -> Graph:
+    """
+    Create a grid of size x size square sectors with shared walls, with each
+    side split into the given number of walls.
+
+    """
+    g = create_empty_graph()
+    num_points = size * subdivisions + 1
+    nodes = [
+        (x, y)
+        for y in range(num_points)
+        for x in range(num_points)
+        if not x % subdivisions or not y % subdivisions
+    ]
+    g.add_nodes_from(
+        range(len(nodes)),
+        ({'x': x * 512 // subdivisions, 'y': y * 512 // subdivisions} for x, y in nodes),
+    )
+    point_to_node = {point: i for i, point in enumerate(nodes)}
+
+    edges = set()
+    faces = []
+    for i in range(size):
+        for j in range(size):
+            x0, y0 = j * subdivisions, i * subdivisions
+            x1, y1 = x0 + subdivisions, y0 + subdivisions
+            points = (
+                [(x, y0) for x in range(x0, x1)] +
+                [(x1, y) for y in range(y0, y1)] +
+                [(x, y1) for x in range(x1, x0, -1)] +
+                [(x0, y) for y in range(y1, y0, -1)]
+            )
+            face = [point_to_node[point] for point in points]
+            face.append(face[0])
+            edges.update(zip(face, face[1:]))
+            faces.append(tuple(face))
+    g.add_edges_from(edges)
+    g.add_faces_from(faces)
+    g.update()
+    return g
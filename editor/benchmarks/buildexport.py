@@ -0,0 +1,41 @@
+"""
+Time exporting a Build map near the engine's wall limit.
+
+Usage: python -m editor.benchmarks.buildexport [--size 32] [--subdivisions 2]
+
+Generates a grid of size x size square sectors with shared walls, with each
+side split into the given number of walls. The defaults give 1024 sectors
+and 8192 walls, ie MAXSECTORS and MAXWALLS for Duke 3D.
+
+"""
+import argparse
+import os
+import tempfile
+
+from editor.benchmarks import create_grid, time_call
+from editor.constants import MapFormat
+from editor.mapio.build import export_build
+
+
+MAXWALLS = 8192
+MAXSECTORS = 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=32)
+    parser.add_argument('--subdivisions', type=int, default=2)
+    args = parser.parse_args()
+
+    g = create_grid(args.size, args.subdivisions)
+    num_walls = sum(len(face.edges) for face in g.faces)
+    print(f'{num_walls} walls (max {MAXWALLS}), {len(g.faces)} sectors (max {MAXSECTORS})')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'map.map')
+        duration = time_call(export_build, g, file_path, MapFormat.DUKE_3D)
+    print(f'Export: {duration:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
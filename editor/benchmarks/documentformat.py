@@ -0,0 +1,76 @@
+"""
+Compare load / save times and file sizes of the JSON and binary formats.
+
+Usage: python -m editor.benchmarks.documentformat [--size 100]
+
+Generates a grid of size x size square sectors with shared walls, using
+Build-style edge and face attributes.
+
+"""
+import argparse
+import json
+import os
+import tempfile
+import uuid
+
+from networkx.readwrite import json_graph
+
+from editor import binaryformat
+from editor.benchmarks import EDGE_ATTRIBUTES, FACE_ATTRIBUTES, time_call
+from editor.constants import ATTRIBUTES, FACES
+from editor.graph import Graph
+from editor.texture import Texture
+
+
+def create_graph(size: int) -> Graph:
+    g = Graph()
+    nodes = [[str(uuid.uuid4()) for _ in range(size + 1)] for _ in range(size + 1)]
+    for i, row in enumerate(nodes):
+        for j, node in enumerate(row):
+            g.data.add_node(node, **{ATTRIBUTES: {'x': j * 512.0, 'y': i * 512.0}})
+    for i in range(size):
+        for j in range(size):
+            face = (nodes[i][j], nodes[i][j + 1], nodes[i + 1][j + 1], nodes[i + 1][j], nodes[i][j])
+            for k, (head, tail) in enumerate(zip(face, face[1:])):
+                attrs = EDGE_ATTRIBUTES | {
+                    'low_tex': Texture(k), 'mid_tex': Texture((i + j) % 64), 'top_tex': Texture(0),
+                }
+                g.data.add_edge(head, tail, **{ATTRIBUTES: attrs})
+            attrs = FACE_ATTRIBUTES | {'floor_tex': Texture((i * j) % 32), 'ceiling_tex': Texture(1)}
+            g.data.graph[FACES][face] = {ATTRIBUTES: attrs}
+    g.update()
+    return g
+
+
+def parse_json(file_path: str):
+    with open(file_path, 'r') as f:
+        return json_graph.node_link_graph(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100)
+    args = parser.parse_args()
+
+    g = create_graph(args.size)
+    print(f'{len(g.data.nodes)} nodes, {len(g.data.edges)} edges, {len(g.data.graph[FACES])} faces')
+
+    # Loading rebuilds the graph maps, which costs the same for both formats.
+    update_duration = time_call(g.update)
+    print(f'Rebuilding graph maps: {update_duration:.3f}s')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, suffix in (('json', '.json'), ('binary', binaryformat.BINARY_FILE_SUFFIX)):
+            file_path = os.path.join(temp_dir, f'map{suffix}')
+            save_duration = time_call(g.save, file_path)
+            load_duration = time_call(Graph().load, file_path)
+            parse_duration = time_call(parse_json if name == 'json' else binaryformat.read, file_path)
+            size = os.path.getsize(file_path)
+            print(
+                f'{name:>8}: save {save_duration:.3f}s, load {load_duration:.3f}s '
+                f'(parse {parse_duration:.3f}s), size {size / 1024 / 1024:.2f} MiB'
+            )
+
+
+if __name__ == '__main__':
+    main()
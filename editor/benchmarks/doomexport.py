@@ -0,0 +1,37 @@
+"""
+Time exporting a large Doom map.
+
+Usage: python -m editor.benchmarks.doomexport [--size 64] [--subdivisions 6]
+
+Generates a grid of size x size square sectors with shared walls, with each
+side split into the given number of walls. The defaults give 4096 sectors and
+49920 lines.
+
+"""
+import argparse
+import os
+import tempfile
+
+from editor.benchmarks import create_grid, time_call
+from editor.constants import MapFormat
+from editor.mapio.doom import export_doom
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--subdivisions', type=int, default=6)
+    args = parser.parse_args()
+
+    g = create_grid(args.size, args.subdivisions)
+    num_lines = len({frozenset(edge.data) for edge in g.edges})
+    print(f'{num_lines} lines, {len(g.faces)} sectors')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'map.wad')
+        duration = time_call(export_doom, g, file_path, MapFormat.DOOM)
+    print(f'Export: {duration:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
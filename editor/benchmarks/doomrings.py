@@ -0,0 +1,78 @@
+"""
+Compare the original quadratic ring builder with order_tuples_into_chains.
+
+Usage: python -m editor.benchmarks.doomrings [--lines 10000] [--holes 50]
+
+Generates a sector with one outer ring and a number of holes, with the lines
+shuffled as they would be in a WAD.
+
+"""
+import argparse
+import random
+from typing import NamedTuple
+
+from editor.benchmarks import time_call
+from editor.mapio.doom import order_tuples_into_chains
+
+
+class HalfEdge(NamedTuple):
+
+    head: int
+    tail: int
+
+
+def order_tuples_into_chains_quadratic(tuples):
+    """
+    The original implementation, which scans every unused line at each step.
+
+    """
+    unused = set(tuples)
+    chains = []
+    while unused:
+        current = unused.pop()
+        chain = [current]
+        while True:
+            last = chain[-1]
+            next_tuple = None
+            for t in list(unused):
+                if t.head == last.tail:
+                    next_tuple = t
+                    break
+            if not next_tuple:
+                break
+            chain.append(next_tuple)
+            unused.remove(next_tuple)
+            if chain[-1].tail == chain[0].head:
+                chain.append(chain[0])
+                break
+        chains.append(chain)
+    return chains
+
+
+def create_sector(num_lines: int, num_holes: int, seed: int = 0) -> list[HalfEdge]:
+    rng = random.Random(seed)
+    ring_sizes = [num_lines // 2] + [num_lines // 2 // num_holes] * num_holes
+    edges = []
+    start = 0
+    for ring_size in ring_sizes:
+        nodes = list(range(start, start + ring_size))
+        edges.extend(HalfEdge(head, tail) for head, tail in zip(nodes, nodes[1:] + nodes[:1]))
+        start += ring_size
+    rng.shuffle(edges)
+    return edges
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--holes', type=int, default=50)
+    args = parser.parse_args()
+
+    edges = create_sector(args.lines, args.holes)
+    print(f'{len(edges)} lines, {args.holes + 1} rings')
+    print(f'Quadratic: {time_call(order_tuples_into_chains_quadratic, edges):.3f}s')
+    print(f'   Linear: {time_call(order_tuples_into_chains, edges):.3f}s')
+
+
+if __name__ == '__main__':
+    main()
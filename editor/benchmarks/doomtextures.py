@@ -0,0 +1,130 @@
+"""
+Compare the per-pixel Doom texture decoder with the vectorised one.
+
+Usage: python -m editor.benchmarks.doomtextures [path/to/DOOM.WAD]
+
+Without a WAD, random patches and flats are generated in roughly the same
+numbers and sizes as those in DOOM.WAD.
+
+"""
+import argparse
+import time
+from typing import Any
+
+import numpy as np
+import omg
+from omg.txdef import PatchDef, TextureDef
+
+from editor.adaptors.doom import composite_texture, decode_patch
+
+
+NUM_PATCHES = 350
+NUM_TEXTURES = 125
+NUM_FLATS = 107
+
+
+def generate_data(seed: int = 0) -> tuple[dict[str, omg.Graphic], list[TextureDef], dict[str, omg.Flat]]:
+    rng = np.random.default_rng(seed)
+    patches = {}
+    for i in range(NUM_PATCHES):
+        width = int(rng.choice((16, 32, 64, 128)))
+        height = int(rng.choice((64, 72, 128)))
+        pixels = rng.integers(0, 256, (height, width))
+
+        # Most patches are opaque, but punch a transparent run into some
+        # columns so they have multiple posts.
+        for x in np.flatnonzero(rng.random(width) < 0.25):
+            y = int(rng.integers(0, height - 8))
+            pixels[y:y + int(rng.integers(1, 8)), x] = -1
+        graphic = omg.Graphic()
+        graphic.from_pixels([None if p < 0 else int(p) for p in pixels.ravel()], width, height)
+        patches[f'PATCH{i}'] = graphic
+    names = list(patches)
+
+    textures = []
+    for i in range(NUM_TEXTURES):
+        texture = TextureDef(name=f'TEX{i}', width=int(rng.choice((64, 128, 256))), height=128)
+        for _ in range(int(rng.integers(1, 5))):
+            patch_def = PatchDef(int(rng.integers(-8, 128)), int(rng.integers(-8, 64)))
+            patch_def.name = names[int(rng.integers(0, len(names)))]
+            texture.patches.append(patch_def)
+        textures.append(texture)
+
+    flats = {}
+    for i in range(NUM_FLATS):
+        flats[f'FLAT{i}'] = omg.Flat(rng.integers(0, 256, 4096, dtype=np.uint8).tobytes())
+    return patches, textures, flats
+
+
+def build_per_pixel(patches, textures, flats, palette: np.ndarray) -> dict[Any, np.ndarray]:
+    """
+    The original decoder, converting every pixel through a comprehension and
+    decoding each patch every time it's used.
+
+    """
+    results = {}
+    for name, flat in flats.items():
+        indices = np.array([p if p is not None else 0 for p in flat.to_raw()], dtype=np.uint8)
+        w, h = flat.get_dimensions()
+        results[name] = palette[indices].reshape((h, w, 3))
+    for texture in textures:
+        indices = np.zeros((texture.height, texture.width), dtype=np.uint8)
+        for patch_def in texture.patches:
+            patch = patches[patch_def.name]
+            patch_indices = np.array([p if p is not None else 0 for p in patch.to_pixels()], dtype=np.uint8)
+            patch_indices.shape = (patch.height, patch.width)
+            x, y = max(patch_def.x, 0), max(patch_def.y, 0)
+            space_x = min(patch.width, indices.shape[1] - x)
+            space_y = min(patch.height, indices.shape[0] - y)
+            if space_x > 0 and space_y > 0:
+                indices[y:y + space_y, x:x + space_x] = patch_indices[:space_y, :space_x]
+        results[texture.name] = palette[indices]
+    return results
+
+
+def build_vectorised(patches, textures, flats, palette: np.ndarray) -> dict[Any, np.ndarray]:
+    results = {}
+    for name, flat in flats.items():
+        w, h = flat.get_dimensions()
+        results[name] = palette[np.frombuffer(flat.data, dtype=np.uint8, count=w * h).reshape((h, w))]
+    decoded = {}
+    for texture in textures:
+        placed_patches = []
+        for patch_def in texture.patches:
+            if patch_def.name not in decoded:
+                decoded[patch_def.name] = decode_patch(patches[patch_def.name].data)
+            placed_patches.append((patch_def.x, patch_def.y, *decoded[patch_def.name]))
+        results[texture.name] = palette[composite_texture(texture.width, texture.height, placed_patches)]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('wad_path', nargs='?')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.wad_path is not None:
+        from omg.txdef import Textures
+        wad = omg.WAD(args.wad_path)
+        patches = wad.patches
+        textures = [t for t in Textures(wad.txdefs).values() if all(p.name in patches for p in t.patches)]
+        flats = wad.flats
+        palette = np.array(wad.palette.colors, dtype=np.uint8)
+    else:
+        patches, textures, flats = generate_data()
+        palette = np.random.default_rng(0).integers(0, 256, (256, 3), dtype=np.uint8)
+    num_uses = sum(len(texture.patches) for texture in textures)
+    print(f'{len(patches)} patches, {len(textures)} textures ({num_uses} patch uses), {len(flats)} flats')
+
+    for name, func in (('per-pixel', build_per_pixel), ('vectorised', build_vectorised)):
+        durations = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            func(patches, textures, flats, palette)
+            durations.append(time.perf_counter() - start)
+        print(f'{name:>12}: {min(durations):.3f}s (best of {args.repeat})')
+
+
+if __name__ == '__main__':
+    main()
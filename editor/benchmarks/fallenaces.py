@@ -0,0 +1,94 @@
+"""
+Compare the original line splitting Fallen Aces parser with the streaming
+tokenizer, in time and peak memory.
+
+Usage: python -m editor.benchmarks.fallenaces [--size 100]
+
+Exports a grid of size x size square sectors with shared walls, which at the
+default size gives roughly 100k blocks.
+
+"""
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+
+from editor.benchmarks import create_grid, time_call
+from editor.constants import MapFormat
+from editor.mapio.fallenaces import BlockType, export_fallen_aces, read_map
+
+
+def read_map_readlines(file_path: str):
+    """
+    The original parser, which reads every line up front and parses values by
+    splitting lines and decoding them as JSON. Blocks are collected as dicts
+    of attributes.
+
+    """
+    with open(file_path, 'r') as f:
+        data = f.readlines()
+    blocks = {BlockType.VERTEX: [], BlockType.LINE: [], BlockType.SIDE: []}
+    curr_block_type = None
+    curr_block_attrs = None
+    for line in data:
+        line = line.split('//')[0].strip()
+        if not line:
+            continue
+        if curr_block_type is None:
+            curr_block_type = BlockType(line)
+        elif line == '{':
+            curr_block_attrs = {}
+        elif line == '}':
+            if curr_block_type in blocks:
+                blocks[curr_block_type].append(curr_block_attrs)
+            curr_block_type = None
+            curr_block_attrs = None
+        else:
+            try:
+                key, value = line.split('=')
+                key = key.split('(')[0].strip()
+            except:
+                continue
+            try:
+                curr_block_attrs[key.strip()] = json.loads(value.split(';')[0])
+            except:
+                continue
+    return blocks
+
+
+def read_map_streaming(file_path: str):
+    with open(file_path, 'r') as f:
+        return read_map(f)
+
+
+def trace_peak(func, *args) -> int:
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100)
+    args = parser.parse_args()
+
+    g = create_grid(args.size, 1)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'map.txt')
+        export_fallen_aces(g, file_path, MapFormat.FALLEN_ACES)
+        with open(file_path, 'r') as f:
+            num_blocks = sum(line.strip() == '{' for line in f)
+        print(f'{num_blocks} blocks, {os.path.getsize(file_path) / 1e6:.1f}MB')
+
+        for name, func in (('Readlines', read_map_readlines), ('Streaming', read_map_streaming)):
+            duration = time_call(func, file_path)
+            peak = trace_peak(func, file_path)
+            print(f'{name}: {duration:.3f}s, peak {peak / 1e6:.1f}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Time exporting a large Fallen Aces map, against writing the same text to disk
+in a single call.
+
+Usage: python -m editor.benchmarks.fallenacesexport [--size 100] [--subdivisions 1]
+
+Generates a grid of size x size square sectors with shared walls, with each
+side split into the given number of walls. The defaults give 10000 sectors
+and 40000 lines.
+
+"""
+import argparse
+import os
+import tempfile
+
+from editor.benchmarks import create_grid, time_call
+from editor.constants import MapFormat
+from editor.mapio.fallenaces import export_fallen_aces
+
+
+def write_text(file_path: str, text: str):
+    with open(file_path, 'w') as f:
+        f.write(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--subdivisions', type=int, default=1)
+    args = parser.parse_args()
+
+    g = create_grid(args.size, args.subdivisions)
+    print(f'{len(g.edges)} lines, {len(g.faces)} sectors')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'map.txt')
+        duration = time_call(export_fallen_aces, g, file_path, MapFormat.FALLEN_ACES)
+        with open(file_path, 'r') as f:
+            text = f.read()
+        write_duration = time_call(write_text, file_path, text)
+    print(f'Export: {duration:.3f}s, {len(text) / 1e6:.1f}MB')
+    print(f'Write only: {write_duration:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
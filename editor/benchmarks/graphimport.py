@@ -0,0 +1,76 @@
+"""
+Compare adding elements to a graph one at a time against the bulk insert API
+used by the importers.
+
+Usage: python -m editor.benchmarks.graphimport [--size 100]
+
+Generates a grid of size x size square sectors with shared walls, using
+Build-style edge and face attributes, and the same element defaults as the
+editor.
+
+"""
+import argparse
+
+import numpy as np
+
+from editor.benchmarks import EDGE_ATTRIBUTES, FACE_ATTRIBUTES, create_empty_graph, time_call
+from editor.texture import Texture
+
+
+def create_elements(size: int):
+    nodes = np.arange((size + 1) ** 2).reshape(size + 1, size + 1)
+    positions = np.stack(np.meshgrid(np.arange(size + 1), np.arange(size + 1)), axis=-1).reshape(-1, 2) * 512.0
+    edges = []
+    edge_attrs = []
+    faces = []
+    face_attrs = []
+    for i in range(size):
+        for j in range(size):
+            face = tuple(int(node) for node in (
+                nodes[i, j], nodes[i, j + 1], nodes[i + 1, j + 1], nodes[i + 1, j], nodes[i, j],
+            ))
+            for k, edge in enumerate(zip(face, face[1:])):
+                edges.append(edge)
+                edge_attrs.append(EDGE_ATTRIBUTES | {
+                    'low_tex': Texture(k), 'mid_tex': Texture((i + j) % 64), 'top_tex': Texture(0),
+                })
+            faces.append(face)
+            face_attrs.append(FACE_ATTRIBUTES | {'floor_tex': Texture((i * j) % 32), 'ceiling_tex': Texture(1)})
+    return nodes.ravel(), positions, edges, edge_attrs, faces, face_attrs
+
+
+def add_each(nodes, positions, edges, edge_attrs, faces, face_attrs):
+    g = create_empty_graph()
+    for node, (x, y) in zip(nodes.tolist(), positions.tolist()):
+        g.add_node(node, x=x, y=y)
+    for edge, attrs in zip(edges, edge_attrs):
+        g.add_edge(edge, **attrs)
+    for face, attrs in zip(faces, face_attrs):
+        g.add_face(face, **attrs)
+    g.update()
+
+
+def add_bulk(nodes, positions, edges, edge_attrs, faces, face_attrs):
+    g = create_empty_graph()
+    g.add_nodes_from(nodes, positions=positions, validate=False)
+    g.add_edges_from(edges, edge_attrs, validate=False)
+    g.add_faces_from(faces, face_attrs, validate=False)
+    g.update()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100)
+    args = parser.parse_args()
+
+    elements = create_elements(args.size)
+    nodes, _, edges, _, faces, _ = elements
+    print(f'{len(nodes)} nodes, {len(edges)} edges, {len(faces)} faces')
+
+    # Both include the final update() to build the maps.
+    print(f'Per element: {time_call(add_each, *elements):.3f}s')
+    print(f'       Bulk: {time_call(add_bulk, *elements):.3f}s')
+
+
+if __name__ == '__main__':
+    main()
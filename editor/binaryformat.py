@@ -0,0 +1,296 @@
+"""
+Versioned binary container for graphs, as an alternative to the node-link JSON
+format.
+
+Layout:
+
+    magic | version | header length | JSON header | padding | arrays
+
+The header holds the graph-level attributes, string dictionaries and a
+description of each array. Node coords and other numeric attributes are stored
+as columns, edges as node index pairs and faces as flattened node indices
+plus ring offsets. Any per-element data besides the attributes, eg selection
+state, is stored as a second set of columns. Arrays are aligned so they can be
+viewed directly from a memory-mapped file.
+
+"""
+import json
+import struct
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import networkx as nx
+import numpy as np
+
+from editor.constants import ATTRIBUTES, FACES
+from editor.texture import Texture
+
+
+MAGIC = b'BEEGRAPH'
+VERSION = 2
+ALIGNMENT = 64
+BINARY_FILE_SUFFIX = '.bgraph'
+
+# Magic, version, header length.
+_PREAMBLE = struct.Struct('<8sIQ')
+
+# Largest int that can be held in a float64 column without loss.
+_MAX_EXACT_INT = 2 ** 53
+
+_TEXTURE_TAG = '__texture__'
+
+
+class _Encoder(json.JSONEncoder):
+
+    def default(self, obj):
+        if isinstance(obj, Texture):
+            return {_TEXTURE_TAG: obj.value}
+        return super().default(obj)
+
+
+def _object_hook(obj: dict) -> Any:
+    if len(obj) == 1 and _TEXTURE_TAG in obj:
+        return Texture(obj[_TEXTURE_TAG])
+    return obj
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class _Writer:
+
+    def __init__(self):
+        self.arrays = []
+        self.size = 0
+
+    def add_array(self, array: np.ndarray) -> dict:
+        array = np.ascontiguousarray(array)
+        offset = _align(self.size)
+        self.arrays.append((offset, array))
+        self.size = offset + array.nbytes
+        return {'offset': offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+    def add_column(self, values: list) -> dict:
+        types = {type(value) for value in values}
+        if values and types <= {bool}:
+            return {'kind': 'bool', 'values': self.add_array(np.array(values, dtype=np.bool_))}
+        if values and types <= {int}:
+            try:
+                return {'kind': 'int', 'values': self.add_array(np.array(values, dtype=np.int64))}
+            except OverflowError:
+                pass
+        if values and types <= {float}:
+            return {'kind': 'float', 'values': self.add_array(np.array(values, dtype=np.float64))}
+
+        # Mixed ints and floats, eg shade. Store as floats along with a mask so
+        # the ints can be restored.
+        if values and types <= {int, float} and all(
+            -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT for value in values if type(value) is int
+        ):
+            return {
+                'kind': 'number',
+                'values': self.add_array(np.array(values, dtype=np.float64)),
+                'is_int': self.add_array(np.array([type(value) is int for value in values], dtype=np.bool_)),
+            }
+        if values and types <= {str}:
+            return {'kind': 'str', **self._add_dictionary(values)}
+        if values and types <= {Texture}:
+
+            # Texture values are normally ints or strings, but fall back to
+            # json if they can't be used as dictionary keys.
+            try:
+                return {'kind': 'texture', **self._add_dictionary([value.value for value in values])}
+            except TypeError:
+                pass
+        return {'kind': 'json', 'values': values}
+
+    def _add_dictionary(self, values: list) -> dict:
+        index = {}
+        codes = np.fromiter((index.setdefault(value, len(index)) for value in values), np.int32, len(values))
+        return {'dictionary': list(index), 'codes': self.add_array(codes)}
+
+    def add_attributes(self, attrs_list: list[dict]) -> dict:
+        names = list(dict.fromkeys(name for attrs in attrs_list for name in attrs))
+        columns = {}
+        for name in names:
+            present = [name in attrs for attrs in attrs_list]
+            column = self.add_column([attrs[name] for attrs in attrs_list if name in attrs])
+            if not all(present):
+                column['present'] = self.add_array(np.array(present, dtype=np.bool_))
+            columns[name] = column
+        return columns
+
+
+class _Reader:
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    def get_array(self, ref: dict) -> np.ndarray:
+        dtype = np.dtype(ref['dtype'])
+        count = int(np.prod(ref['shape']))
+        offset = ref['offset']
+        return self.data[offset:offset + count * dtype.itemsize].view(dtype).reshape(ref['shape'])
+
+    def get_column(self, column: dict) -> list:
+        kind = column['kind']
+        if kind in {'bool', 'int', 'float'}:
+            return self.get_array(column['values']).tolist()
+        if kind == 'number':
+            values = self.get_array(column['values']).tolist()
+            is_int = self.get_array(column['is_int']).tolist()
+            return [int(value) if value_is_int else value for value, value_is_int in zip(values, is_int)]
+        if kind == 'str':
+            dictionary = column['dictionary']
+            return [dictionary[code] for code in self.get_array(column['codes']).tolist()]
+        if kind == 'texture':
+
+            # Textures are immutable, so elements share one per value.
+            textures = [Texture(value) for value in column['dictionary']]
+            return [textures[code] for code in self.get_array(column['codes']).tolist()]
+        return column['values']
+
+    def get_attributes(self, columns: dict, count: int) -> list[dict]:
+
+        # Build each dict in one go from the dense columns, then fill in the
+        # sparse ones.
+        dense_names = [name for name, column in columns.items() if 'present' not in column]
+        dense_values = [self.get_column(columns[name]) for name in dense_names]
+        if dense_names:
+            attrs_list = [dict(zip(dense_names, row)) for row in zip(*dense_values)]
+        else:
+            attrs_list = [{} for _ in range(count)]
+        for name, column in columns.items():
+            if 'present' not in column:
+                continue
+            rows = np.flatnonzero(self.get_array(column['present'])).tolist()
+            for row, value in zip(rows, self.get_column(column)):
+                attrs_list[row][name] = value
+        return attrs_list
+
+
+def _split_data(data_list: Iterable[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Split each element's data dict into its attributes and everything else.
+
+    """
+    attrs_list = []
+    other_list = []
+    for data in data_list:
+        attrs_list.append(data[ATTRIBUTES])
+        other_list.append({key: value for key, value in data.items() if key != ATTRIBUTES})
+    return attrs_list, other_list
+
+
+def _iter_data(reader: _Reader, element_header: dict) -> Iterator[dict]:
+    """
+    Rebuild each element's data dict from its attribute and other columns.
+    Files from version 1 only have attributes.
+
+    The dicts are built lazily, since networkx copies node and edge data into
+    dicts of its own.
+
+    """
+    count = element_header['count']
+    attrs_list = reader.get_attributes(element_header['attributes'], count)
+    columns = element_header.get('data')
+    if not columns:
+        return ({ATTRIBUTES: attrs} for attrs in attrs_list)
+    data_list = reader.get_attributes(columns, count)
+    for data, attrs in zip(data_list, attrs_list):
+        data[ATTRIBUTES] = attrs
+    return iter(data_list)
+
+
+def is_binary(file_path: str | Path) -> bool:
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write(g: nx.DiGraph, file_path: str | Path):
+    writer = _Writer()
+
+    nodes = list(g.nodes)
+    node_to_index = {node: i for i, node in enumerate(nodes)}
+    node_attrs, node_data = _split_data(data for _, data in g.nodes(data=True))
+
+    edges = list(g.edges)
+    edge_nodes = np.fromiter((node_to_index[node] for edge in edges for node in edge), np.int64, 2 * len(edges))
+    edge_attrs, edge_data = _split_data(data for _, _, data in g.edges(data=True))
+
+    faces = g.graph[FACES]
+    face_nodes = np.fromiter((node_to_index[node] for face in faces for node in face), np.int64)
+    face_offsets = np.cumsum([0] + [len(face) for face in faces], dtype=np.int64)
+    face_attrs, face_data = _split_data(faces.values())
+
+    header = {
+        'graph': {key: value for key, value in g.graph.items() if key != FACES},
+        'nodes': {
+            'count': len(nodes),
+            'ids': writer.add_column(nodes),
+            'attributes': writer.add_attributes(node_attrs),
+            'data': writer.add_attributes(node_data),
+        },
+        'edges': {
+            'count': len(edges),
+            'nodes': writer.add_array(edge_nodes.reshape((-1, 2))),
+            'attributes': writer.add_attributes(edge_attrs),
+            'data': writer.add_attributes(edge_data),
+        },
+        'faces': {
+            'count': len(faces),
+            'nodes': writer.add_array(face_nodes),
+            'offsets': writer.add_array(face_offsets),
+            'attributes': writer.add_attributes(face_attrs),
+            'data': writer.add_attributes(face_data),
+        },
+    }
+    header_bytes = json.dumps(header, cls=_Encoder, separators=(',', ':')).encode('utf-8')
+    data_offset = _align(_PREAMBLE.size + len(header_bytes))
+
+    with open(file_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for offset, array in writer.arrays:
+            f.seek(data_offset + offset)
+            f.write(array.tobytes())
+
+
+def read(file_path: str | Path) -> nx.DiGraph:
+    with open(file_path, 'rb') as f:
+        magic, version, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f'Not a binary graph file: {file_path}')
+        if version > VERSION:
+            raise ValueError(f'Unsupported binary graph version: {version}')
+        header = json.loads(f.read(header_size).decode('utf-8'), object_hook=_object_hook)
+
+    data = np.memmap(file_path, dtype=np.uint8, mode='r')
+    reader = _Reader(data[_align(_PREAMBLE.size + header_size):])
+
+    node_header = header['nodes']
+    nodes = reader.get_column(node_header['ids'])
+    node_data = _iter_data(reader, node_header)
+
+    # Read edge heads and tails as flat columns rather than a list per edge.
+    edge_header = header['edges']
+    edge_nodes = reader.get_array(edge_header['nodes'])
+    heads = [nodes[i] for i in edge_nodes[:, 0].tolist()]
+    tails = [nodes[i] for i in edge_nodes[:, 1].tolist()]
+    edge_data = _iter_data(reader, edge_header)
+
+    face_header = header['faces']
+    face_nodes = [nodes[i] for i in reader.get_array(face_header['nodes']).tolist()]
+    face_offsets = reader.get_array(face_header['offsets']).tolist()
+    face_data = _iter_data(reader, face_header)
+
+    g = nx.DiGraph()
+    g.graph.update(header['graph'])
+    g.graph[FACES] = {
+        tuple(face_nodes[start:end]): data
+        for start, end, data in zip(face_offsets, face_offsets[1:], face_data)
+    }
+    g.add_nodes_from(zip(nodes, node_data))
+    g.add_edges_from(zip(heads, tails, edge_data))
+    return g
@@ -1,9 +1,9 @@
 import uuid
-from itertools import combinations, pairwise
+from itertools import pairwise
 from typing import Iterable
 
 import numpy as np
-from PySide6.QtCore import QPointF
+from PySide6.QtCore import QPointF, QRectF
 from PySide6.QtWidgets import QApplication
 from shapely.geometry import LineString, Polygon
 from shapely.geometry.polygon import orient
@@ -409,31 +409,49 @@ def split_face(*splits: tuple[Edge, float]):
 
 
 def find_all_candidate_matches(edges: Iterable[Edge], max_distance: float = 50.0, normal_tolerance: float = 0.0):
+    edges = list(edges)
+    if not edges:
+        return []
+    graph = edges[0].graph
+    edge_to_index = {edge: i for i, edge in enumerate(edges)}
+    midpoints = [
+        LineString((edge.head.pos.to_tuple(), edge.tail.pos.to_tuple())).interpolate(0.5, normalized=True)
+        for edge in edges
+    ]
     candidates = []
-    for i, (edge1, edge2) in enumerate(combinations(edges, 2)):
+    for i, edge1 in enumerate(edges):
 
-        # Don't attempt to match edges that belong to the same face.
-        if edge1.face == edge2.face:
-            continue
+        # A matching edge's midpoint lies on it, so only edges passing within
+        # max_distance of this edge's midpoint need testing.
+        mid1 = midpoints[i]
+        rect = QRectF(mid1.x - max_distance, mid1.y - max_distance, max_distance * 2, max_distance * 2)
+        for edge2 in graph.edges_in_rect(rect):
 
-        # Ignore when edge normals aren't pointed roughly towards each other.
-        n1 = edge1.normal
-        n2 = edge2.normal
-        if np.dot(n1, n2) > normal_tolerance:
-            continue
+            # Only test each pair of the given edges once.
+            j = edge_to_index.get(edge2)
+            if j is None or j <= i:
+                continue
 
-        # Don't merge if edge midpoints are too far apart.
-        mid1 = LineString((edge1.head.pos.to_tuple(), edge1.tail.pos.to_tuple())).interpolate(0.5, normalized=True)
-        mid2 = LineString((edge2.head.pos.to_tuple(), edge2.tail.pos.to_tuple())).interpolate(0.5, normalized=True)
-        dist = mid1.distance(mid2)
-        if dist > max_distance:
-            continue
+            # Don't attempt to match edges that belong to the same face.
+            if edge1.face == edge2.face:
+                continue
+
+            # Ignore when edge normals aren't pointed roughly towards each other.
+            n1 = edge1.normal
+            n2 = edge2.normal
+            if np.dot(n1, n2) > normal_tolerance:
+                continue
+
+            # Don't merge if edge midpoints are too far apart.
+            dist = mid1.distance(midpoints[j])
+            if dist > max_distance:
+                continue
 
-        candidates.append((dist, edge1, edge2))
+            candidates.append((dist, i, j, edge1, edge2))
 
-    # Sort all valid candidates by score.
-    candidates.sort(key=lambda c: c[0])
-    return candidates
+    # Sort all valid candidates by score, then by the order they were given.
+    candidates.sort(key=lambda c: c[:3])
+    return [(dist, edge1, edge2) for dist, _, _, edge1, edge2 in candidates]
 
 
 def join_edges(*edges: Iterable[Edge]) -> tuple[Tweak, Tweak]:
@@ -1,5 +1,5 @@
 from applicationframework.document import Document as DocumentBase
-from editor.graph import Element
+from editor.graph import ContentDelta, Element, SelectionDelta
 from editor.updateflag import UpdateFlag
 
 
@@ -7,28 +7,47 @@ class Document(DocumentBase):
 
     @property
     def new_flags(self):
-        return self.default_flags & ~UpdateFlag.ADAPTOR_TEXTURES
+        return self.default_flags & ~UpdateFlag.ADAPTOR_TEXTURES & ~UpdateFlag.ADAPTOR_RESOURCES
 
     @property
     def load_flags(self):
-        return self.default_flags & ~UpdateFlag.ADAPTOR_TEXTURES
+        return self.default_flags & ~UpdateFlag.ADAPTOR_TEXTURES & ~UpdateFlag.ADAPTOR_RESOURCES
 
     @property
     def selected_nodes(self) -> set[Element]:
-        return set([node for node in self.content.nodes if node.is_selected])
+        return set(self.content.selected_nodes)
 
     @property
     def selected_edges(self) -> set[Element]:
-        return set([edge for edge in self.content.edges if edge.is_selected])
+        return set(self.content.selected_edges)
 
     @property
     def selected_faces(self) -> set[Element]:
-        return set([edge for edge in self.content.faces if edge.is_selected])
+        return set(self.content.selected_faces)
 
     @property
     def selected_elements(self) -> set[Element]:
-        return {
-            element
-            for element in self.content.nodes | self.content.edges | self.content.faces
-            if element.is_selected
-        }
+        return self.content.selected_nodes | self.content.selected_edges | self.content.selected_faces
+
+    @property
+    def selection_delta(self) -> SelectionDelta:
+        """
+        Elements selected / deselected since the last update. Listeners can use
+        this during update_event to avoid rescanning the whole selection.
+
+        """
+        return self.content.selection_delta
+
+    @property
+    def content_delta(self) -> ContentDelta:
+        """
+        Elements added / removed / modified since the last update.
+
+        """
+        return self.content.content_delta
+
+    def updated(self, *args, **kwargs):
+        result = super().updated(*args, **kwargs)
+        self.content.reset_selection_delta()
+        self.content.reset_content_delta()
+        return result
@@ -4,17 +4,23 @@ import copy
 import json
 import logging
 from collections import defaultdict
+from collections.abc import KeysView
+from dataclasses import dataclass, field
 from functools import singledispatchmethod
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 import networkx as nx
-from PySide6.QtCore import QPointF
+import numpy as np
+from PySide6.QtCore import QPointF, QRectF
 from networkx.readwrite import json_graph
+from shapely import Point, Polygon
 
 from applicationframework.contentbase import ContentBase
-from editor import maths
+from editor import binaryformat, maths
+from editor.attributetable import AttributeTable
 from editor.constants import ATTRIBUTES, EDGE_DEFAULT, FACES, FACE_DEFAULT, IS_SELECTED, NODE_DEFAULT
+from editor.spatialindex import GridIndex
 from editor.texture import Texture
 
 # noinspection PyUnresolvedReferences
@@ -24,6 +30,11 @@ from __feature__ import snake_case
 logger = logging.getLogger(__name__)
 
 
+POSITION_KEYS = ('x', 'y')
+_MISSING = object()
+SPATIAL_INDEX_CELL_SIZE = 512
+
+
 class TextureEncoder(json.JSONEncoder):
 
     def default(self, obj):
@@ -32,17 +43,60 @@ class TextureEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+@dataclass
+class SelectionDelta:
+
+    """
+    Net change in selection since the delta was last reset.
+
+    """
+
+    added: set[Element] = field(default_factory=set)
+    removed: set[Element] = field(default_factory=set)
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+
+@dataclass
+class ContentDelta:
+
+    """
+    Net change in content since the delta was last reset. If rebuild is set the
+    graph was rebuilt wholesale and every element should be considered changed.
+
+    """
+
+    added: set[Element] = field(default_factory=set)
+    removed: set[Element] = field(default_factory=set)
+    modified: set[Element] = field(default_factory=set)
+    rebuild: bool = False
+
+    def __bool__(self):
+        return self.rebuild or bool(self.added or self.removed or self.modified)
+
+
 class ElementBase(metaclass=abc.ABCMeta):
 
+    """
+    Lightweight handle onto an element in the graph. Handles are interned by the
+    graph, so get_node() etc. return the same object for as long as the element
+    exists.
+
+    """
+
+    __slots__ = ('graph', 'data', '_hash')
+
     def __init__(self, graph: 'Graph', data):
         self.graph = graph
         self.data = data
+        self._hash = hash(data)
 
     def __str__(self):
         return str(self.data)
 
     def __hash__(self):
-        return hash(self.data)
+        return self._hash
 
     def __eq__(self, other):
         return hash(self) == hash(other)
@@ -55,21 +109,36 @@ class ElementBase(metaclass=abc.ABCMeta):
 
 class Element(ElementBase):
 
+    __slots__ = ()
+
     def __getitem__(self, item):
-        return self.get_attributes()[item]
+        value = self.attribute_table.get_value(self.data, item, _MISSING)
+        if value is _MISSING:
+            raise KeyError(item)
+        return value
 
     @abc.abstractmethod
     def get_private_attributes(self):
         ...
 
+    @property
+    @abc.abstractmethod
+    def attribute_table(self) -> AttributeTable:
+        ...
+
     def get_attributes(self):
-        return self.get_private_attributes()[ATTRIBUTES]
+        """
+        Return a new dict of all attributes. Use set_attribute to modify them.
+
+        """
+        return self.attribute_table.get_values(self.data)
 
     def get_attribute(self, key, default=None):
-        return self.get_attributes().get(key, default)
+        return self.attribute_table.get_value(self.data, key, default)
 
     def set_attribute(self, key, value):
-        self.get_attributes()[key] = value
+        self.attribute_table.set_value(self.data, key, value)
+        self.graph.record_modified(self)
 
     @property
     def is_selected(self):
@@ -78,13 +147,25 @@ class Element(ElementBase):
     @is_selected.setter
     def is_selected(self, value: bool):
         self.get_private_attributes()[IS_SELECTED] = value
+        self.graph.update_selection(self, value)
 
 
 class Node(Element):
 
+    __slots__ = ()
+
     def get_private_attributes(self):
         return self.graph.data.nodes[self.data]
 
+    @property
+    def attribute_table(self) -> AttributeTable:
+        return self.graph.node_attributes
+
+    def set_attribute(self, key, value):
+        super().set_attribute(key, value)
+        if key in POSITION_KEYS:
+            self.graph.update_position(self.data)
+
     @property
     def nodes(self) -> tuple[Node]:
         return (self,)
@@ -113,7 +194,7 @@ class Node(Element):
     def pos(self) -> QPointF:
 
         # TODO: Wean off QPointF type.
-        return QPointF(self.get_attribute('x'), self.get_attribute('y'))
+        return QPointF(*self.graph.positions[self.graph.node_to_row[self]])
 
     @pos.setter
     def pos(self, pos: QPointF):
@@ -125,6 +206,8 @@ class Node(Element):
 
 class Edge(Element):
 
+    __slots__ = ()
+
     @singledispatchmethod
     def __contains__(self, node: Node):
         return node in self.nodes
@@ -132,6 +215,10 @@ class Edge(Element):
     def get_private_attributes(self):
         return self.graph.data.edges[self.data]
 
+    @property
+    def attribute_table(self) -> AttributeTable:
+        return self.graph.edge_attributes
+
     @property
     def head(self):
 
@@ -180,6 +267,8 @@ class Edge(Element):
 
 class Ring(ElementBase):
 
+    __slots__ = ()
+
     @property
     def nodes(self) -> tuple[Node]:
         return self.graph.ring_to_nodes[self]
@@ -191,6 +280,8 @@ class Ring(ElementBase):
 
 class Face(Element):
 
+    __slots__ = ()
+
     @singledispatchmethod
     def __contains__(self, node: Node):
         return node in self.nodes
@@ -202,6 +293,10 @@ class Face(Element):
     def get_private_attributes(self):
         return self.graph.data.graph[FACES][self]
 
+    @property
+    def attribute_table(self) -> AttributeTable:
+        return self.graph.face_attributes
+
     @property
     def nodes(self) -> tuple[Node]:
         return self.graph.face_to_nodes[self]
@@ -251,6 +346,37 @@ class Graph(ContentBase):
         self.face_to_edges = {}
         self.face_to_rings = {}
 
+        # Typed attribute columns defined by the element defaults. The
+        # attributes dicts in the networkx graph only hold sparse overrides.
+        self.node_attributes = AttributeTable(self.data.graph[NODE_DEFAULT])
+        self.edge_attributes = AttributeTable(self.data.graph[EDGE_DEFAULT])
+        self.face_attributes = AttributeTable(self.data.graph[FACE_DEFAULT])
+
+        # Columnar node position store. Rows are packed so removing a node moves
+        # the last row into its slot. The x / y attributes are kept in step so
+        # the attribute API and serialization are unaffected.
+        self._positions = np.zeros((0, 2), dtype=np.float64)
+        self._row_to_node = []
+        self.node_to_row = {}
+
+        # Spatial indices over the bounds of each element, kept in step with the
+        # position store.
+        self._node_index = GridIndex(SPATIAL_INDEX_CELL_SIZE)
+        self._edge_index = GridIndex(SPATIAL_INDEX_CELL_SIZE)
+        self._face_index = GridIndex(SPATIAL_INDEX_CELL_SIZE)
+
+        # Selected elements by type, plus the net change since the last reset.
+        self._selected = {Node: set(), Edge: set(), Face: set()}
+        self.selection_delta = SelectionDelta()
+        self.content_delta = ContentDelta()
+
+        # Interned element handles. Keyed by the handle itself so the keys view
+        # can be handed out directly, and since handles hash / compare the same
+        # as their data they can be looked up using the raw data too.
+        self._node_handles = {}
+        self._edge_handles = {}
+        self._face_handles = {}
+
         self.update()
 
     def _get_element_default_attributes(self, key: str):
@@ -267,6 +393,14 @@ class Graph(ContentBase):
 
     def _add_element_attribute_definition(self, element: str, name: str, default):
         self.data.graph[element][name] = default
+        self._get_attribute_table(element).set_schema(self.data.graph[element])
+
+    def _get_attribute_table(self, element: str) -> AttributeTable:
+        return {
+            NODE_DEFAULT: self.node_attributes,
+            EDGE_DEFAULT: self.edge_attributes,
+            FACE_DEFAULT: self.face_attributes,
+        }[element]
 
     def add_node_attribute_definition(self, name: str, default):
         self._add_element_attribute_definition(NODE_DEFAULT, name, default)
@@ -277,7 +411,396 @@ class Graph(ContentBase):
     def add_face_attribute_definition(self, name: str, default):
         self._add_element_attribute_definition(FACE_DEFAULT, name, default)
 
+    @staticmethod
+    def _get_face_rings(face: tuple) -> tuple[tuple]:
+        """
+        Split a flat face tuple into its rings. Each ring is closed by repeating
+        its start node, so the closing node is dropped from the returned rings.
+
+        """
+        rings = [[]]
+        start_node = face[0]
+        i = 0
+        while i < len(face) - 1:
+            curr, nxt = face[i], face[i + 1]
+            rings[-1].append(curr)
+            i += 1
+            if nxt == start_node and i < len(face) - 1:
+                rings.append([])
+                i += 1
+                start_node = face[i]
+        return tuple([tuple(ring) for ring in rings])
+
+    def _add_face_to_maps(self, face: tuple):
+        face_ = self.get_face(face)
+        face_nodes = []
+        face_edges = []
+        face_rings = []
+        for ring in self._get_face_rings(face):
+            ring_nodes_ = []
+            ring_edges_ = []
+            for i in range(len(ring)):
+                head, tail = ring[i], ring[(i + 1) % len(ring)]
+                node_ = self.get_node(head)
+                edge = self.get_edge(head, tail)
+                self.edge_to_face[edge] = face_
+                self.node_to_faces[node_].add(face_)
+                ring_nodes_.append(node_)
+                ring_edges_.append(edge)
+            ring_ = Ring(self, tuple(ring_nodes_))
+            self.ring_to_nodes[ring_] = tuple(ring_nodes_)
+            self.ring_to_edges[ring_] = tuple(ring_edges_)
+            face_nodes.extend(ring_nodes_)
+            face_edges.extend(ring_edges_)
+            face_rings.append(ring_)
+        self.face_to_nodes[face] = face_nodes
+        self.face_to_edges[face] = tuple(face_edges)
+        self.face_to_rings[face] = tuple(face_rings)
+        self._face_index.insert(face, self._get_bounds(face))
+
+    def _remove_face_from_maps(self, face: tuple):
+        for edge in self.face_to_edges.pop(face, ()):
+            if self.edge_to_face.get(edge) == face:
+                del self.edge_to_face[edge]
+        for node_ in self.face_to_nodes.pop(face, ()):
+            faces = self.node_to_faces.get(node_)
+            if faces is not None:
+                faces.discard(face)
+                if not faces:
+                    del self.node_to_faces[node_]
+        for ring_ in self.face_to_rings.pop(face, ()):
+            self.ring_to_nodes.pop(ring_, None)
+            self.ring_to_edges.pop(ring_, None)
+        self._face_index.remove(face)
+
+    def _add_edge_to_maps(self, edge: tuple):
+
+        # Networkx will implicitly add any missing nodes.
+        for node in edge:
+            if node not in self.node_to_row:
+                self.node_attributes.add_row(node, self.data.nodes[node].setdefault(ATTRIBUTES, {}))
+                self.update_position(node)
+                self._record_added(self.get_node(node))
+        edge_ = self.get_edge(*edge)
+        head_, tail_ = self.get_node(edge[0]), self.get_node(edge[1])
+        self.edge_to_nodes[edge] = (head_, tail_)
+        self.node_to_out_edges[head_].add(edge_)
+        self.node_to_in_edges[tail_].add(edge_)
+        self.node_to_edges[head_].add(edge_)
+        self.node_to_edges[tail_].add(edge_)
+        self._edge_index.insert(edge, self._get_bounds(edge))
+
+    def _remove_edge_from_maps(self, edge: tuple):
+        head_, tail_ = self.edge_to_nodes.pop(edge, (None, None))
+        if head_ is not None:
+            self.node_to_out_edges[head_].discard(edge)
+            self.node_to_edges[head_].discard(edge)
+        if tail_ is not None:
+            self.node_to_in_edges[tail_].discard(edge)
+            self.node_to_edges[tail_].discard(edge)
+        self.edge_to_face.pop(edge, None)
+        self._edge_index.remove(edge)
+        self._discard_selection(self._edge_handles, edge)
+        self._record_removed(self._edge_handles.pop(edge, None))
+
+    def _get_node_position(self, node: Any) -> tuple[float, float]:
+        return (
+            self.node_attributes.get_value(node, 'x') or 0.0,
+            self.node_attributes.get_value(node, 'y') or 0.0,
+        )
+
+    def _add_position_row(self, node: Any):
+        row = len(self._row_to_node)
+        if row >= len(self._positions):
+            positions = np.zeros((max(16, row * 2), 2), dtype=np.float64)
+            positions[:row] = self._positions[:row]
+            self._positions = positions
+        self._row_to_node.append(node)
+        self.node_to_row[node] = row
+        return row
+
+    def _remove_position_row(self, node: Any):
+        row = self.node_to_row.pop(node, None)
+        if row is None:
+            return
+        self._node_index.remove(node)
+        last_node = self._row_to_node.pop()
+        last_row = len(self._row_to_node)
+        if row != last_row:
+            self._positions[row] = self._positions[last_row]
+            self._row_to_node[row] = last_node
+            self.node_to_row[last_node] = row
+
+    def _update_positions(self):
+        self._row_to_node = list(self.data.nodes)
+        self.node_to_row = {node: row for row, node in enumerate(self._row_to_node)}
+        self._positions = np.array([
+            self._get_node_position(node) for node in self._row_to_node
+        ], dtype=np.float64).reshape(-1, 2)
+
+    def update_position(self, node: Any):
+        """
+        Copy a node's x / y attributes into the position store. Only required if
+        the attribute table has been written to directly.
+
+        """
+        row = self.node_to_row.get(node)
+        if row is None:
+            row = self._add_position_row(node)
+        self._positions[row] = self._get_node_position(node)
+        self._update_node_bounds(node)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """
+        Live (N, 2) view of every node position, indexed by node_to_row.
+
+        """
+        return self._positions[:len(self._row_to_node)]
+
+    def get_positions(self, nodes: Iterable | None = None) -> np.ndarray:
+        """
+        Return an (N, 2) array of positions for the given nodes, or for every
+        node in row order if nodes is None.
+
+        """
+        if nodes is None:
+            return self.positions.copy()
+        rows = [self.node_to_row[node] for node in nodes]
+        return self._positions[rows].reshape(-1, 2)
+
+    def set_positions(self, nodes: Iterable, positions: np.ndarray):
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        for node, (x, y) in zip(nodes, positions):
+            self.node_attributes.set_value(node, 'x', float(x))
+            self.node_attributes.set_value(node, 'y', float(y))
+            self._positions[self.node_to_row[node]] = x, y
+            self._update_node_bounds(node)
+            self.record_modified(self.get_node(node))
+
+    def _get_bounds(self, nodes: Iterable) -> tuple[float, float, float, float]:
+        positions = self.get_positions(nodes)
+        min_x, min_y = positions.min(axis=0)
+        max_x, max_y = positions.max(axis=0)
+        return min_x, min_y, max_x, max_y
+
+    def _update_node_bounds(self, node: Any):
+        """
+        Re-index a node along with any edges and faces that depend on its
+        position.
+
+        """
+        x, y = self._positions[self.node_to_row[node]]
+        self._node_index.insert(node, (x, y, x, y))
+        for edge in self.node_to_edges.get(node, ()):
+            self._edge_index.insert(edge.data, self._get_bounds(edge.data))
+        for face in self.node_to_faces.get(node, ()):
+            self._face_index.insert(face.data, self._get_bounds(face.data))
+
+    def _update_spatial_index(self):
+        self._node_index.clear()
+        self._edge_index.clear()
+        self._face_index.clear()
+        for node, (x, y) in zip(self._row_to_node, self.positions):
+            self._node_index.insert(node, (x, y, x, y))
+        for edge in self.data.edges:
+            self._edge_index.insert(edge, self._get_bounds(edge))
+        for face in self.data.graph[FACES]:
+            self._face_index.insert(face, self._get_bounds(face))
+
+    def nearest_node(self, pos: QPointF, radius: float) -> Node | None:
+        """
+        Return the closest node to pos that is within radius, or None.
+
+        """
+        x, y = pos.to_tuple()
+        nodes = list(self._node_index.query((x - radius, y - radius, x + radius, y + radius)))
+        if not nodes:
+            return None
+        distances = np.hypot(*(self.get_positions(nodes) - (x, y)).T)
+        i = int(np.argmin(distances))
+        return self.get_node(nodes[i]) if distances[i] <= radius else None
+
+    def nodes_in_rect(self, rect: QRectF) -> list[Node]:
+        """
+        Return all nodes inside the given rect, including its border.
+
+        """
+        return [
+            self.get_node(node)
+            for node in self._node_index.query((rect.left(), rect.top(), rect.right(), rect.bottom()))
+        ]
+
+    def edges_in_rect(self, rect: QRectF) -> list[Edge]:
+        """
+        Return all edges whose line segment passes through the given rect.
+
+        """
+        min_x, min_y, max_x, max_y = rect.left(), rect.top(), rect.right(), rect.bottom()
+        edges = []
+        for edge in self._edge_index.query((min_x, min_y, max_x, max_y)):
+            (x1, y1), (x2, y2) = self.get_positions(edge)
+
+            # Clip the segment against the rect (Liang-Barsky).
+            t0, t1 = 0.0, 1.0
+            dx, dy = x2 - x1, y2 - y1
+            for p, q in ((-dx, x1 - min_x), (dx, max_x - x1), (-dy, y1 - min_y), (dy, max_y - y1)):
+                if p == 0:
+                    if q < 0:
+                        break
+                    continue
+                t = q / p
+                if p < 0:
+                    t0 = max(t0, t)
+                else:
+                    t1 = min(t1, t)
+                if t0 > t1:
+                    break
+            else:
+                edges.append(self.get_edge(*edge))
+        return edges
+
+    def face_at(self, pos: QPointF) -> Face | None:
+        """
+        Return the face containing pos, or None. Points inside a hole are not
+        considered inside the face.
+
+        """
+        x, y = pos.to_tuple()
+        for face in self._face_index.query((x, y, x, y)):
+            rings = [self.get_positions(ring) for ring in self._get_face_rings(face)]
+            if Polygon(rings[0], rings[1:]).intersects(Point(x, y)):
+                return self.get_face(face)
+        return None
+
+    def _update_selection(self):
+        for cls, elements in ((Node, self.nodes), (Edge, self.edges), (Face, self.faces)):
+            self._selected[cls] = {
+                element
+                for element in elements
+                if element.get_private_attributes().get(IS_SELECTED, False)
+            }
+        self.selection_delta = SelectionDelta()
+
+    def update_selection(self, element: Element, is_selected: bool):
+        """
+        Record a change to an element's selected state. Called by the
+        is_selected setter.
+
+        """
+        selected = self._selected[type(element)]
+        if is_selected == (element in selected):
+            return
+        if is_selected:
+            selected.add(element)
+            if element in self.selection_delta.removed:
+                self.selection_delta.removed.discard(element)
+            else:
+                self.selection_delta.added.add(element)
+        else:
+            selected.discard(element)
+            if element in self.selection_delta.added:
+                self.selection_delta.added.discard(element)
+            else:
+                self.selection_delta.removed.add(element)
+
+    def _discard_selection(self, handles: dict, element: Any):
+        handle = handles.get(element)
+        if handle is not None:
+            self.update_selection(handle, False)
+
+    @property
+    def selected_nodes(self) -> set[Node]:
+        return self._selected[Node]
+
+    @property
+    def selected_edges(self) -> set[Edge]:
+        return self._selected[Edge]
+
+    @property
+    def selected_faces(self) -> set[Face]:
+        return self._selected[Face]
+
+    def reset_selection_delta(self):
+        self.selection_delta = SelectionDelta()
+
+    def _record_added(self, element: Element):
+        self.content_delta.added.add(element)
+
+    def _record_removed(self, element: Element | None):
+        if element is None:
+            return
+        self.content_delta.modified.discard(element)
+        if element in self.content_delta.added:
+            self.content_delta.added.discard(element)
+        else:
+            self.content_delta.removed.add(element)
+
+    def record_modified(self, element: Element):
+        """
+        Record a change to an element's attributes. Called by set_attribute.
+
+        """
+        if element not in self.content_delta.added:
+            self.content_delta.modified.add(element)
+
+    def reset_content_delta(self):
+        self.content_delta = ContentDelta()
+
+    def _update_handles(self):
+        """
+        Sync the interned handles with the underlying networkx graph, retaining
+        any handles that are still valid.
+
+        """
+        for handles, cls, elements in (
+            (self._node_handles, Node, self.data.nodes),
+            (self._edge_handles, Edge, self.data.edges),
+            (self._face_handles, Face, self.data.graph[FACES]),
+        ):
+            old_handles = dict(handles)
+            handles.clear()
+            for element in elements:
+                handle = old_handles.get(element)
+                if handle is None:
+                    handle = cls(self, element)
+                handles[handle] = handle
+
+    def _update_attribute_tables(self):
+        for table, schema, items in (
+            (
+                self.node_attributes,
+                self.data.graph[NODE_DEFAULT],
+                ((node, attrs.setdefault(ATTRIBUTES, {})) for node, attrs in self.data.nodes.items()),
+            ),
+            (
+                self.edge_attributes,
+                self.data.graph[EDGE_DEFAULT],
+                (((head, tail), attrs.setdefault(ATTRIBUTES, {})) for head, tail, attrs in self.data.edges(data=True)),
+            ),
+            (
+                self.face_attributes,
+                self.data.graph[FACE_DEFAULT],
+                ((face, attrs.setdefault(ATTRIBUTES, {})) for face, attrs in self.data.graph[FACES].items()),
+            ),
+        ):
+            table.set_schema(schema)
+            table.rebuild(items)
+
     def update(self):
+        """
+        Rebuild all maps from scratch.
+
+        The add / remove methods keep these maps up to date incrementally, so
+        this only needs to be called after data has been written directly to
+        the underlying networkx graph, eg after a bulk import or load.
+
+        """
+        self._update_handles()
+        self._update_attribute_tables()
+        self._update_positions()
+        self._update_selection()
+        self.content_delta = ContentDelta(rebuild=True)
 
         self.node_to_edges.clear()
         self.node_to_in_edges.clear()
@@ -298,22 +821,7 @@ class Graph(ContentBase):
 
         for face in self.data.graph[FACES]:
             face_ = self.get_face(face)
-
-            rings = [[]]
-
-            start_node = face[0]
-            i = 0
-            while i < len(face) - 1:
-                curr, nxt = face[i], face[i + 1]
-                rings[-1].append(curr)
-                i += 1
-                if nxt == start_node and i < len(face) - 1:
-                    rings.append([])
-                    i += 1
-                    start_node = face[i]
-            rings = tuple([tuple(ring) for ring in rings])
-
-            for ring in rings:
+            for ring in self._get_face_rings(face):
                 ring_nodes_ = []
                 ring_edges_ = []
                 for i in range(len(ring)):
@@ -353,29 +861,43 @@ class Graph(ContentBase):
         self.face_to_edges = {k: tuple(v) for k, v in face_to_edges.items()}
         self.face_to_rings = {k: tuple(v) for k, v in face_to_rings.items()}
 
+        self._update_spatial_index()
+
     @property
-    def nodes(self) -> set[Node]:
-        return {self.get_node(node) for node in self.data.nodes}
+    def nodes(self) -> KeysView[Node]:
+        return self._node_handles.keys()
 
     @property
-    def edges(self) -> set[Edge]:
-        return {self.get_edge(*edge) for edge in self.data.edges}
+    def edges(self) -> KeysView[Edge]:
+        return self._edge_handles.keys()
 
     @property
-    def faces(self) -> set[Face]:
-        return {self.get_face(face) for face in self.data.graph[FACES]}
+    def faces(self) -> KeysView[Face]:
+        return self._face_handles.keys()
 
     def get_node(self, node) -> Node:
-        assert node in self.data, f'Node not found: {node}'
-        return Node(self, node)
+        node_ = self._node_handles.get(node)
+        if node_ is None:
+            assert node in self.data, f'Node not found: {node}'
+            node_ = Node(self, node)
+            self._node_handles[node_] = node_
+        return node_
 
     def get_edge(self, head, tail) -> Edge:
-        assert (head, tail) in self.data.edges, f'Edge not found: {(head, tail)}'
-        return Edge(self, (head, tail))
+        edge_ = self._edge_handles.get((head, tail))
+        if edge_ is None:
+            assert (head, tail) in self.data.edges, f'Edge not found: {(head, tail)}'
+            edge_ = Edge(self, (head, tail))
+            self._edge_handles[edge_] = edge_
+        return edge_
 
     def get_face(self, face: tuple) -> Face:
-        assert face in self.data.graph[FACES], f'Face not found: {face}'
-        return Face(self, face)
+        face_ = self._face_handles.get(face)
+        if face_ is None:
+            assert face in self.data.graph[FACES], f'Face not found: {face}'
+            face_ = Face(self, face)
+            self._face_handles[face_] = face_
+        return face_
 
     def has_node(self, node: Any):
         return node in self.data.nodes
@@ -384,40 +906,187 @@ class Graph(ContentBase):
         return (head, tail) in self.data.edges
 
     def add_node(self, node: Any, **node_attrs):
-        default_node_attrs = self.get_node_default_attributes()
-        default_node_attrs.update(node_attrs)
-        self.data.add_node(node, **{ATTRIBUTES: default_node_attrs})
-        return self.get_node(node)
+        exists = node in self.data
+        self.data.add_node(node, **{ATTRIBUTES: node_attrs})
+        self.node_attributes.add_row(node, node_attrs)
+        self.update_position(node)
+        node_ = self.get_node(node)
+        if exists:
+            self.record_modified(node_)
+        else:
+            self._record_added(node_)
+        return node_
 
     def add_edge(self, edge: tuple[Any, Any], **edge_attrs):
-        default_edge_attrs = self.get_edge_default_attributes()
-        default_edge_attrs.update(edge_attrs)
-        self.data.add_edge(*edge, **{ATTRIBUTES: default_edge_attrs})
-        return self.get_edge(*edge)
+        exists = edge in self.data.edges
+        self.data.add_edge(*edge, **{ATTRIBUTES: edge_attrs})
+        self.edge_attributes.add_row(edge, edge_attrs)
+        self._add_edge_to_maps(edge)
+        edge_ = self.get_edge(*edge)
+        if exists:
+            self.record_modified(edge_)
+        else:
+            self._record_added(edge_)
+        return edge_
 
     def add_face(self, face: tuple[Any, ...], **face_attrs):
 
         # TODO: Test node actually exists?
-        default_face_attrs = self.get_face_default_attributes()
-        default_face_attrs.update(face_attrs)
-        self.data.graph[FACES][face] = {ATTRIBUTES: default_face_attrs}
-        return self.get_face(face)
+        exists = face in self.data.graph[FACES]
+        self._remove_face_from_maps(face)
+        self.data.graph[FACES][face] = {ATTRIBUTES: face_attrs}
+        self.face_attributes.add_row(face, face_attrs)
+        self._add_face_to_maps(face)
+        face_ = self.get_face(face)
+        if exists:
+            self.record_modified(face_)
+        else:
+            self._record_added(face_)
+        return face_
+
+    @staticmethod
+    def _get_bulk_attributes(attrs: Iterable[dict] | None, count: int, validate: bool) -> list[dict]:
+        if attrs is None:
+            return [{} for _ in range(count)]
+        attrs = [dict(element_attrs) for element_attrs in attrs]
+        if validate and len(attrs) != count:
+            raise ValueError(f'Expected {count} attribute dicts, got {len(attrs)}')
+        return attrs
+
+    def add_nodes_from(
+        self,
+        nodes: Iterable[Any] | np.ndarray,
+        attrs: Iterable[dict] | None = None,
+        positions: np.ndarray | None = None,
+        validate: bool = True,
+    ):
+        """
+        Add nodes in bulk, eg when importing a map. Attributes are given as a
+        parallel iterable of dicts, and positions as an optional (N, 2) array
+        that overrides any x / y attributes.
+
+        Unlike add_node this only writes to the networkx graph and attribute
+        tables, so update() must be called once all elements have been added.
+        Passing validate=False skips checking the inputs for trusted data.
+
+        """
+        nodes = nodes.tolist() if isinstance(nodes, np.ndarray) else list(nodes)
+        attrs = self._get_bulk_attributes(attrs, len(nodes), validate)
+        if positions is not None:
+            positions = np.asarray(positions, dtype=np.float64)
+            if validate and positions.shape != (len(nodes), 2):
+                raise ValueError(f'Expected positions of shape {(len(nodes), 2)}, got {positions.shape}')
+            for node_attrs, (x, y) in zip(attrs, positions.tolist()):
+                node_attrs['x'] = x
+                node_attrs['y'] = y
+        self.data.add_nodes_from((node, {ATTRIBUTES: node_attrs}) for node, node_attrs in zip(nodes, attrs))
+        self.node_attributes.add_rows(zip(nodes, attrs))
+
+    def add_edges_from(
+        self,
+        edges: Iterable[tuple[Any, Any]] | np.ndarray,
+        attrs: Iterable[dict] | None = None,
+        validate: bool = True,
+    ):
+        """
+        Add edges in bulk from (head, tail) pairs or an (N, 2) array. See
+        add_nodes_from.
+
+        If validation is skipped, any missing nodes are implicitly added by
+        networkx and only get their default attributes on update().
+
+        """
+        edges = [tuple(edge) for edge in (edges.tolist() if isinstance(edges, np.ndarray) else edges)]
+        attrs = self._get_bulk_attributes(attrs, len(edges), validate)
+        if validate:
+            for edge in edges:
+                for node in edge:
+                    if node not in self.data:
+                        raise ValueError(f'Node not found: {node}')
+        self.data.add_edges_from((head, tail, {ATTRIBUTES: edge_attrs}) for (head, tail), edge_attrs in zip(edges, attrs))
+        self.edge_attributes.add_rows(zip(edges, attrs))
+
+    def add_faces_from(
+        self,
+        faces: Iterable[tuple[Any, ...]],
+        attrs: Iterable[dict] | None = None,
+        validate: bool = True,
+    ):
+        """
+        Add faces in bulk. See add_nodes_from.
+
+        """
+        faces = [tuple(face) for face in faces]
+        attrs = self._get_bulk_attributes(attrs, len(faces), validate)
+        if validate:
+            for face in faces:
+                for ring in self._get_face_rings(face):
+                    for i in range(len(ring)):
+                        edge = ring[i], ring[(i + 1) % len(ring)]
+                        if edge not in self.data.edges:
+                            raise ValueError(f'Edge not found: {edge}')
+        self.data.graph[FACES].update((face, {ATTRIBUTES: face_attrs}) for face, face_attrs in zip(faces, attrs))
+        self.face_attributes.add_rows(zip(faces, attrs))
 
     def remove_node(self, node: Any):
+
+        # Networkx will drop incident edges along with the node, so clear those
+        # from the maps first.
+        for edge in list(self.data.in_edges(node)) + list(self.data.out_edges(node)):
+            self._remove_edge_from_maps(edge)
+            self.edge_attributes.remove_row(edge)
         self.data.remove_node(node)
+        for node_map in (self.node_to_edges, self.node_to_in_edges, self.node_to_out_edges, self.node_to_faces):
+            node_map.pop(node, None)
+        self._remove_position_row(node)
+        self.node_attributes.remove_row(node)
+        self._discard_selection(self._node_handles, node)
+        self._record_removed(self._node_handles.pop(node, None))
 
     def remove_edge(self, edge: tuple[Any, Any]):
         self.data.remove_edge(*edge)
+        self._remove_edge_from_maps(edge)
+        self.edge_attributes.remove_row(edge)
 
     def remove_face(self, face: tuple[Any, ...]):
         del self.data.graph[FACES][face]
+        self._remove_face_from_maps(face)
+        self.face_attributes.remove_row(face)
+        self._discard_selection(self._face_handles, face)
+        self._record_removed(self._face_handles.pop(face, None))
+
+    def copy_data(self) -> nx.DiGraph:
+        """
+        Return a copy of the networkx graph where each element's attributes
+        dict holds all of its attributes rather than just the overrides, eg for
+        serialization.
+
+        """
+        g = self.data.copy()
+        for node, attrs in g.nodes(data=True):
+            attrs[ATTRIBUTES] = self.node_attributes.get_values(node)
+        for head, tail, attrs in g.edges(data=True):
+            attrs[ATTRIBUTES] = self.edge_attributes.get_values((head, tail))
+        g.graph[FACES] = {
+            face: attrs | {ATTRIBUTES: self.face_attributes.get_values(face)}
+            for face, attrs in self.data.graph[FACES].items()
+        }
+        return g
 
     def load(self, file_path: str | Path):
         """
         NOTE: This makes the assumption that certain keys are a certain type.
         This is bad! We need to define these types in the serialized format.
 
+        Files in the binary format are detected by their magic number and do
+        store their types.
+
         """
+        if binaryformat.is_binary(file_path):
+            self.data = binaryformat.read(file_path)
+            self.update()
+            return
+
         with open(file_path, 'r') as f:
             g = json_graph.node_link_graph(json.load(f))
 
@@ -440,7 +1109,11 @@ class Graph(ContentBase):
         self.update()
 
     def save(self, file_path: str):
-        g = self.data.copy()
+        if Path(file_path).suffix == binaryformat.BINARY_FILE_SUFFIX:
+            binaryformat.write(self.copy_data(), file_path)
+            return
+
+        g = self.copy_data()
 
         # Convert faces to a comma-separated list.
         g.graph[FACES] = {
@@ -1,5 +1,5 @@
 from PySide6.QtCore import QCoreApplication, QLineF, QPointF
-from PySide6.QtGui import QBrush, QPainterPath, QPainterPathStroker, QPen, Qt
+from PySide6.QtGui import QBrush, QColor, QPainterPath, QPainterPathStroker, QPen, Qt
 from PySide6.QtWidgets import QApplication, QGraphicsItem, QGraphicsLineItem, QGraphicsRectItem, QGraphicsPolygonItem, QGraphicsPathItem
 
 from editor.graph import Edge, Node, Face
@@ -11,6 +11,30 @@ from __feature__ import snake_case
 NODE_RADIUS = 2
 
 
+# Pens and brushes are shared between all items drawn with the same style.
+_pens = {}
+_brushes = {}
+
+
+def get_pen(colour: QColor, width: int) -> QPen:
+    key = colour.rgba(), width
+    pen = _pens.get(key)
+    if pen is None:
+        pen = QPen(colour, width)
+        pen.set_cosmetic(True)
+        _pens[key] = pen
+    return pen
+
+
+def get_brush(colour: QColor) -> QBrush:
+    key = colour.rgba()
+    brush = _brushes.get(key)
+    if brush is None:
+        brush = QBrush(colour)
+        _brushes[key] = brush
+    return brush
+
+
 class GraphicsItemBaseMixin:
 
     def __init__(self, element: Node | Edge | Face, *args, **kwargs):
@@ -66,8 +90,7 @@ class NodeGraphicsItem(GraphicsItemBaseMixin, QGraphicsRectItem):
         # TODO: Can possibly abstract this method a bit more.
         colour = self.app().colour_settings.selected_node if self.element().is_selected else self.app().colour_settings.node
         width = 2 if self.element().is_selected else 1
-        self.pen = QPen(colour, width)
-        self.pen.set_cosmetic(True)
+        self.pen = get_pen(colour, width)
         self.set_pen(self.pen)
 
     def bounding_rect(self):
@@ -116,8 +139,7 @@ class EdgeGraphicsItem(GraphicsItemBaseMixin, QGraphicsLineItem):
             colour = self.app().colour_settings.bidirectional_edge
 
         width = 2 if self.element().is_selected else 1
-        self.pen = QPen(colour, width)
-        self.pen.set_cosmetic(True)
+        self.pen = get_pen(colour, width)
         self.set_pen(self.pen)
 
     def get_shape(self):
@@ -164,7 +186,7 @@ class FaceGraphicsItem(GraphicsItemBaseMixin, QGraphicsPathItem):
         colour = self.app().colour_settings.selected_poly if self.element().is_selected else self.app().colour_settings.poly
         self.pen = Qt.NoPen
         self.set_pen(self.pen)
-        self.brush = QBrush(colour)
+        self.brush = get_brush(colour)
         self.set_brush(self.brush)
 
     def get_shape(self):
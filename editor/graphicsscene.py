@@ -2,13 +2,15 @@ import logging
 import math
 import time
 from collections import defaultdict
+from typing import Iterable
 
 from PySide6.QtCore import QCoreApplication, QPointF, QRectF
 from PySide6.QtGui import QPainter, QPen, QColor
-from PySide6.QtWidgets import QApplication, QGraphicsScene
+from PySide6.QtWidgets import QApplication, QGraphicsItem, QGraphicsScene
 
 from applicationframework.document import Document
 from editor.constants import ModalTool, SelectionMode
+from editor.graph import ContentDelta, Edge, Element, Face, Node
 from editor.graphicsitems import EdgeGraphicsItem, NodeGraphicsItem, FaceGraphicsItem
 from editor.graphicsscenetools import (
     CreateEdgesTool,
@@ -100,9 +102,11 @@ class GraphicsScene(QGraphicsScene):
         super().__init__(*args, **kwargs)
 
         self.grid = None
+        self._content = None
         self._node_to_items = defaultdict(set)
         self._node_to_node_item = {}
         self._item_to_nodes = {}
+        self._element_to_item = {}
 
         self.current_tool = None
         self.app().updated.connect(self.update_event)
@@ -186,62 +190,135 @@ class GraphicsScene(QGraphicsScene):
     def snap_to_existing_vertex(self, pos: QPointF):
 
         # TODO: Replace SNAP_TOLERANCE with preference.
+        # Snap to the nearest node within a Manhattan distance of SNAP_TOLERANCE
+        # view pixels. Candidates come from the graph's spatial index, with a
+        # pixel of slack for rounding in map_from_scene.
         view = self.views()[0]
-        for point in self.points:
-            delta_pos = (view.map_from_scene(point) - view.map_from_scene(pos)).manhattan_length()
-            if delta_pos < SNAP_TOLERANCE:
-                return point
-        return None
+        transform = view.transform()
+        radius_x = (SNAP_TOLERANCE + 1) / abs(transform.m11())
+        radius_y = (SNAP_TOLERANCE + 1) / abs(transform.m22())
+        rect = QRectF(pos.x() - radius_x, pos.y() - radius_y, radius_x * 2, radius_y * 2)
+        view_pos = view.map_from_scene(pos)
+        nearest = None
+        nearest_distance = SNAP_TOLERANCE
+        for node in self.app().doc.content.nodes_in_rect(rect):
+            point = node.pos
+            distance = (view.map_from_scene(point) - view_pos).manhattan_length()
+            if distance < nearest_distance:
+                nearest = point
+                nearest_distance = distance
+        return nearest
+
+    def add_element_item(self, element: Element):
+        if isinstance(element, Node):
+            item = NodeGraphicsItem(element)
+            self._node_to_node_item[element] = item
+        elif isinstance(element, Edge):
+            item = EdgeGraphicsItem(element)
+        else:
+            item = FaceGraphicsItem(element)
+        self.add_item(item)
+        self._element_to_item[element] = item
+        item_nodes = element.nodes
+        self._item_to_nodes[item] = set(item_nodes)
+        for node in item_nodes:
+            self._node_to_items[node].add(item)
+
+    def remove_element_item(self, element: Element):
+        item = self._element_to_item.pop(element, None)
+        if item is None:
+            return
+        if isinstance(element, Node):
+            self._node_to_node_item.pop(element, None)
+        for node in self._item_to_nodes.pop(item, ()):
+            items = self._node_to_items.get(node)
+            if items is not None:
+                items.discard(item)
+                if not items:
+                    del self._node_to_items[node]
+        self.remove_item(item)
+
+    def update_element_item(self, element: Element):
+        item = self._element_to_item.get(element)
+        if item is None:
+            return
+        if isinstance(element, Node):
+            x, y = element.pos.to_tuple()
+            for item_ in self._node_to_items.get(element, ()):
+                item_.move_node(element, x, y)
+                item_.invalidate_shapes()
+        item.update_pen()
+
+    def get_element_items(self, elements: Iterable[Element]) -> list[QGraphicsItem]:
+        return [self._element_to_item[element] for element in elements if element in self._element_to_item]
+
+    def restyle_elements(self, elements: Iterable[Element]):
+        for item in self.get_element_items(elements):
+            item.update_pen()
+
+    def rebuild(self, doc: Document):
+        logger.info('Rebuilding QGraphicsScene...')
+        start = time.time()
+
+        self.clear()
+        self._item_to_nodes.clear()
+        self._node_to_items.clear()
+        self._node_to_node_item.clear()
+        self._element_to_item.clear()
+
+        # TODO: Dont draw double edges.
+        for elements in (doc.content.nodes, doc.content.edges, doc.content.faces):
+            for element in elements:
+                self.add_element_item(element)
+
+        self._content = doc.content
+
+        logger.info(f'Rebuilt QGraphicsScene in: {time.time() - start}')
+
+    def apply_content_delta(self, delta: ContentDelta):
+        """
+        Add, remove or update only those items whose elements have changed.
+
+        """
+        for element in delta.removed:
+            self.remove_element_item(element)
+
+        # Add nodes before the edges and faces that reference them.
+        for cls in (Node, Edge, Face):
+            for element in delta.added:
+                if isinstance(element, cls):
+                    self.add_element_item(element)
+
+        for element in delta.modified:
+            self.update_element_item(element)
+
+        # Adding or removing an edge changes whether its reverse is drawn as
+        # bidirectional.
+        self.restyle_elements([
+            (element.data[1], element.data[0])
+            for element in delta.added | delta.removed
+            if isinstance(element, Edge)
+        ])
 
     def update_event(self, doc: Document, flags: UpdateFlag):
         self.block_signals(True)
+        rebuilt = False
         if flags != UpdateFlag.SELECTION and flags != UpdateFlag.SETTINGS:
+            delta = doc.content_delta
+            rebuilt = delta.rebuild or doc.content is not self._content
+            if rebuilt:
+                self.rebuild(doc)
+            else:
+                self.apply_content_delta(delta)
 
-            logger.info('Rebuilding QGraphicsScene...')
-            start = time.time()
-
-            self.clear()
-            self._item_to_nodes.clear()
-            self._node_to_items.clear()
-            self._node_to_node_item.clear()
-            self._element_to_item = {}
-
-            # Quick look-up for all points when vertex-snapping.
-            # NOTE: Can't use set because QPointf doesn't hash, but this shouldn't
-            # contain too many dupes, right..?
-            self.points = []
-
-            for node in doc.content.nodes:
-                node_item = NodeGraphicsItem(node)
-                self.add_item(node_item)
-                self._node_to_node_item[node] = node_item
-                self.points.append(node_item.pos())
-
-            # TODO: Dont draw double edges.
-            for edge in doc.content.edges:
-                edge_item = EdgeGraphicsItem(edge)
-                self.add_item(edge_item)
-
-            for face in doc.content.faces:
-                face_item = FaceGraphicsItem(face)
-                self.add_item(face_item)
-                self._element_to_item[face] = face_item
-
-            # Build node -> item map.
-            # TODO: Put in scene object and update only on doc update.
-            for item in self.items():
-                item_nodes = item.element().nodes
-                self._item_to_nodes[item] = set(item_nodes)
-                for node in item_nodes:
-                    self._node_to_items[node].add(item)
-
-            logger.info(f'Rebuilt QGraphicsScene in: {time.time() - start}')
-
-        else:
-
-            # Update selected pen.
+        # Colours may have changed so restyle everything, otherwise only those
+        # items whose selection has changed. Rebuilt items are already styled.
+        if UpdateFlag.SETTINGS in flags:
             for item in self.items():
                 item.update_pen()
+        elif not rebuilt:
+            delta = doc.selection_delta
+            self.restyle_elements(delta.added | delta.removed)
 
         # TODO: Think this logic through again
         if UpdateFlag.SETTINGS in flags:
@@ -1,6 +1,7 @@
 import math
 from itertools import product
 
+import numpy as np
 from PySide6.QtCore import QCoreApplication, QLineF, QPointF, QRectF, Qt
 from PySide6.QtGui import QColorConstants, QPainter, QPainterPath, QPen, QPolygonF, QTransform
 from PySide6.QtWidgets import (
@@ -12,13 +13,11 @@ from PySide6.QtWidgets import (
     QGraphicsRectItem,
     QGraphicsScene,
 )
-from shapely import box, LineString, MultiPoint, Point
-from shapely.affinity import rotate, scale, translate
+from shapely import box, LineString, Point
 
 from editor import commands
 from editor.constants import SelectionMode
 from editor.graph import Face, Edge, Node
-from editor.graphicsitems import EdgeGraphicsItem
 from editor.maths import percentage_along_line
 
 # noinspection PyUnresolvedReferences
@@ -200,7 +199,7 @@ class SelectXformToolBase(SelectTool):
         super().__init__(*args, **kwargs)
         self._affected_nodes = set()
 
-    def xform_points(self, points: MultiPoint, delta: QPointF) -> MultiPoint:
+    def xform_points(self, points: np.ndarray, delta: QPointF) -> np.ndarray:
         ...
 
     def mouse_press_event(self, event):
@@ -236,12 +235,12 @@ class SelectXformToolBase(SelectTool):
 
         # Do the xform and update graphics items to show.
         nodes = list(self._affected_nodes)
-        points = MultiPoint([node.pos.to_tuple() for node in nodes])
+        points = self.app().doc.content.get_positions(nodes)
         delta = end_point - self._snapped_start_point
         xformed_points = self.xform_points(points, delta)
-        for i, xformed_point in enumerate(xformed_points.geoms):
-            for item in self.scene._node_to_items[nodes[i]]:
-                item.move_node(nodes[i], xformed_point.x, xformed_point.y)
+        for node, (x, y) in zip(nodes, xformed_points):
+            for item in self.scene._node_to_items[node]:
+                item.move_node(node, x, y)
 
     def mouse_release_event(self, event):
         if not self._affected_nodes:
@@ -264,22 +263,25 @@ class SelectXformToolBase(SelectTool):
 
 class MoveTool(SelectXformToolBase):
 
-    def xform_points(self, points: MultiPoint, delta: QPointF) -> MultiPoint:
-        return translate(points, delta.x(), delta.y())
+    def xform_points(self, points: np.ndarray, delta: QPointF) -> np.ndarray:
+        return points + delta.to_tuple()
 
 
 class RotateTool(SelectXformToolBase):
 
-    def xform_points(self, points: MultiPoint, delta: QPointF) -> MultiPoint:
+    def xform_points(self, points: np.ndarray, delta: QPointF) -> np.ndarray:
         radians = math.atan2(delta.y(), delta.x())
-        rotated = rotate(points, math.degrees(radians), origin=self._snapped_start_point.to_tuple())
-        return rotated
+        cos, sin = math.cos(radians), math.sin(radians)
+        origin = np.array(self._snapped_start_point.to_tuple())
+        return (points - origin) @ np.array([[cos, sin], [-sin, cos]]) + origin
 
 
 class ScaleTool(SelectXformToolBase):
 
-    def xform_points(self, points: MultiPoint, delta: QPointF) -> MultiPoint:
-        return scale(points, 1 + delta.x() / 1000, 1 - delta.y() / 1000, origin=self._snapped_start_point.to_tuple())
+    def xform_points(self, points: np.ndarray, delta: QPointF) -> np.ndarray:
+        origin = np.array(self._snapped_start_point.to_tuple())
+        factor = np.array([1 + delta.x() / 1000, 1 - delta.y() / 1000])
+        return (points - origin) * factor + origin
 
 
 class CreateNodeTool(GraphicsSceneToolBase):
@@ -431,13 +433,22 @@ class SplitFacesTool(GraphicsSceneToolBase):
                 return a, b
 
     def _get_foo(self, pos: QPointF):
-        hit_item = self.scene.item_at(pos, QTransform())
 
-        # TODO: Better way to check whether its an edge.
-        if isinstance(hit_item, EdgeGraphicsItem):
-            edge = hit_item.element()
+        # Hit the closest edge within the same selectable thickness as the edge
+        # items, using the graph's spatial index.
+        scale = self.scene.views()[0].transform().m11()
+        radius = self.app().general_settings.edge_selectable_thickness / 2 / scale
+        rect = QRectF(pos.x() - radius, pos.y() - radius, radius * 2, radius * 2)
+        pt = Point(pos.to_tuple())
+        hit = None
+        for edge in self.app().doc.content.edges_in_rect(rect):
             line = LineString([edge.head.pos.to_tuple(), edge.tail.pos.to_tuple()])
-            pt = Point(pos.to_tuple())
+            distance = line.distance(pt)
+            if distance <= radius and (hit is None or distance < hit[0]):
+                hit = distance, edge, line
+
+        if hit is not None:
+            _, edge, line = hit
             projected_pt = line.interpolate(line.project(pt))
             return edge, QPointF(projected_pt.x, projected_pt.y)
 
@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Mapping
+
+
+class LazyMapping(Mapping):
+
+    """
+    Read-only mapping sharing the keys of a source mapping whose values are
+    only built by the factory the first time they are accessed.
+
+    If max_size is given the least recently used values are evicted once that
+    many have been built, and are rebuilt should they be accessed again.
+
+    """
+
+    def __init__(self, source: Mapping, factory: Callable[[Any], Any], max_size: int | None = None):
+        self.source = source
+        self.factory = factory
+        self.max_size = max_size
+        self._cache = OrderedDict()
+
+    def __getitem__(self, key: Any) -> Any:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        if key not in self.source:
+            raise KeyError(key)
+        value = self._cache[key] = self.factory(key)
+        if self.max_size is not None and len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.source)
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.source
+
+    @property
+    def num_cached(self) -> int:
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
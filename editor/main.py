@@ -8,13 +8,14 @@ import marshmallow_dataclass
 import qdarktheme
 from PySide6.QtCore import QModelIndex, Qt
 from PySide6.QtGui import QAction, QActionGroup, QKeySequence
-from PySide6.QtWidgets import QDockWidget, QFileDialog, QVBoxLayout, QWidget
+from PySide6.QtWidgets import QApplication, QDockWidget, QFileDialog, QInputDialog, QVBoxLayout, QWidget
 
+from adaptors.base import AdaptorBase
 from adaptors.manager import AdaptorManager
 from applicationframework.application import Application
 from applicationframework.document import Document
 from applicationframework.mainwindow import MainWindow as MainWindowBase
-from editor import commands
+from editor import commands, tracing, triangulation
 from editor.cleanupgeometrydialog import CleanUpGeometryDialog
 from editor.clipboard import Clipboard
 from editor.constants import MapFormat, ModalTool, SelectionMode
@@ -61,6 +62,73 @@ EXPORTERS = {
 }
 
 
+def create_content() -> Graph:
+    content = Graph(foo=True)
+
+    # content.add_node_attribute_definition('x', 0)
+    # content.add_node_attribute_definition('y', 0)
+    # content.add_node_attribute_definition('bar', 2)
+    # content.add_edge_attribute_definition('baz', 3.0)
+    # content.add_face_attribute_definition('qux', 'four')
+
+    # TODO: Move this somewhere else / add method of indirection.
+    for attr_name, attr_default in {
+        'cstat': 0,
+        'pal': 0,
+        'shade': 0,
+        'xrepeat': 0,
+        'yrepeat': 0,
+        'xpanning': 0,
+        'ypanning': 0,
+        'lotag': 0,
+        'hitag': 0,
+        'extra': -1,
+        'low_tex': Texture(0),
+        'mid_tex': Texture(0),
+        'top_tex': Texture(0),
+    }.items():
+        content.add_edge_attribute_definition(attr_name, attr_default)
+
+    for attr_name, attr_default in {
+        'ceilingz': 0,
+        'floorz': 0,
+        'ceilingstat': 0,
+        'floorstat': 0,
+        'ceilingheinum': 0,
+        'ceilingshade': 0,
+        'ceilingpal': 0,
+        'ceilingxpanning': 0,
+        'ceilingypanning': 0,
+        'floorheinum': 0,
+        'floorshade': 0,
+        'floorpal': 0,
+        'floorxpanning': 0,
+        'floorypanning': 0,
+        'visibility': 0,
+        'filler': 0,
+        'lotag': 0,
+        'hitag': 0,
+        'extra': -1,
+        'floor_tex': Texture(0),
+        'ceiling_tex': Texture(0),
+    }.items():
+        content.add_face_attribute_definition(attr_name, attr_default)
+
+    # Sensible default values.
+    content.add_edge_attribute_definition('shade', 1)
+    content.add_edge_attribute_definition('xrepeat', 32)
+    content.add_edge_attribute_definition('yrepeat', 32)
+    content.add_face_attribute_definition('floorz', 0)
+    content.add_face_attribute_definition('ceilingz', 1024)
+    content.add_face_attribute_definition('ceilingshade', 0.9)
+    content.add_face_attribute_definition('floorshade', 0.9)
+
+    # For rooms
+    #content.add_edge_attribute_definition('door', False)
+
+    return content
+
+
 class MainWindow(MainWindowBase):
 
     """
@@ -88,6 +156,10 @@ class MainWindow(MainWindowBase):
         self.view_3d = Viewport()
         self.property_grid = PropertyGrid()
         self.property_grid.model().dataChanged.connect(self.on_data_changed)
+        self.app().adaptor_manager.loader.progress.connect(self.on_resources_progress)
+        self.app().adaptor_manager.loader.cancelled.connect(self.on_resources_stopped)
+        self.app().adaptor_manager.loader.failed.connect(self.on_resources_stopped)
+        self.app().adaptor_manager.loader.finished.connect(self.status_bar().clear_message)
 
         # Moving openGl widget sometimes crashes :/
         wrapper = QWidget()
@@ -167,6 +239,7 @@ class MainWindow(MainWindowBase):
         # File actions.
         self.import_action = QAction(self.get_icon('arrow-transition-270.png', icons_path=self.local_icons_path), '&Import...', self)
         self.export_action = QAction(self.get_icon('arrow-transition.png', icons_path=self.local_icons_path), '&Export...', self)
+        self.batch_import_action = QAction('Import All &Doom Maps...', self)
 
         # Edit actions.
         # TODO: Should preferences be in base class?
@@ -262,6 +335,7 @@ class MainWindow(MainWindowBase):
         # File actions.
         self.import_action.triggered.connect(self.import_event)
         self.export_action.triggered.connect(self.export_event)
+        self.batch_import_action.triggered.connect(self.batch_import_event)
 
         # Edit actions.
         self.show_preferences_action.triggered.connect(self.show_preferences)
@@ -305,6 +379,7 @@ class MainWindow(MainWindowBase):
         # File menu.
         self.file_menu.insert_action(self.exit_action, self.import_action)
         self.file_menu.insert_action(self.exit_action, self.export_action)
+        self.file_menu.insert_action(self.exit_action, self.batch_import_action)
         self.file_menu.insert_separator(self.exit_action)
 
         # Edit actions.
@@ -348,69 +423,7 @@ class MainWindow(MainWindowBase):
             tool_bar.add_action(action)
 
     def create_document(self, file_path: str = None) -> Document:
-        content = Graph(foo=True)
-
-        # content.add_node_attribute_definition('x', 0)
-        # content.add_node_attribute_definition('y', 0)
-        # content.add_node_attribute_definition('bar', 2)
-        # content.add_edge_attribute_definition('baz', 3.0)
-        # content.add_face_attribute_definition('qux', 'four')
-
-        # TODO: Move this somewhere else / add method of indirection.
-        for attr_name, attr_default in {
-            'cstat': 0,
-            'pal': 0,
-            'shade': 0,
-            'xrepeat': 0,
-            'yrepeat': 0,
-            'xpanning': 0,
-            'ypanning': 0,
-            'lotag': 0,
-            'hitag': 0,
-            'extra': -1,
-            'low_tex': Texture(0),
-            'mid_tex': Texture(0),
-            'top_tex': Texture(0),
-        }.items():
-            content.add_edge_attribute_definition(attr_name, attr_default)
-
-        for attr_name, attr_default in {
-            'ceilingz': 0,
-            'floorz': 0,
-            'ceilingstat': 0,
-            'floorstat': 0,
-            'ceilingheinum': 0,
-            'ceilingshade': 0,
-            'ceilingpal': 0,
-            'ceilingxpanning': 0,
-            'ceilingypanning': 0,
-            'floorheinum': 0,
-            'floorshade': 0,
-            'floorpal': 0,
-            'floorxpanning': 0,
-            'floorypanning': 0,
-            'visibility': 0,
-            'filler': 0,
-            'lotag': 0,
-            'hitag': 0,
-            'extra': -1,
-            'floor_tex': Texture(0),
-            'ceiling_tex': Texture(0),
-        }.items():
-            content.add_face_attribute_definition(attr_name, attr_default)
-
-        # Sensible default values.
-        content.add_edge_attribute_definition('shade', 1)
-        content.add_edge_attribute_definition('xrepeat', 32)
-        content.add_edge_attribute_definition('yrepeat', 32)
-        content.add_face_attribute_definition('floorz', 0)
-        content.add_face_attribute_definition('ceilingz', 1024)
-        content.add_face_attribute_definition('ceilingshade', 0.9)
-        content.add_face_attribute_definition('floorshade', 0.9)
-
-        # For rooms
-        #content.add_edge_attribute_definition('door', False)
-
+        content = create_content()
         return Document(file_path, content, UpdateFlag)
 
     def on_tool_action_group(self):
@@ -489,17 +502,23 @@ class MainWindow(MainWindowBase):
         prop = index.internal_pointer()
         commands.set_attributes(prop.object(), prop.name(), prop.value())
 
+    def on_resources_progress(self, num_done: int, num_textures: int):
+        if num_textures:
+            self.status_bar().show_message(f'Loading textures ({num_done}/{num_textures})...')
+        else:
+            self.status_bar().show_message('Loading textures...')
+
+    def on_resources_stopped(self, adaptor: AdaptorBase):
+
+        # A load replaced by a newer one stops after the new one has started,
+        # so leave the new load's progress message alone.
+        if not self.app().adaptor_manager.loader.is_loading:
+            self.status_bar().clear_message()
+
     def frame_selection(self):
 
-        # Gross. We obviously need to keep better track of the mapping between
-        # items and elements, but then items can change when we do a full scene
-        # rebuild.
         # TODO: Allow framing independently on either viewport.
-        items = [
-            item
-            for item in self.scene.items()
-            if item.element().is_selected
-        ]
+        items = self.scene.get_element_items(self.app().doc.selected_elements)
         items = items or self.scene.items()
         self.view_2d.frame(items)
         self.view_3d.frame(items)
@@ -534,8 +553,35 @@ class MainWindow(MainWindowBase):
             return False
 
         map_format = MapFormat(file_format)
-        IMPORTERS[map_format](self.app().doc.content, file_path, MapFormat(file_format))
-        self.app().doc.updated(self.app().doc.default_flags & ~UpdateFlag.ADAPTOR_TEXTURES, dirty=True)
+        kwargs = {}
+        if map_format == MapFormat.DOOM:
+            map_names = list(doom.read_map_catalogue(file_path))
+            if len(map_names) > 1:
+                map_name, ok = QInputDialog.get_item(self, 'Import', 'Map:', map_names, 0, False)
+                if not ok:
+                    return False
+                kwargs['map_name'] = map_name
+        IMPORTERS[map_format](self.app().doc.content, file_path, MapFormat(file_format), **kwargs)
+        self.app().doc.updated(
+            self.app().doc.default_flags & ~UpdateFlag.ADAPTOR_TEXTURES & ~UpdateFlag.ADAPTOR_RESOURCES,
+            dirty=True,
+        )
+
+    def batch_import_event(self):
+        file_path, _ = QFileDialog.get_open_file_name(caption='Import All Doom Maps', filter=MapFormat.DOOM.value)
+        if not file_path:
+            return False
+        output_dir = QFileDialog.get_existing_directory(caption='Save Maps To')
+        if not output_dir:
+            return False
+
+        # Each map is saved as a document in the output directory.
+        QApplication.set_override_cursor(Qt.WaitCursor)
+        try:
+            file_paths = doom.batch_import_doom(file_path, output_dir, create_content)
+        finally:
+            QApplication.restore_override_cursor()
+        logger.info(f'Imported {len(file_paths)} maps to: {output_dir}')
 
     def export_event(self):
         file_formats = ';;'.join([fmt.value for fmt in MapFormat])
@@ -555,13 +601,15 @@ if __name__ == '__main__':
         '--log-level',
         default='INFO',
         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
-        help='Set the logging level (default: INFO)'
+        help=f'Set the logging level (default: INFO). DEBUG also enables import / export tracing, as does setting {tracing.ENV_VAR}'
     )
     args = parser.parse_args()
     log_level = getattr(logging, args.log_level.upper(), logging.INFO)
     logging.basicConfig(level=log_level)
+    tracing.configure()
 
     app = Application(DEFAULT_COMPANY_NAME, DEFAULT_APP_NAME, sys.argv)
+    app.about_to_quit.connect(triangulation.shutdown)
     qdarktheme.setup_theme()
     window = MainWindow()
     window.show()
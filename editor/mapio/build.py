@@ -6,9 +6,10 @@ from typing import Any
 
 import numpy as np
 
-from editor.constants import ATTRIBUTES, MapFormat
+from editor.constants import MapFormat
 from editor.graph import Edge, Face, Graph
 from editor.texture import Texture
+from editor.tracing import Trace
 from gameengines.build.blood import Map as BloodMap, MapReader as BloodMapReader, MapWriter as BloodMapWriter
 from gameengines.build.duke3d import Map as Duke3dMap, MapReader as Duke3dMapReader, MapWriter as Duke3dMapWriter
 from gameengines.build.map import Sector, Wall
@@ -138,19 +139,12 @@ def import_build(graph: Graph, file_path: str | Path, format: MapFormat):
         MapFormat.BLOOD: BloodMapReader,
         MapFormat.DUKE_3D: Duke3dMapReader,
     }[format]
+    trace = Trace('import_build')
     with open(file_path, 'rb') as f:
         m = map_reader_cls()(f)
-
-    print('\nheader')
-    print(m.header)
-
-    print('\nwalls')
-    for i, wall in enumerate(m.walls):
-        print(i, wall)
-
-    print('\nsectors')
-    for i, sector in enumerate(m.sectors):
-        print(i, sector)
+    trace.mark('read')
+    trace.count('walls', len(m.walls))
+    trace.count('sectors', len(m.sectors))
 
     # Still not sure how this actually works :lol.
     wall_to_walls = defaultdict(set)
@@ -162,48 +156,37 @@ def import_build(graph: Graph, file_path: str | Path, format: MapFormat):
             wall_set.add(wall_idx)
             wall_to_walls[wall_idx] = wall_to_walls[nextwall_data.point2] = wall_set
 
-    print('\nwall_to_walls')
-    for wall in sorted(wall_to_walls):
-        print(wall, '->', wall_to_walls[wall])
-
     wall_to_node = {}
     nodes = set()
     for wall_dx, other_walls in wall_to_walls.items():
         node = wall_to_node[wall_dx] = frozenset(other_walls)
         nodes.add(node)
+    trace.mark('merge walls')
 
-    for node in nodes:
-        graph.data.add_node(node)
-
-    print('\nwall_to_node')
-    for wall in sorted(wall_to_node):
-        print(wall, '->', wall_to_node[wall])
-
-    print('\nnodes')
-    for node in graph.data.nodes:
-        print(node)
-
-    # Add edges.
+    # Need to set each node's position from the walls it heads.
+    node_attrs = {node: {} for node in nodes}
+    edges = []
+    edge_attrs = []
     for wall, wall_data in enumerate(m.walls):
         head = wall_to_node[wall]
         tail = wall_to_node[wall_data.point2]
-        graph.data.add_edge(head, tail)
-
-        # Need to set the head data.
-        graph.data.nodes[head].setdefault(ATTRIBUTES, {})['x'] = wall_data.x
-        graph.data.nodes[head].setdefault(ATTRIBUTES, {})['y'] = wall_data.y
+        node_attrs[head]['x'] = wall_data.x
+        node_attrs[head]['y'] = wall_data.y
+        edges.append((head, tail))
+        edge_attrs.append(map_wall_to_edge(wall_data))
 
-        graph.data.edges[(head, tail)].setdefault(ATTRIBUTES, {})
+    graph.add_nodes_from(node_attrs.keys(), node_attrs.values(), validate=False)
+    trace.count('nodes', len(node_attrs))
 
-        edge_attrs = map_wall_to_edge(wall_data)
-        graph.data.edges[(head, tail)][ATTRIBUTES].update(edge_attrs)
-
-    print('\nedges')
-    for edge in graph.data.edges:
-        print(edge)
+    # Add edges.
+    graph.add_edges_from(edges, edge_attrs, validate=False)
+    trace.count('edges', len(edges))
+    trace.mark('nodes / edges')
 
     # Add sectors.
     # TODO: Sort based on size.
+    faces = []
+    face_attrs = []
     for j, sector in enumerate(m.sectors):
         sector_wall_idxs = [[]]
         ring_start_idx = wall_idx = sector.wallptr
@@ -217,20 +200,15 @@ def import_build(graph: Graph, file_path: str | Path, format: MapFormat):
                     sector_wall_idxs.append([])
 
         sorted_sector_wall_idxs = sorted(sector_wall_idxs, key=lambda x: get_ring_bounds(m, x), reverse=True)
-        face_attrs = map_sector_to_face(sector)
-        graph.add_face(tuple([wall_to_node[node] for face_ring in sorted_sector_wall_idxs for node in face_ring]), **face_attrs)
+        faces.append(tuple([wall_to_node[node] for face_ring in sorted_sector_wall_idxs for node in face_ring]))
+        face_attrs.append(map_sector_to_face(sector))
+    graph.add_faces_from(faces, face_attrs, validate=False)
+    trace.count('faces', len(faces))
+    trace.mark('faces')
 
     graph.update()
-
-    print('\nnodes:')
-    for node in graph.nodes:
-        print('    ->', node, node.pos)
-    print('\nedges:')
-    for edge in graph.edges:
-        print('    ->', edge, '->', edge.face)
-    print('\nfaces:')
-    for face in graph.faces:
-        print('    ->', face)
+    trace.mark('update')
+    trace.done()
 
 
 def export_build(graph: Graph, file_path: str, format: MapFormat):
@@ -240,14 +218,18 @@ def export_build(graph: Graph, file_path: str, format: MapFormat):
         MapFormat.DUKE_3D: Duke3dMap,
     }[format]
     m = map_cls()
+    trace = Trace('export_build')
 
+    # Walls and sectors are numbered in the order they're written, so map
+    # edges and faces to their indices up front.
     edges = []
+    edge_to_wall = {}
     edge_to_next_edge = {}
+    face_to_sector = {}
 
     wallptr = 0
-    sector = 0
-    faces = list(graph.faces)
-    for face in faces:
+    for face in graph.faces:
+        face_to_sector[face] = len(m.sectors)
         sector_attrs = map_face_to_sector(face)
         sector_data = Sector(**sector_attrs)
         sector_data.wallptr = wallptr
@@ -256,49 +238,30 @@ def export_build(graph: Graph, file_path: str, format: MapFormat):
             for i, edge in enumerate(ring.edges):
                 wall_attrs = map_edge_to_wall(edge)
                 wall_data = Wall(**wall_attrs)
-                logger.debug(f'Added wall: {wall_data}')
+                edge_to_wall.setdefault(edge, len(edges))
                 edges.append(edge)
                 m.walls.append(wall_data)
                 edge_to_next_edge[edge] = ring.edges[(i + 1) % len(ring.edges)]
         m.sectors.append(sector_data)
-        sector += 1
         wallptr += len(face.nodes)
 
     m.cursectnum = 0
-
-    # print('\nedge_map:')
-    # for foo, bar in edge_map.items():
-    #     print(foo, '->', bar)
-
-    # Now we have all walls, go back through and fixup the point2.
-    for wall, edge in enumerate(edges):
-        wall_data = m.walls[wall]
-        next_edge = edge_to_next_edge[edge]
-        wall_data.point2 = edges.index(next_edge)
-
-    # Do portals.
-    for wall, edge in enumerate(edges):
-        head, tail = edge.head, edge.tail
-        if graph.has_edge(tail, head):
-            redge = graph.get_edge(tail, head)
-            try:
-                next_sector = faces.index(redge.face)
-            except:
-                continue
-            wall_data = m.walls[wall]
-            wall_data.nextsector = next_sector
-            wall_data.nextwall = edges.index(redge)
-
-    print('\nheader')
-    print(m.header)
-
-    print('\nwalls')
-    for wall in m.walls:
-        print(wall)
-
-    print('\nsectors')
-    for sector in m.sectors:
-        print(sector)
+    trace.mark('walls / sectors')
+    trace.count('walls', len(m.walls))
+    trace.count('sectors', len(m.sectors))
+
+    # Now we have all walls, go back through and fixup the point2 and portals.
+    for wall_data, edge in zip(m.walls, edges):
+        wall_data.point2 = edge_to_wall[edge_to_next_edge[edge]]
+        redge = edge.reversed
+        if redge is None:
+            continue
+        next_sector = face_to_sector.get(redge.face)
+        if next_sector is None:
+            continue
+        wall_data.nextsector = next_sector
+        wall_data.nextwall = edge_to_wall[redge]
+    trace.mark('portals')
 
     output = io.BytesIO()
     map_writer_cls = {
@@ -308,3 +271,5 @@ def export_build(graph: Graph, file_path: str, format: MapFormat):
     map_writer_cls()(m, output)
     with open(file_path, 'wb') as f:
         f.write(output.getbuffer())
+    trace.mark('write')
+    trace.done()
@@ -1,16 +1,26 @@
 import logging
-from collections import defaultdict
+import multiprocessing
+import struct
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable
 
 import numpy as np
 import omg
 from omg import WAD, MapEditor
-from omg.mapedit import Vertex, Linedef, Sidedef, Sector, Thing
+from omg.mapedit import Linedef, Sidedef, Sector, Thing
+from omg.util import safe_name
 
+from editor import binaryformat
 from editor.constants import MapFormat
-from editor.graph import Edge, Face, Graph
+from editor.graph import Graph
 from editor.texture import Texture
+from editor.tracing import Trace
+
+
+logger = logging.getLogger(__name__)
 
 
 def get_ring_bounds(m, ring: list[Any]) -> tuple:
@@ -40,69 +50,67 @@ def map_sector_to_face(sector: Sector, global_scale):
     }
 
 
-def map_face_to_sector(face: Face, global_scale: float):
-    """
-    NOTE: Casting to string in case the textures originally came from an engine
-    that used integers to index their textures.
-
+def map_textures_to_names(textures: Iterable[Texture]) -> np.ndarray:
     """
-    attrs = face.get_attributes()
-    return {
-        'z_floor': int(attrs['floorz'] * global_scale),
-        'z_ceil': int(attrs['ceilingz'] * global_scale),
-        'tx_floor': str(attrs['floor_tex'].value),
-        'tx_ceil': str(attrs['ceiling_tex'].value),
-    }
+    Map textures to lump-safe names, converting each distinct texture only once.
 
-
-def map_edge_to_side(edge: Edge, face_to_index: dict):
-    """
     NOTE: Casting to string in case the textures originally came from an engine
     that used integers to index their textures.
 
     """
-    edge_attrs = edge.get_attributes()
-    attrs = {
-        'off_x': 0,
-        'off_y': 0,
-        'sector': face_to_index[edge.face],
-    }
-    if edge.reversed is None:
-        attrs['tx_mid'] = str(edge_attrs['mid_tex'].value)
-    else:
-        attrs['tx_up'] = str(edge_attrs['top_tex'].value)
-        attrs['tx_low'] = str(edge_attrs['low_tex'].value)
-    return attrs
+    value_to_name = {}
+    names = []
+    for texture in textures:
+        name = value_to_name.get(texture.value)
+        if name is None:
+            name = value_to_name[texture.value] = safe_name(str(texture.value)).encode('ascii')
+        names.append(name)
+    return np.array(names, dtype='S8')
 
 
 def order_tuples_into_chains(tuples):
-    if not tuples:
-        return []
+    """
+    Order edges into chains by following each edge's tail to an unused edge
+    with the same head. Closed chains end by repeating their first edge.
 
-    unused = set(tuples)
-    chains = []
+    Edges are indexed by head so each step is O(1). Each chain starts from the
+    first unused edge, and where several unused edges leave the same vertex
+    they're taken in input order, so the result is deterministic.
 
-    while unused:
-        # Pick a starting tuple
-        current = unused.pop()
+    """
+    tuples = list(tuples)
+    heads = [t.head for t in tuples]
+    tails = [t.tail for t in tuples]
+    head_to_indices = defaultdict(deque)
+    for i, head in enumerate(heads):
+        head_to_indices[head].append(i)
+
+    used = [False] * len(tuples)
+    chains = []
+    for start, current in enumerate(tuples):
+        if used[start]:
+            continue
+        used[start] = True
         chain = [current]
 
         # Extend forward
+        tail = tails[start]
         while True:
-            last = chain[-1]
-            next_tuple = None
-            for t in list(unused):
-                if t.head == last.tail:
-                    next_tuple = t
-                    break
-            if not next_tuple:
+
+            # Drop edges already used by another chain.
+            candidates = head_to_indices.get(tail)
+            while candidates and used[candidates[0]]:
+                candidates.popleft()
+            if not candidates:
                 break
-            chain.append(next_tuple)
-            unused.remove(next_tuple)
+            i = candidates.popleft()
+            used[i] = True
+            chain.append(tuples[i])
+            tail = tails[i]
 
             # Loop closed?
-            if chain[-1].tail == chain[0].head:
-                chain.append(chain[0])
+            if tail == heads[start]:
+                chain.append(current)
                 break
 
         chains.append(chain)
@@ -110,24 +118,160 @@ def order_tuples_into_chains(tuples):
     return chains
 
 
-def import_doom(graph: Graph, file_path: str | Path, format: MapFormat):
+# Lumps that can follow a map's header lump in a classic format map, and the
+# subset of those needed to build a graph. BEHAVIOR is only used to detect
+# Hexen format linedefs.
+CLASSIC_MAP_LUMPS = (
+    'THINGS', 'LINEDEFS', 'SIDEDEFS', 'VERTEXES', 'SEGS', 'SSECTORS', 'NODES', 'SECTORS', 'REJECT', 'BLOCKMAP',
+    'BEHAVIOR', 'SCRIPTS',
+)
+CLASSIC_GEOMETRY_LUMPS = ('VERTEXES', 'LINEDEFS', 'SIDEDEFS', 'SECTORS', 'BEHAVIOR')
+
+# Type, number of lumps, directory offset.
+_WAD_HEADER = struct.Struct('<4sII')
+
+# Offset, size, name.
+_WAD_ENTRY = struct.Struct('<II8s')
+
+# Doom format lump records, laid out as per omgifol's structs so lumps can be
+# written straight from arrays.
+VERTEX_DTYPE = np.dtype([('x', '<i2'), ('y', '<i2')])
+LINEDEF_DTYPE = np.dtype([
+    ('vx_a', '<u2'),
+    ('vx_b', '<u2'),
+    ('flags', '<u2'),
+    ('action', '<u2'),
+    ('tag', '<u2'),
+    ('front', '<u2'),
+    ('back', '<u2'),
+])
+SIDEDEF_DTYPE = np.dtype([
+    ('off_x', '<i2'),
+    ('off_y', '<i2'),
+    ('tx_up', 'S8'),
+    ('tx_low', 'S8'),
+    ('tx_mid', 'S8'),
+    ('sector', '<u2'),
+])
+SECTOR_DTYPE = np.dtype([
+    ('z_floor', '<i2'),
+    ('z_ceil', '<i2'),
+    ('tx_floor', 'S8'),
+    ('tx_ceil', 'S8'),
+    ('light', '<u2'),
+    ('type', '<u2'),
+    ('tag', '<u2'),
+])
+
+
+@dataclass
+class WadMap:
+
+    """
+    A map in a WAD's directory, with the offset and size of each of its lumps.
+
+    """
+
+    name: str
+    lumps: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+    @property
+    def is_udmf(self) -> bool:
+        return 'TEXTMAP' in self.lumps
+
+
+def read_map_catalogue(file_path: str | Path) -> dict[str, WadMap]:
+    """
+    List the maps in a WAD, in directory order. Only the directory is read, not
+    any lump data.
+
+    """
+    with open(file_path, 'rb') as f:
+        wad_type, num_entries, directory_offset = _WAD_HEADER.unpack(f.read(_WAD_HEADER.size))
+        if wad_type not in (b'IWAD', b'PWAD'):
+            raise ValueError(f'Not a WAD file: {file_path}')
+        f.seek(directory_offset)
+        directory = f.read(num_entries * _WAD_ENTRY.size)
+    entries = [
+        (name.rstrip(b'\0').decode('ascii', errors='replace').upper(), offset, size)
+        for offset, size, name in _WAD_ENTRY.iter_unpack(directory)
+    ]
+    names = [name for name, _, _ in entries]
+
+    # Maps are found the same way omgifol does it, ie a header lump followed by
+    # THINGS and LINEDEFS, or by TEXTMAP for UDMF maps.
+    maps = {}
+    i = 0
+    while i < len(entries) - 1:
+        wad_map = WadMap(names[i])
+        j = i + 1
+        if names[j] == 'TEXTMAP':
+            while j < len(entries) and names[j] != 'ENDMAP':
+                wad_map.lumps[names[j]] = entries[j][1:]
+                j += 1
+        elif names[j:j + 2] == ['THINGS', 'LINEDEFS']:
+            while j < len(entries) and names[j] in CLASSIC_MAP_LUMPS and names[j] not in wad_map.lumps:
+                wad_map.lumps[names[j]] = entries[j][1:]
+                j += 1
+        else:
+            i += 1
+            continue
+        maps[wad_map.name] = wad_map
+        i = j
+    return maps
+
+
+def load_map(file_path: str | Path, wad_map: WadMap) -> omg.UMapEditor:
+    """
+    Load a map from a WAD, reading only the lumps needed to build its geometry.
+
+    """
+    lump_names = ('TEXTMAP',) if wad_map.is_udmf else CLASSIC_GEOMETRY_LUMPS
+    lumps = {'_HEADER_': omg.Lump(b'')}
+    with open(file_path, 'rb') as f:
+        for name in lump_names:
+            if name not in wad_map.lumps:
+                continue
+            offset, size = wad_map.lumps[name]
+            f.seek(offset)
+            lumps[name] = omg.Lump(f.read(size))
 
+    # Things aren't imported, so don't decode them.
+    if not wad_map.is_udmf:
+        lumps['THINGS'] = omg.Lump(b'')
+    return omg.UMapEditor(lumps)
+
+
+def import_doom(graph: Graph, file_path: str | Path, format: MapFormat, map_name: str | None = None):
+    """
+    Import a map from a WAD, by default the first one.
+
+    """
     global_scale = 14
 
-    # TODO: Support wadded level selection.
-    wad = omg.WAD()
-    wad.from_file(file_path)
-    m = omg.UMapEditor(wad.maps['E1M1'])
+    trace = Trace('import_doom')
+    catalogue = read_map_catalogue(file_path)
+    if not catalogue:
+        raise ValueError(f'No maps found: {file_path}')
+    if map_name is None:
+        map_name = next(iter(catalogue))
+    if map_name not in catalogue:
+        raise ValueError(f'Map not found: {map_name}')
+    m = load_map(file_path, catalogue[map_name])
+    trace.mark('read')
+    trace.count('vertexes', len(m.vertexes))
+    trace.count('linedefs', len(m.linedefs))
+    trace.count('sectors', len(m.sectors))
 
     # Nodes.
-    nodes = []
-    for i, vertex in enumerate(m.vertexes):
-        node = graph.add_node(i, x=vertex.x * global_scale, y=vertex.y * global_scale)
-        nodes.append(node)
+    positions = np.array([(vertex.x, vertex.y) for vertex in m.vertexes], dtype=np.float64).reshape(-1, 2)
+    graph.add_nodes_from(range(len(m.vertexes)), positions=positions * global_scale, validate=False)
 
     # Edges.
     # We change the lighting just a bit to make things visible, otherwise apparently
     # there is no per-wall lighting.
+    edges = []
+    edge_attrs = []
     sector_idx_to_edges = defaultdict(list)
     for i, line in enumerate(m.linedefs):
         for reverse, side_idx in enumerate((line.sidefront, line.sideback)):
@@ -139,81 +283,192 @@ def import_doom(graph: Graph, file_path: str | Path, format: MapFormat):
             side = m.sidedefs[side_idx]
             sector_idx = side.sector
             sector = m.sectors[sector_idx]
-            edge_attrs = map_wall_to_edge(side, sector)
-            edge = graph.add_edge((head, tail), **edge_attrs)
-            sector_idx_to_edges[sector_idx].append(edge)
-
-    for sector_idx, edges in sector_idx_to_edges.items():
+            edges.append((head, tail))
+            edge_attrs.append(map_wall_to_edge(side, sector))
+            sector_idx_to_edges[sector_idx].append((head, tail))
+    graph.add_edges_from(edges, edge_attrs, validate=False)
+    trace.mark('nodes / edges')
+
+    faces = []
+    face_attrs = []
+    for sector_idx, sector_edges in sector_idx_to_edges.items():
         sector = m.sectors[sector_idx]
-        rings = order_tuples_into_chains(edges)
-        face_attrs = map_sector_to_face(sector, global_scale)
+        rings = order_tuples_into_chains([graph.get_edge(*edge) for edge in sector_edges])
         sorted_rings = sorted(rings, key=lambda r: get_ring_bounds(m, r), reverse=True)
-        graph.add_face(tuple([node.head.data for ring in sorted_rings for node in ring]), **face_attrs)
+        faces.append(tuple([node.head.data for ring in sorted_rings for node in ring]))
+        face_attrs.append(map_sector_to_face(sector, global_scale))
+    graph.add_faces_from(faces, face_attrs, validate=False)
+    trace.mark('faces')
 
     graph.update()
+    trace.mark('update')
+    trace.done()
+
+
+def _import_doom_to_file(
+    file_path: str,
+    map_name: str,
+    output_path: str,
+    create_graph: Callable[[], Graph],
+) -> str:
+    graph = create_graph()
+    import_doom(graph, file_path, MapFormat.DOOM, map_name)
+    graph.save(output_path)
+    return output_path
+
+
+def batch_import_doom(
+    file_path: str | Path,
+    output_dir: str | Path,
+    create_graph: Callable[[], Graph] = Graph,
+    suffix: str = binaryformat.BINARY_FILE_SUFFIX,
+    max_workers: int | None = None,
+) -> dict[str, Path]:
+    """
+    Import every map in a WAD into its own document in the output directory,
+    named after the map. Maps are imported in parallel worker processes, so
+    create_graph must be picklable, eg a module-level function.
 
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Spawn rather than fork, as forking a process running Qt isn't safe.
+    mp_context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+        futures = {
+            map_name: executor.submit(
+                _import_doom_to_file,
+                str(file_path),
+                map_name,
+                str(output_dir.joinpath(f'{map_name}{suffix}')),
+                create_graph,
+            )
+            for map_name in read_map_catalogue(file_path)
+        }
+        return {map_name: Path(future.result()) for map_name, future in futures.items()}
 
-def export_doom(graph: Graph, file_path: str | Path, format: MapFormat):
 
-    global_scale = 1/ 14
+def set_field(records: np.ndarray, name: str, values: np.ndarray, get_element: Callable[[int], Any]):
+    """
+    Assign values to an integer field of a lump's records. Raise if any value
+    doesn't fit the field, rather than letting numpy silently wrap it.
 
-    # Assign indices.
-    node_to_index = {node: i for i, node in enumerate(graph.nodes)}
-    edge_to_index = {edge: i for i, edge in enumerate(graph.edges)}
-    face_to_index = {face: i for i, face in enumerate(graph.faces)}
+    """
+    info = np.iinfo(records.dtype[name])
+    out_of_range = np.flatnonzero((values < info.min) | (values > info.max))
+    if len(out_of_range):
+        i = out_of_range[0]
+        raise ValueError(
+            f'Cannot export {get_element(i)}: {name} of {values[i]} is outside the range {info.min} to {info.max}'
+        )
+    records[name] = values
 
-    # Create a new map editor instance
-    m = MapEditor()
 
-    # Vertices.
-    for node in node_to_index:
-        vertex = Vertex(int(node.get_attribute('x') * global_scale), int(node.get_attribute('y') * global_scale))
-        m.vertexes.append(vertex)
-        logging.debug(f'Adding vertex: {vertex}')
+def export_doom(graph: Graph, file_path: str | Path, format: MapFormat):
 
-    # Sidedefs. One per hedge.
-    for edge in edge_to_index:
-        if edge.face is None:
-            print('No face')
-            continue
-        side_attrs = map_edge_to_side(edge, face_to_index)
-        sidedef = Sidedef(**side_attrs)
-        m.sidedefs.append(sidedef)
-        logging.debug(f'Adding sidedef: {sidedef}')
-
-    # Linedefs. One per edge only - ie hedges are shared.
-    # Watch the winding order...
-    linedefs = {}
-    for edge in edge_to_index:
-        if edge.face is None:
-            print('No face')
-            continue
-        linedef = linedefs.get(edge.reversed)
-        if linedef is None:
-            linedef = Linedef(
-                vx_a=node_to_index[edge.tail],
-                vx_b=node_to_index[edge.head],
-                front=edge_to_index[edge],
-            )
-            linedefs[edge] = linedef
-        else:
-            linedef.back = edge_to_index[edge]
-        logging.debug(f'Adding linedef: {linedef}') # TODO: Fix logging
-    m.linedefs.extend(linedefs.values())
+    global_scale = 1/ 14
+    trace = Trace('export_doom')
+
+    # Vertices. One per node, numbered by the node's row in the position store.
+    positions = graph.positions
+    node_to_row = graph.node_to_row
+    vertexes = np.zeros(len(positions), dtype=VERTEX_DTYPE)
+    for i, name in enumerate(('x', 'y')):
+        set_field(
+            vertexes,
+            name,
+            (positions[:, i] * global_scale).astype(np.int64),
+            lambda row: f'node {next(node for node, node_row in node_to_row.items() if node_row == row)}',
+        )
+    trace.mark('vertexes')
+
+    # Sidedefs. One per hedge with a face, grouped by sector. Elements are
+    # looked up by their raw data as it's cheaper to compare than handles.
+    faces = [face.data for face in graph.faces]
+    face_edges = [graph.face_to_edges[face] for face in faces]
+    edges = [edge.data for edges in face_edges for edge in edges]
+    head_rows = np.fromiter((node_to_row[head] for head, _ in edges), dtype=np.int64, count=len(edges))
+    tail_rows = np.fromiter((node_to_row[tail] for _, tail in edges), dtype=np.int64, count=len(edges))
+
+    # Every edge has a row in the edge attribute table, so use it to find each
+    # hedge's reverse, and from that the reverse's sidedef if it has a face.
+    edge_attrs = graph.edge_attributes
+    edge_rows = edge_attrs.get_rows(edges)
+    reversed_rows = np.fromiter(
+        (edge_attrs.key_to_row.get((tail, head), -1) for head, tail in edges), dtype=np.int64, count=len(edges)
+    )
+    is_two_sided = reversed_rows >= 0
+    row_to_sidedef = np.full(len(edge_attrs), -1, dtype=np.int64)
+    row_to_sidedef[edge_rows] = np.arange(len(edges))
+    reversed_indices = np.where(is_two_sided, row_to_sidedef[reversed_rows], -1)
+    top_texs = map_textures_to_names(edge_attrs.get_column_values(edge_rows, 'top_tex'))
+    low_texs = map_textures_to_names(edge_attrs.get_column_values(edge_rows, 'low_tex'))
+    mid_texs = map_textures_to_names(edge_attrs.get_column_values(edge_rows, 'mid_tex'))
+    sidedefs = np.zeros(len(edges), dtype=SIDEDEF_DTYPE)
+    sidedefs['tx_up'] = np.where(is_two_sided, top_texs, b'-')
+    sidedefs['tx_low'] = np.where(is_two_sided, low_texs, b'-')
+    sidedefs['tx_mid'] = np.where(is_two_sided, b'-', mid_texs)
+    set_field(
+        sidedefs,
+        'sector',
+        np.repeat(np.arange(len(faces)), [len(edges) for edges in face_edges]),
+        lambda i: f'edge {edges[i]}',
+    )
+    trace.mark('sidedefs')
+
+    # Linedefs. One per edge only - ie hedges are shared, with whichever hedge
+    # comes first as the front side. Watch the winding order...
+    sides = np.arange(len(edges))
+    is_front = (reversed_indices < 0) | (sides < reversed_indices)
+    fronts = sides[is_front]
+    backs = reversed_indices[is_front]
+    linedefs = np.zeros(len(fronts), dtype=LINEDEF_DTYPE)
+    for name, values in (
+        ('vx_a', tail_rows[fronts]),
+        ('vx_b', head_rows[fronts]),
+        ('front', fronts),
+        ('back', np.where(backs < 0, Linedef.NONE, backs)),
+    ):
+        set_field(linedefs, name, values, lambda i: f'edge {edges[fronts[i]]}')
+    trace.mark('linedefs')
 
     # Sectors.
-    for face in face_to_index:
-        sector = Sector(**map_face_to_sector(face, global_scale))
-        m.sectors.append(sector)
-        logging.debug(f'Adding sector: {sector}')
+    face_attrs = graph.face_attributes
+    face_rows = face_attrs.get_rows(faces)
+    floorz = face_attrs.get_column_values(face_rows, 'floorz').astype(np.float64)
+    ceilingz = face_attrs.get_column_values(face_rows, 'ceilingz').astype(np.float64)
+    sectors = np.zeros(len(faces), dtype=SECTOR_DTYPE)
+    for name, values in (
+        ('z_floor', (floorz * global_scale).astype(np.int64)),
+        ('z_ceil', (ceilingz * global_scale).astype(np.int64)),
+        ('light', np.full(len(faces), Sector().light)),
+    ):
+        set_field(sectors, name, values, lambda i: f'face {faces[i]}')
+    sectors['tx_floor'] = map_textures_to_names(face_attrs.get_column_values(face_rows, 'floor_tex'))
+    sectors['tx_ceil'] = map_textures_to_names(face_attrs.get_column_values(face_rows, 'ceiling_tex'))
+    trace.mark('sectors')
+    trace.count('vertexes', len(vertexes))
+    trace.count('sidedefs', len(sidedefs))
+    trace.count('linedefs', len(linedefs))
+    trace.count('sectors', len(sectors))
+    trace.count('skipped hedges', len(graph.edges) - len(edges))
 
     # Things.
     # Player 1 start thing (type 1)
+    m = MapEditor()
     m.things = [
         Thing(x=0, y=0, angle=0, type=1),
     ]
 
     # Insert into WAD and save.
+    lumps = m.to_lumps()
+    lumps['VERTEXES'] = omg.Lump(vertexes.tobytes())
+    lumps['LINEDEFS'] = omg.Lump(linedefs.tobytes())
+    lumps['SIDEDEFS'] = omg.Lump(sidedefs.tobytes())
+    lumps['SECTORS'] = omg.Lump(sectors.tobytes())
     w = WAD()
-    w.maps['MAP01'] = m.to_lumps()
+    w.maps['MAP01'] = lumps
     w.to_file(str(file_path))
+    trace.mark('write')
+    trace.done()
@@ -1,12 +1,15 @@
 import logging
-import json
-from dataclasses import dataclass
+import re
+from array import array
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, TextIO
+
+import numpy as np
 
 from editor.constants import MapFormat
 from editor.graph import Graph
+from editor.tracing import Trace
 
 
 logger = logging.getLogger(__name__)
@@ -34,124 +37,400 @@ class ThingDefinition(Enum):
     MIKE = 13484
 
 
-@dataclass
-class Block:
-
-    # Do blocks etc own their own ID? If it's implied from order maybe it should
-    # be owned by the map.
-
-    type: BlockType
-    #id: Any | None
-
-
-@dataclass
-class Vertex(Block):
+# Size hint for reading whole lines at a time.
+CHUNK_SIZE = 1 << 16
+
+_NUMBER = r'[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?'
+_NAME = r'[A-Za-z_]\w*'
+_STRING = r'"((?:[^"\\]|\\.)*)"'
+
+# Tokens, tried in order at each position in a line. Strings are matched
+# before comments so that a // inside quotes doesn't start one. Whitespace
+# isn't matched so is skipped, and anything else is an error.
+_TOKEN_RE = re.compile(rf"""
+    (?P<string>{_STRING})
+  | (?P<comment>//.*)
+  | (?P<number>{_NUMBER})(?![\w.])
+  | (?P<name>{_NAME})
+  | (?P<symbol>[{{}}()=;,])
+  | (?P<error>\S)
+""", re.VERBOSE)
+
+# Blocks are parsed whole by regex where possible, which covers everything
+# the editor writes. Values are numbers, names, strings without escapes, or
+# comma separated lists of them, and sub-blocks don't nest. Each block must
+# start and end on its own lines, with a comment only allowed after the type.
+# Anything else is left to the tokenizer.
+_VALUE = rf'(?:{_NUMBER}|{_NAME}|"[^"\\\n]*")'
+_VALUES = rf'{_VALUE}(?:\s*,\s*{_VALUE})*'
+_ASSIGNMENT = rf'{_NAME}\s*=\s*{_VALUES}\s*;'
+_SIMPLE_BLOCK_RE = re.compile(rf"""
+    \s*({_NAME})[^\S\n]*(?://[^\n]*)?\s*
+    \{{((?:\s*(?:{_ASSIGNMENT}|{_NAME}\s*\((?:\s*{_ASSIGNMENT})*\s*\)))*)\s*\}}
+    [^\S\n]*(?:\n|\Z)
+""", re.VERBOSE)
+_SCALAR = rf'({_NUMBER})|({_NAME})|("[^"\\\n]*")'
+_STATEMENT_RE = re.compile(
+    rf'({_NAME})\s*(?:=\s*(?:(?:{_SCALAR})\s*;|({_VALUES})\s*;)|\(((?:\s*{_ASSIGNMENT})*)\s*\))'
+)
+_SCALAR_RE = re.compile(_SCALAR)
+
+_BLOCK_TYPES = {block_type.value: block_type for block_type in BlockType}
+
+# Both JSON and Python spellings, as older exports wrote Python reprs.
+_NAME_VALUES = {'true': True, 'false': False, 'null': None, 'True': True, 'False': False, 'None': None}
+
+
+def parse_number(text: str) -> int | float:
+    return float(text) if '.' in text or 'e' in text or 'E' in text else int(text)
+
+
+def parse_string(text: str) -> str:
+    return text.replace('\\"', '"').replace('\\\\', '\\')
+
+
+def parse_scalar(number: str, name: str, string: str) -> Any:
+    """
+    Convert the groups of a _SCALAR match. Strings keep their quotes in the
+    match so that an empty string can be told apart from no match.
+
+    """
+    if number:
+        return parse_number(number)
+    if name:
+        return _NAME_VALUES.get(name, name)
+    return string[1:-1]
+
+
+def parse_statements(text: str) -> dict:
+    """
+    Parse the body of a block matched by _SIMPLE_BLOCK_RE.
+
+    """
+    attrs = {}
+    for key, number, name, string, values_text, sub_block_text in _STATEMENT_RE.findall(text):
+        if number or name or string:
+            attrs[key] = parse_scalar(number, name, string)
+        elif values_text:
+            attrs[key] = tuple(parse_scalar(*groups) for groups in _SCALAR_RE.findall(values_text))
+        else:
+            attrs[key] = parse_statements(sub_block_text) if sub_block_text else {}
+    return attrs
+
+
+def tokenize(line: str, line_number: int) -> list[tuple[str, Any, int]]:
+    """
+    Split a line into (kind, value, line number) tokens. The kind is one of
+    string, number or name, or the character itself for symbols.
+
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(line):
+        kind = match.lastgroup
+        if kind == 'number':
+            tokens.append((kind, parse_number(match.group(kind)), line_number))
+        elif kind == 'string':
+            tokens.append((kind, parse_string(match.group(2)), line_number))
+        elif kind == 'name':
+            tokens.append((kind, match.group(kind), line_number))
+        elif kind == 'symbol':
+            symbol = match.group(kind)
+            tokens.append((symbol, symbol, line_number))
+        elif kind == 'comment':
+            break
+        else:
+            raise ValueError(f'Line {line_number}: Unexpected character: {match.group(kind)!r}')
+    return tokens
+
+
+class TokenStream:
+
+    """
+    Tokens pulled a line at a time from an iterable of lines. Has one token of
+    lookahead, and keeps the line number of the last token consumed for
+    reporting errors.
+
+    """
+
+    def __init__(self, lines: Iterable[str], line_number: int = 1):
+        self._lines = enumerate(lines, line_number)
+        self._tokens = []
+        self.line_number = line_number
+
+    @property
+    def at_line_end(self) -> bool:
+        return not self._tokens
+
+    def peek(self) -> tuple[str, Any, int] | None:
+        while not self._tokens:
+            line_number, line = next(self._lines, (self.line_number, None))
+            if line is None:
+                return None
+            self.line_number = line_number
+            self._tokens = tokenize(line, line_number)[::-1]
+        return self._tokens[-1]
+
+    def next(self) -> tuple[str, Any, int]:
+        token = self.peek()
+        if token is None:
+            raise ValueError(f'Line {self.line_number}: Unexpected end of file')
+        self._tokens.pop()
+        self.line_number = token[2]
+        return token
+
+    def expect(self, kind: str) -> tuple[str, Any, int]:
+        token = self.next()
+        if token[0] != kind:
+            raise ValueError(f'Line {token[2]}: Expected {kind!r}, got {token[1]!r}')
+        return token
+
+
+def read_value(tokens: TokenStream) -> Any:
+    """
+    Read a scalar, or a comma separated list of them as a tuple.
+
+    """
+    values = []
+    while True:
+        kind, value, line_number = tokens.next()
+        if kind == 'name':
+            value = _NAME_VALUES.get(value, value)
+        elif kind not in ('string', 'number'):
+            raise ValueError(f'Line {line_number}: Expected a value, got {value!r}')
+        values.append(value)
+        token = tokens.peek()
+        if token is None or token[0] != ',':
+            break
+        tokens.next()
+    return values[0] if len(values) == 1 else tuple(values)
+
+
+def read_attributes(tokens: TokenStream, closing: str) -> dict:
+    """
+    Read key = value; pairs and key ( ... ) sub-blocks up to and including the
+    closing symbol. The ; after the last pair before the closing symbol is
+    optional.
+
+    """
+    attrs = {}
+    while True:
+        kind, key, line_number = tokens.next()
+        if kind == closing:
+            return attrs
+        if kind != 'name':
+            raise ValueError(f'Line {line_number}: Expected a key, got {key!r}')
+        kind, value, line_number = tokens.next()
+        if kind == '=':
+            attrs[key] = read_value(tokens)
+            token = tokens.peek()
+            if token is None or token[0] != closing:
+                tokens.expect(';')
+        elif kind == '(':
+            attrs[key] = read_attributes(tokens, ')')
+        else:
+            raise ValueError(f'Line {line_number}: Expected \'=\' or \'(\' after {key}, got {value!r}')
+
+
+def get_block_type(name: Any, line_number: int) -> BlockType:
+    block_type = _BLOCK_TYPES.get(name)
+    if block_type is None:
+        raise ValueError(f'Line {line_number}: Unknown block type: {name!r}')
+    return block_type
+
+
+def read_block(tokens: TokenStream) -> tuple[BlockType, dict, int]:
+    kind, name, line_number = tokens.next()
+    if kind != 'name':
+        raise ValueError(f'Line {line_number}: Expected a block type, got {name!r}')
+    block_type = get_block_type(name, line_number)
+    tokens.expect('{')
+    return block_type, read_attributes(tokens, '}'), line_number
+
+
+class BlockReader:
+
+    """
+    Parses blocks incrementally from a file object, yielding the type,
+    attributes and line number of each.
+
+    Whole lines are read a chunk at a time into a buffer and each block is
+    matched by a single regex, falling back to the tokenizer for blocks the
+    regex doesn't cover. The tokenizer reads lines from the same buffer until
+    it's back at the start of a line, so the two can be interleaved freely,
+    and it's what reports syntax errors.
+
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self.line_number = 1
+
+    def _fill(self) -> bool:
+        """
+        Append the next chunk of lines to the buffer, dropping what's already
+        been parsed. Returns False at the end of the file.
+
+        """
+        chunk = ''.join(self._file.readlines(self._chunk_size))
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _read_lines(self) -> Iterator[str]:
+        while True:
+            end = self._buffer.find('\n', self._pos) + 1
+            if not end:
+                if self._fill():
+                    continue
+                end = len(self._buffer)
+                if end == self._pos:
+                    return
+            line = self._buffer[self._pos:end]
+            self._pos = end
+            self.line_number += 1
+            yield line
+
+    def __iter__(self) -> Iterator[tuple[BlockType, dict, int]]:
+        while True:
+            match = _SIMPLE_BLOCK_RE.match(self._buffer, self._pos)
+            if match is not None:
+                name, body = match.groups()
+                line_number = self.line_number + self._buffer.count('\n', self._pos, match.start(1))
+                self.line_number += self._buffer.count('\n', self._pos, match.end())
+                self._pos = match.end()
+                yield get_block_type(name, line_number), parse_statements(body), line_number
+
+            # The block may just be cut off at the end of the buffer.
+            elif self._buffer.find('}', self._pos) == -1 and self._fill():
+                continue
 
-    x: float
-    z: float
+            else:
+                tokens = TokenStream(self._read_lines(), self.line_number)
+                if tokens.peek() is None:
+                    return
+                yield read_block(tokens)
+                while not tokens.at_line_end:
+                    yield read_block(tokens)
 
 
-@dataclass
-class Side(Block):
+def read_blocks(f: TextIO) -> Iterator[tuple[BlockType, dict, int]]:
+    return iter(BlockReader(f))
 
-    line: str
-    sector: str
-    side_plane: str | None = None
-    side_texture: str | None = None
-    brightness_offset: str | None = None
 
+def get_index(attrs: dict, key: str) -> int:
+    value = attrs.get(key)
+    return -1 if value is None else value
 
-@dataclass
-class Line(Block):
 
-    v1: int
-    v2: int
-    line_opposite: int | None = None
-    side_upper: int | None = None
-    side_middle: int | None = None
-    side_lower: int | None = None
+class Map:
 
+    """
+    Columnar buffers of the blocks needed to build a graph. Optional indices
+    are -1 where missing, and sector vertex / line lists are flattened with
+    offsets marking where each sector's list starts.
 
-class Map:
+    """
 
     def __init__(self):
-        self.vertices = []
-        self.lines = []
-        self.sides = []
+        self.vertex_x = array('d')
+        self.vertex_z = array('d')
+        self.line_v1 = array('q')
+        self.line_v2 = array('q')
+        self.line_opposite = array('q')
+        self.line_side_upper = array('q')
+        self.line_side_middle = array('q')
+        self.line_side_lower = array('q')
+        self.side_line = array('q')
+        self.side_sector = array('q')
+        self.sector_vertices = array('q')
+        self.sector_vertex_offsets = array('q', [0])
+        self.sector_lines = array('q')
+        self.sector_line_offsets = array('q', [0])
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.vertex_x)
+
+    @property
+    def num_lines(self) -> int:
+        return len(self.line_v1)
+
+    @property
+    def num_sides(self) -> int:
+        return len(self.side_line)
+
+    @property
+    def num_sectors(self) -> int:
+        return len(self.sector_vertex_offsets) - 1
+
+    def add_block(self, block_type: BlockType, attrs: dict, line_number: int):
+        try:
+            if block_type == BlockType.VERTEX:
+                self.vertex_x.append(attrs['x'])
+                self.vertex_z.append(attrs['z'])
+            elif block_type == BlockType.LINE:
+                self.line_v1.append(attrs['v1'])
+                self.line_v2.append(attrs['v2'])
+                self.line_opposite.append(get_index(attrs, 'line_opposite'))
+                self.line_side_upper.append(get_index(attrs, 'side_upper'))
+                self.line_side_middle.append(get_index(attrs, 'side_middle'))
+                self.line_side_lower.append(get_index(attrs, 'side_lower'))
+            elif block_type == BlockType.SIDE:
+                self.side_line.append(attrs['line'])
+                self.side_sector.append(attrs['sector'])
+            elif block_type == BlockType.SECTOR:
+                for key, values, offsets in (
+                    ('vertices', self.sector_vertices, self.sector_vertex_offsets),
+                    ('lines', self.sector_lines, self.sector_line_offsets),
+                ):
+                    value = attrs.get(key, ())
+                    values.extend(value if isinstance(value, tuple) else (value,))
+                    offsets.append(len(values))
+        except KeyError as e:
+            raise ValueError(f'Line {line_number}: {block_type.value} is missing {e.args[0]}') from None
+        except TypeError as e:
+            raise ValueError(f'Line {line_number}: Bad value in {block_type.value}: {e}') from None
+
+
+def read_map(f: TextIO) -> Map:
+    m = Map()
+    for block_type, attrs, line_number in read_blocks(f):
+        m.add_block(block_type, attrs, line_number)
+    return m
 
 
 def import_fallen_aces(graph: Graph, file_path: str | Path, format: MapFormat):
-    import re
-
+    trace = Trace('import_fallen_aces')
     with open(file_path, 'r') as f:
-        data = f.readlines()
-
-    m = Map()
-    curr_block_type = None
-    curr_block_attrs = None
-    for line in data:
-
-        # Drop comment and skip empty lines.
-        line = line.split('//')[0].strip()
-        if not line:
-            continue
-
-        # Not currently inside a block, attempt to resolve one.
-        if curr_block_type is None:
-            curr_block_type = BlockType(line)
-
-        elif line == '{':
-            curr_block_attrs = {}
-
-        elif line == '}':
-
-            if curr_block_type == BlockType.VERTEX:
-                m.vertices.append(Vertex(curr_block_type, **curr_block_attrs))
-            elif curr_block_type == BlockType.LINE:
-                m.lines.append(Line(curr_block_type, **curr_block_attrs))
-            elif curr_block_type == BlockType.SIDE:
-                m.sides.append(Side(curr_block_type, **curr_block_attrs))
-
-            curr_block_type = None
-            curr_block_attrs = None
-
-        else:
-            try:
-                key, value = line.split('=')
-                key = key.strip()
-                key = key.split('(')[0].strip()
-                #key, value = re.split('= | (', line)
-            except:
-                #print('bad line:', line)
-                continue
-            try:
-                curr_block_attrs[key.strip()] = json.loads(value.split(';')[0])
-            except:
-                #print(key, f'[{value}]')
-                continue
-
-
-
-    for idx, vertex in enumerate(m.vertices):
-        graph.add_node(idx, x=vertex.x * GLOBAL_SCALE, y=vertex.z * GLOBAL_SCALE)
-
-    for idx, line in enumerate(m.lines):
-        graph.add_edge((line.v1, line.v2))
-
-    # for idx, side in enumerate(m.sides):
-    #     print(side)
+        m = read_map(f)
+    trace.mark('parse')
+    trace.count('vertices', m.num_vertices)
+    trace.count('lines', m.num_lines)
+    trace.count('sides', m.num_sides)
+    trace.count('sectors', m.num_sectors)
+
+    positions = np.column_stack((np.frombuffer(m.vertex_x), np.frombuffer(m.vertex_z))) * GLOBAL_SCALE
+    graph.add_nodes_from(range(m.num_vertices), positions=positions, validate=False)
+    graph.add_edges_from(zip(m.line_v1, m.line_v2), validate=False)
+    trace.mark('nodes / edges')
 
     graph.update()
+    trace.mark('update')
+    trace.done()
 
 
-def write_block(f, type_: BlockType, id_: Any, attrs: dict):
+def format_block(type_: BlockType, id_: Any, attrs: dict) -> str:
 
     # TODO: Use marshmallow...?
-    f.write(f'{type_.value}')
+    parts = [type_.value]
     if id_ is not None:
-        f.write(f' // {id_}')
-    f.write(f'\n')
-    f.write('{\n')
+        parts.append(f' // {id_}')
+    parts.append('\n{\n')
     for key, value in attrs.items():
         if isinstance(value, dict):
             subvalues = []
@@ -164,91 +443,175 @@ def write_block(f, type_: BlockType, id_: Any, attrs: dict):
             value_str = '; '.join(subvalues)
             if subvalues:
                 value_str += ';'
-            f.write(f'  {key} ( {value_str} )\n')
+            parts.append(f'  {key} ( {value_str} )\n')
         else:
-            f.write(f'  {key} = {value};\n')
-    f.write('}\n\n')
+            parts.append(f'  {key} = {value};\n')
+    parts.append('}\n\n')
+    return ''.join(parts)
+
+
+class BlockWriter:
+    """
+    Collects formatted blocks and writes them to the file in large chunks,
+    rather than issuing a write per value.
+
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self._parts = []
+        self._size = 0
+
+    def write(self, type_: BlockType, id_: Any, attrs: dict):
+        self.write_blocks((format_block(type_, id_, attrs),))
+
+    def write_blocks(self, blocks: Iterable[str]):
+        parts = self._parts
+        size = self._size
+        for block in blocks:
+            parts.append(block)
+            size += len(block)
+            if size >= self.chunk_size:
+                self.f.write(''.join(parts))
+                parts.clear()
+                size = 0
+        self._size = size
+
+    def flush(self):
+        if self._parts:
+            self.f.write(''.join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+
+DEFAULT_TEXTURE = {
+    'path': 'Editor/Default.png',
+    'scale': (0.2, 0.2),
+}
+
+# Blocks formatted once up front as printf-style templates, with '%s' for the
+# id and for every value that varies per element.
+VERTEX_TEMPLATE = format_block(BlockType.VERTEX, '%s - %s', {
+    'x': '%s',
+    'z': '%s',
+})
+
+# Lines without a reverse hedge get a middle side, those with one are portals.
+WALL_TEMPLATE = format_block(BlockType.LINE, '%s - %s', {
+    'v1': '%s',
+    'v2': '%s',
+    'side_middle': '%s',
+})
+
+PORTAL_TEMPLATE = format_block(BlockType.LINE, '%s - %s', {
+    'v1': '%s',
+    'v2': '%s',
+    'is_portal': True,
+    'line_opposite': '%s',
+})
+
+# TODO: Need upper / lower etc for height difference.
+SIDE_TEMPLATE = format_block(BlockType.SIDE, '%s', {
+    'line': '%s',    # This is wrong...
+    'sector': '%s',
+    'side_plane': {},
+    'side_texture': DEFAULT_TEXTURE,
+})
+
+SECTOR_TEMPLATE = format_block(BlockType.SECTOR, '%s', {
+    'layer': 0,
+    'vertices': '%s',
+    'lines': '%s',
+    'height_ceiling': 3,
+    'floor_slope': {},
+    'nceiling_slope': {},
+    'floor_texture': DEFAULT_TEXTURE,
+    'ceiling_texture': DEFAULT_TEXTURE,
+    'floor_plane': {},
+    'ceiling_plane': {},
+})
 
 
 def export_fallen_aces(graph: Graph, file_path: str | Path, format: MapFormat):
-
-    # Assign indices.
-    node_to_index = {node: i for i, node in enumerate(graph.nodes)}
-    edge_to_index = {edge: i for i, edge in enumerate(graph.edges)}
-    face_to_index = {face: i for i, face in enumerate(graph.faces)}
+    trace = Trace('export_fallen_aces')
+    trace.count('vertices', len(graph.nodes))
+    trace.count('lines', len(graph.edges))
+    trace.count('sectors', len(graph.faces))
+
+    # Assign indices. Keyed by raw data, so that lookups don't fall back to
+    # comparing handles.
+    nodes = [node.data for node in graph.nodes]
+    edges = [edge.data for edge in graph.edges]
+    faces = list(graph.faces)
+    node_to_index = {node: i for i, node in enumerate(nodes)}
+    edge_to_index = {edge: i for i, edge in enumerate(edges)}
+    face_to_index = {face: i for i, face in enumerate(faces)}
+    positions = graph.get_positions(nodes) / GLOBAL_SCALE
+    trace.mark('indices')
+
+    # Only walk the elements again for per-element logging if it'll be shown.
+    debug = logger.isEnabledFor(logging.DEBUG)
 
     # Write file.
     with open(file_path, "w") as f:
+        writer = BlockWriter(f)
 
         # Global header (simplified).
-        write_block(f, BlockType.GLOBAL, None, {
+        writer.write(BlockType.GLOBAL, None, {
             'map_version_major': 1,
             'map_version_minor': 0,
         })
 
         # Vertices.
-        for node, idx in node_to_index.items():
-            vertex = {
-                'x': node.get_attribute('x') * 1 / GLOBAL_SCALE,
-                'z': node.get_attribute('y') * 1 / GLOBAL_SCALE,
-            }
-            write_block(f, BlockType.VERTEX, f'{idx} - {node}', vertex)
-            logging.debug(f'Adding vertex: {vertex}')
+        writer.write_blocks([
+            VERTEX_TEMPLATE % (i, node, x, z)
+            for i, (node, (x, z)) in enumerate(zip(nodes, positions.tolist()))
+        ])
+        if debug:
+            for i, node in enumerate(nodes):
+                logger.debug('Adding vertex: %s - %s', i, node)
+        trace.mark('vertices')
 
         # Lines. One per hedge.
         # Watch the winding order...
-        for edge, idx in edge_to_index.items():
-            line = {
-                'v1': node_to_index[edge.tail],
-                'v2': node_to_index[edge.head],
-            }
-            if edge.reversed is None:
-                line['side_middle'] = idx
+        lines = []
+        for i, edge in enumerate(edges):
+            head, tail = edge
+            opposite = edge_to_index.get((tail, head))
+            if opposite is None:
+                lines.append(WALL_TEMPLATE % (i, edge, node_to_index[tail], node_to_index[head], i))
             else:
-                line['is_portal'] = True
-                line['line_opposite'] = edge_to_index.get(edge.reversed)
-            write_block(f, BlockType.LINE, f'{idx} - {edge}', line)
-            logging.debug(f'Adding vertex: {vertex}')
+                lines.append(PORTAL_TEMPLATE % (i, edge, node_to_index[tail], node_to_index[head], opposite))
+        writer.write_blocks(lines)
+        if debug:
+            for i, edge in enumerate(edges):
+                logger.debug('Adding line: %s - %s', i, edge)
+        trace.mark('lines')
 
         # Sides.
-        # TODO: Need upper / lower etc for height difference.
-        for edge, i in edge_to_index.items():
-            side = {
-                'line': edge_to_index[edge],    # This is wrong...
-                'sector': face_to_index[edge.face],
-                'side_plane': {},
-                'side_texture': {
-                    'path': 'Editor/Default.png',
-                    'scale': (0.2, 0.2),
-                },
-            }
-            write_block(f, BlockType.SIDE, i, side)
+        edge_to_face = graph.edge_to_face
+        writer.write_blocks([
+            SIDE_TEMPLATE % (i, i, face_to_index[edge_to_face[edge]])
+            for i, edge in enumerate(graph.edges)
+        ])
+        trace.mark('sides')
 
         # Sectors.
-        for face, i in face_to_index.items():
-            v_str = ', '.join([str(node_to_index[node]) for node in reversed(face.nodes)])
-            l_str = ', '.join([str(edge_to_index[edge]) for edge in reversed(face.edges)])
-            write_block(f, BlockType.SECTOR, i, {
-                'layer': 0,
-                'vertices': v_str,
-                'lines': l_str,
-                'height_ceiling': 3,
-                'floor_slope': {},
-                'nceiling_slope': {},
-                'floor_texture': {
-                    'path': 'Editor/Default.png',
-                    'scale': (0.2, 0.2),
-                },
-                'ceiling_texture': {
-                    'path': 'Editor/Default.png',
-                    'scale': (0.2, 0.2),
-                },
-                'floor_plane': {},
-                'ceiling_plane': {},
-            })
+        face_to_nodes = graph.face_to_nodes
+        face_to_edges = graph.face_to_edges
+        writer.write_blocks([
+            SECTOR_TEMPLATE % (
+                i,
+                ', '.join([str(node_to_index[node.data]) for node in reversed(face_to_nodes[face])]),
+                ', '.join([str(edge_to_index[edge.data]) for edge in reversed(face_to_edges[face])]),
+            )
+            for i, face in enumerate(faces)
+        ])
+        trace.mark('sectors')
 
         # Player start.
-        write_block(f, BlockType.THING, 0, {
+        writer.write(BlockType.THING, 0, {
             'layer': 0,
             'x': 0,
             'y': 0,
@@ -256,3 +619,5 @@ def export_fallen_aces(graph: Graph, file_path: str | Path, format: MapFormat):
             'definition_id': ThingDefinition.MIKE.value,
             'height': 0,
         })
+        writer.flush()
+    trace.done()
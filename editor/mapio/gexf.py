@@ -1,3 +1,4 @@
+import logging
 from xml.etree import ElementTree as et
 
 from networkx.readwrite.gexf import GEXFWriter as BaseGEXFWriter
@@ -5,10 +6,18 @@ from networkx.utils import open_file
 
 from editor.constants import MapFormat, ATTRIBUTES
 from editor.graph import Graph
+from editor.tracing import Trace
+
+
+logger = logging.getLogger(__name__)
 
 
 def export_gexf(graph: Graph, file_path: str, format: MapFormat):
-    g = graph.data.copy()
+    trace = Trace('export_gexf')
+    g = graph.copy_data()
+    trace.mark('copy')
+    trace.count('nodes', len(g.nodes))
+    trace.count('edges', len(g.edges))
 
     # Move all attribute dicts to the root of the element so the exporter picks
     # them up. Node coords require special treatment for the GEXF format.
@@ -18,8 +27,11 @@ def export_gexf(graph: Graph, file_path: str, format: MapFormat):
         attrs['viz'] = {'position': {'x': attrs.pop('x'), 'y': attrs.pop('y'), 'z': 0}}
     for head, tail, attrs in g.edges(data=True):
         attrs.update(attrs.pop(ATTRIBUTES))
+    trace.mark('flatten attributes')
 
     write_gexf(g, file_path)
+    trace.mark('write')
+    trace.done()
 
 
 type_map = {
@@ -48,7 +60,7 @@ class GEXFWriter(BaseGEXFWriter):
 
             # TODO:
             if type(value) not in type_map:
-                print('skip:', key, '->', type(value))
+                logger.debug('Skipping graph attribute %s of type %s', key, type(value))
                 continue
 
             attr_el = et.Element('attribute', attrib={'id': key, 'title': key, 'type': type_map[type(value)]})
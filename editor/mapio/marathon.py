@@ -1,11 +1,12 @@
-from collections import defaultdict
 from pathlib import Path
 
+import numpy as np
 from jjaro.sceA import load
 
 from editor.constants import MapFormat
 from editor.graph import Graph
 from editor.texture import Texture
+from editor.tracing import Trace
 
 
 def get_texture_ids(value: int):
@@ -24,26 +25,32 @@ def map_polygon_to_face(polygon, offset):
 
 
 def import_marathon(graph: Graph, file_path: str | Path, format: MapFormat):
+    trace = Trace('import_marathon')
     m = load(file_path)
+    trace.mark('read')
+    trace.count('points', len(m.points))
+    trace.count('lines', len(m.lines))
+    trace.count('polygons', len(m.polygons))
 
     # Nodes.
-    nodes = []
-    for i, point in enumerate(m.points):
-        node = graph.add_node(i, x=point.x, y=point.y)
-        nodes.append(node)
+    positions = np.array([(point.x, point.y) for point in m.points], dtype=np.float64).reshape(-1, 2)
+    graph.add_nodes_from(range(len(m.points)), positions=positions, validate=False)
 
     # Edges.
-    edges = defaultdict(list)
+    edges = []
     for i, line in enumerate(m.lines):
         head, tail = line.endpoint_indices[0], line.endpoint_indices[1]
-        edge = graph.add_edge((head, tail))
-        edges[head].append(tail)
+        edges.append((head, tail))
 
         # HAXX putting ALL rev edges in for the moment.
-        graph.add_edge((tail, head))
+        edges.append((tail, head))
+    graph.add_edges_from(edges, validate=False)
+    trace.mark('nodes / edges')
 
     # Faces.
     # NOTE: Duke export seems to only handle 1024 polygons?
+    faces = []
+    face_attrs = []
     for i, polygon in enumerate(m.polygons):#[0:1024]):
         #print('polygon:', polygon)
 
@@ -64,7 +71,11 @@ def import_marathon(graph: Graph, file_path: str | Path, format: MapFormat):
 
         face_nodes = [e_idx for e_idx in polygon.endpoint_indices if e_idx > -1]
         face_nodes.append(face_nodes[0])
-        face_attrs = map_polygon_to_face(polygon, offset)
-        graph.add_face(tuple(face_nodes), **face_attrs)
+        faces.append(tuple(face_nodes))
+        face_attrs.append(map_polygon_to_face(polygon, offset))
+    graph.add_faces_from(faces, face_attrs, validate=False)
+    trace.mark('faces')
 
     graph.update()
+    trace.mark('update')
+    trace.done()
@@ -0,0 +1,180 @@
+import os
+import tempfile
+
+import omg
+from omg.mapedit import Linedef, MapEditor, Sector, Sidedef, Vertex
+from parameterized import parameterized
+
+from editor import binaryformat
+from editor.constants import MapFormat
+from editor.graph import Graph
+from editor.mapio import doom
+from editor.tests.testcasebase import TestCaseBase
+
+
+class DoomTestCase(TestCaseBase):
+
+    @parameterized.expand([
+        ('one_ring', [(0, 1), (1, 2), (2, 0)], [[(0, 1), (1, 2), (2, 0), (0, 1)]]),
+        ('shuffled', [(2, 0), (0, 1), (1, 2)], [[(2, 0), (0, 1), (1, 2), (2, 0)]]),
+        (
+            'two_rings',
+            [(3, 4), (0, 1), (4, 5), (1, 2), (5, 3), (2, 0)],
+            [[(3, 4), (4, 5), (5, 3), (3, 4)], [(0, 1), (1, 2), (2, 0), (0, 1)]],
+        ),
+        ('open', [(1, 2), (0, 1)], [[(1, 2)], [(0, 1)]]),
+        (
+            'branching',
+            [(0, 1), (1, 2), (2, 0), (0, 3), (3, 4), (4, 0)],
+            [[(0, 1), (1, 2), (2, 0), (0, 1)], [(0, 3), (3, 4), (4, 0), (0, 3)]],
+        ),
+    ])
+    def test_order_tuples_into_chains(self, name: str, edges: list[tuple], expected: list[list[tuple]]):
+
+        # Set up test data.
+        g = Graph()
+        g.add_nodes_from(range(6))
+        g.add_edges_from(edges)
+        g.update()
+
+        # Start test.
+        chains = doom.order_tuples_into_chains([g.get_edge(*edge) for edge in edges])
+
+        # Assert results.
+        self.assertListEqual([[edge.data for edge in chain] for chain in chains], expected)
+
+
+class WadTestCase(TestCaseBase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.wad')
+        wad = omg.WAD()
+        wad.maps['E1M1'] = self.create_map(1)
+        wad.maps['E1M2'] = self.create_map(2)
+        wad.to_file(self.file_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+        super().tearDown()
+
+    @staticmethod
+    def create_map(width: int):
+        """
+        Single square sector of the given width.
+
+        """
+        m = MapEditor()
+        m.vertexes = [Vertex(x, y) for x, y in ((0, 0), (64 * width, 0), (64 * width, 64), (0, 64))]
+        m.sectors = [Sector(z_floor=0, z_ceil=128, tx_floor='FLOOR4_8', tx_ceil='CEIL3_5', light=160)]
+        m.sidedefs = [Sidedef(sector=0, tx_mid='STARTAN3') for _ in range(4)]
+        m.linedefs = [Linedef(vx_a=i, vx_b=(i + 1) % 4, front=i) for i in range(4)]
+        return m.to_lumps()
+
+    def test_read_map_catalogue(self):
+
+        # Start test.
+        catalogue = doom.read_map_catalogue(self.file_path)
+
+        # Assert results.
+        self.assertListEqual(list(catalogue), ['E1M1', 'E1M2'])
+        self.assertFalse(catalogue['E1M1'].is_udmf)
+        self.assertTrue({'VERTEXES', 'LINEDEFS', 'SIDEDEFS', 'SECTORS'} <= set(catalogue['E1M2'].lumps))
+
+    @parameterized.expand([(None, 64), ('E1M1', 64), ('E1M2', 128)])
+    def test_import_doom(self, map_name: str | None, expected_width: int):
+
+        # Set up test data.
+        g = Graph()
+
+        # Start test.
+        doom.import_doom(g, self.file_path, MapFormat.DOOM, map_name)
+
+        # Assert results.
+        self.assertEqual(len(g.nodes), 4)
+        self.assertEqual(len(g.edges), 4)
+        self.assertEqual(len(g.faces), 1)
+        self.assertEqual(max(node.get_attribute('x') for node in g.nodes), expected_width * 14)
+
+    def test_import_doom_missing_map(self):
+
+        # Set up test data.
+        g = Graph()
+
+        # Start test.
+        with self.assertRaises(ValueError):
+            doom.import_doom(g, self.file_path, MapFormat.DOOM, 'MAP01')
+
+    def test_batch_import_doom(self):
+
+        # Set up test data.
+        output_dir = os.path.join(self.temp_dir.name, 'maps')
+
+        # Start test.
+        file_paths = doom.batch_import_doom(self.file_path, output_dir, max_workers=2)
+
+        # Assert results.
+        self.assertListEqual(list(file_paths), ['E1M1', 'E1M2'])
+        for map_name, file_path in file_paths.items():
+            self.assertEqual(file_path.name, f'{map_name}{binaryformat.BINARY_FILE_SUFFIX}')
+            g = Graph()
+            g.load(file_path)
+            self.assertEqual(len(g.faces), 1)
+
+    def test_export_doom(self):
+        """
+        Test that exported lumps match the imported map, and that a hedge
+        without a face doesn't throw out the sidedef numbering.
+
+        """
+        # Set up test data.
+        g = Graph()
+        doom.import_doom(g, self.file_path, MapFormat.DOOM, 'E1M2')
+        node = next(iter(g.nodes))
+        g.add_node('dangling', x=0.0, y=-896.0)
+        g.add_edge((node.data, 'dangling'))
+        g.update()
+        output_path = os.path.join(self.temp_dir.name, 'export.wad')
+
+        # Start test.
+        doom.export_doom(g, output_path, MapFormat.DOOM)
+
+        # Assert results.
+        m = MapEditor(omg.WAD(output_path).maps['MAP01'])
+        self.assertEqual(len(m.vertexes), 5)
+        self.assertEqual(len(m.linedefs), 4)
+        self.assertEqual(len(m.sidedefs), 4)
+        self.assertEqual(len(m.sectors), 1)
+        self.assertSetEqual({(v.x, v.y) for v in m.vertexes}, {(0, 0), (128, 0), (128, 64), (0, 64), (0, -64)})
+        self.assertSetEqual({line.front for line in m.linedefs}, {0, 1, 2, 3})
+        self.assertSetEqual({line.back for line in m.linedefs}, {Linedef.NONE})
+        self.assertSetEqual({side.tx_mid for side in m.sidedefs}, {'STARTAN3'})
+        self.assertSetEqual({side.sector for side in m.sidedefs}, {0})
+        sector = m.sectors[0]
+        self.assertEqual((sector.z_floor, sector.z_ceil), (0, 128))
+        self.assertEqual((sector.tx_floor, sector.tx_ceil), ('FLOOR4_8', 'CEIL3_5'))
+
+    @parameterized.expand([
+        ('node', 'nodes', 'x', 'x'),
+        ('face', 'faces', 'floorz', 'z_floor'),
+    ])
+    def test_export_doom_out_of_range(self, name: str, elements_name: str, attr_name: str, field_name: str):
+        """
+        Test that a value too big for its lump field raises rather than
+        wrapping around.
+
+        """
+        # Set up test data.
+        g = Graph()
+        doom.import_doom(g, self.file_path, MapFormat.DOOM, 'E1M2')
+        element = next(iter(getattr(g, elements_name)))
+        element.set_attribute(attr_name, 14 * 40000)
+        g.update()
+        output_path = os.path.join(self.temp_dir.name, 'export.wad')
+
+        # Start test.
+        with self.assertRaisesRegex(ValueError, f'Cannot export {name} .*: {field_name} of 40000'):
+            doom.export_doom(g, output_path, MapFormat.DOOM)
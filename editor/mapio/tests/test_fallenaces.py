@@ -0,0 +1,237 @@
+import io
+import os
+import tempfile
+
+from parameterized import parameterized
+
+from editor.constants import MapFormat
+from editor.graph import Graph
+from editor.mapio import fallenaces
+from editor.mapio.fallenaces import BlockType
+from editor.tests.testcasebase import TestCaseBase
+
+
+# Written by hand rather than by the exporter, so that most blocks need the
+# tokenizer rather than the whole block regex.
+MAP_TEXT = '''// Comments are allowed between blocks.
+Global
+{
+  name = "a \\"quoted\\" // name";  // And after values.
+  flag = true;
+}
+
+Vertex { x = 1; z = -2.5e1; } Vertex
+{
+  x = .5;
+  z = 3
+}
+
+Sector // 0
+{
+  vertices = 0, 1,
+    2;
+  floor_texture (
+    path = "Editor/Default.png";
+    scale = 0.2, 0.2
+  )
+  floor_plane ( )
+  lines = 4;
+}
+
+Line // 0
+{
+  v1 = 0;
+  v2 = 1;
+  line_opposite = None;
+  side_middle = 0;
+}
+'''
+
+EXPECTED_BLOCKS = [
+    (BlockType.GLOBAL, {'name': 'a "quoted" // name', 'flag': True}, 2),
+    (BlockType.VERTEX, {'x': 1, 'z': -25.0}, 8),
+    (BlockType.VERTEX, {'x': 0.5, 'z': 3}, 8),
+    (
+        BlockType.SECTOR,
+        {
+            'vertices': (0, 1, 2),
+            'floor_texture': {'path': 'Editor/Default.png', 'scale': (0.2, 0.2)},
+            'floor_plane': {},
+            'lines': 4,
+        },
+        14,
+    ),
+    (BlockType.LINE, {'v1': 0, 'v2': 1, 'line_opposite': None, 'side_middle': 0}, 26),
+]
+
+
+class FallenAcesTestCase(TestCaseBase):
+
+    @parameterized.expand([
+        ('small_chunks', 1),
+        ('large_chunks', fallenaces.CHUNK_SIZE),
+    ])
+    def test_read_blocks(self, name: str, chunk_size: int):
+
+        # Start test.
+        blocks = list(fallenaces.BlockReader(io.StringIO(MAP_TEXT), chunk_size))
+
+        # Assert results.
+        self.assertListEqual(blocks, EXPECTED_BLOCKS)
+
+    def test_read_blocks_exported(self):
+        """
+        Test that blocks as the editor writes them are parsed whole by regex
+        to the same result as the tokenizer gives.
+
+        """
+        # Set up test data.
+        text = fallenaces.format_block(BlockType.SIDE, 0, {
+            'line': 0,
+            'sector': 1,
+            'side_plane': {},
+            'side_texture': {'path': 'Editor/Default.png', 'scale': (0.2, 0.2)},
+        })
+
+        # Start test.
+        match = fallenaces._SIMPLE_BLOCK_RE.match(text)
+        blocks = list(fallenaces.read_blocks(io.StringIO(text)))
+        tokens = fallenaces.TokenStream(io.StringIO(text))
+        expected_block = fallenaces.read_block(tokens)
+
+        # Assert results.
+        self.assertIsNotNone(match)
+        self.assertListEqual(blocks, [expected_block])
+
+    def test_read_map(self):
+
+        # Start test.
+        m = fallenaces.read_map(io.StringIO(MAP_TEXT))
+
+        # Assert results.
+        self.assertListEqual(m.vertex_x.tolist(), [1.0, 0.5])
+        self.assertListEqual(m.vertex_z.tolist(), [-25.0, 3.0])
+        self.assertListEqual(m.line_v1.tolist(), [0])
+        self.assertListEqual(m.line_opposite.tolist(), [-1])
+        self.assertListEqual(m.line_side_middle.tolist(), [0])
+        self.assertListEqual(m.sector_vertices.tolist(), [0, 1, 2])
+        self.assertListEqual(m.sector_vertex_offsets.tolist(), [0, 3])
+        self.assertListEqual(m.sector_lines.tolist(), [4])
+        self.assertEqual(m.num_sectors, 1)
+
+    @parameterized.expand([
+        ('bad_character', 'Vertex\n{\n  x = 1 $;\n}\n', 3),
+        ('missing_value', 'Vertex\n{\n  x = 1;\n  z = ;\n}\n', 4),
+        ('missing_semicolon', 'Vertex\n{\n  x = 1\n  z = 2;\n}\n', 4),
+        ('unclosed_block', 'Global\n{\n}\nVertex\n{\n  x = 1;\n', 6),
+        ('unknown_block_type', 'Global\n{\n}\n\nFoo\n{\n}\n', 5),
+        ('missing_key', 'Global\n{\n}\nVertex\n{\n  x = 1;\n}\n', 4),
+        ('bad_type', 'Line\n{\n  v1 = "a";\n  v2 = 1;\n}\n', 1),
+    ])
+    def test_read_map_error(self, name: str, text: str, expected_line_number: int):
+
+        # Start test.
+        with self.assertRaises(ValueError) as cm:
+            fallenaces.read_map(io.StringIO(text))
+
+        # Assert results.
+        self.assertTrue(str(cm.exception).startswith(f'Line {expected_line_number}:'), str(cm.exception))
+
+    def test_import_fallen_aces(self):
+
+        # Set up test data.
+        g = Graph()
+        self.build_grid(g, 3, 3)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        file_path = os.path.join(temp_dir.name, 'map.txt')
+        fallenaces.export_fallen_aces(g, file_path, MapFormat.FALLEN_ACES)
+        g2 = Graph()
+
+        # Start test.
+        fallenaces.import_fallen_aces(g2, file_path, MapFormat.FALLEN_ACES)
+
+        # Assert results.
+        self.assertEqual(len(g2.nodes), len(g.nodes))
+        self.assertEqual(len(g2.edges), len(g.edges))
+        self.assertSetEqual(
+            {(node.get_attribute('x'), node.get_attribute('y')) for node in g2.nodes},
+            {(node.get_attribute('x'), node.get_attribute('y')) for node in g.nodes},
+        )
+
+    @parameterized.expand([
+        ('small_chunks', 1),
+        ('large_chunks', fallenaces.CHUNK_SIZE),
+    ])
+    def test_block_writer(self, name: str, chunk_size: int):
+
+        # Set up test data.
+        f = io.StringIO()
+        writer = fallenaces.BlockWriter(f, chunk_size)
+        vertices = [{'x': 0.5, 'z': -1.0}, {'x': 2, 'z': 3}]
+
+        # Start test.
+        writer.write(BlockType.GLOBAL, None, {'map_version_major': 1})
+        writer.write_blocks([
+            fallenaces.VERTEX_TEMPLATE % (i, (i, i), vertex['x'], vertex['z'])
+            for i, vertex in enumerate(vertices)
+        ])
+        writer.flush()
+
+        # Assert results.
+        expected = [fallenaces.format_block(BlockType.GLOBAL, None, {'map_version_major': 1})]
+        for i, vertex in enumerate(vertices):
+            expected.append(fallenaces.format_block(BlockType.VERTEX, f'{i} - {(i, i)}', vertex))
+        self.assertEqual(f.getvalue(), ''.join(expected))
+
+    def test_export_fallen_aces(self):
+
+        # Set up test data.
+        g = Graph()
+        self.build_grid(g, 3, 2)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        file_path = os.path.join(temp_dir.name, 'map.txt')
+
+        # Start test.
+        fallenaces.export_fallen_aces(g, file_path, MapFormat.FALLEN_ACES)
+
+        # Assert results.
+        with open(file_path, 'r') as f:
+            m = fallenaces.read_map(f)
+        edges = [edge.data for edge in g.edges]
+        self.assertEqual(m.num_vertices, len(g.nodes))
+        self.assertEqual(m.num_lines, len(edges))
+        self.assertEqual(m.num_sides, len(edges))
+        self.assertEqual(m.num_sectors, 2)
+        for i, (head, tail) in enumerate(edges):
+            opposite = m.line_opposite[i]
+            if (tail, head) in edges:
+                self.assertEqual(edges[opposite], (tail, head))
+                self.assertEqual(m.line_side_middle[i], -1)
+            else:
+                self.assertEqual(opposite, -1)
+                self.assertEqual(m.line_side_middle[i], i)
+        self.assertListEqual(sorted(m.sector_vertex_offsets.tolist()), [0, 4, 8])
+
+    def test_export_fallen_aces_debug_logging(self):
+        """
+        Test that the per-element debug logging names each vertex and line
+        rather than the last vertex.
+
+        """
+        # Set up test data.
+        g = Graph()
+        self.build_grid(g, 2, 2)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        file_path = os.path.join(temp_dir.name, 'map.txt')
+
+        # Start test.
+        with self.assertLogs(fallenaces.logger, 'DEBUG') as logs:
+            fallenaces.export_fallen_aces(g, file_path, MapFormat.FALLEN_ACES)
+
+        # Assert results.
+        expected = [f'Adding vertex: {i} - {node.data}' for i, node in enumerate(g.nodes)]
+        expected.extend(f'Adding line: {i} - {edge.data}' for i, edge in enumerate(g.edges))
+        self.assertListEqual([record.getMessage() for record in logs.records], expected)
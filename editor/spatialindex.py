@@ -0,0 +1,95 @@
+import math
+from collections import defaultdict
+from typing import Any, Iterator
+
+
+Bounds = tuple[float, float, float, float]
+
+
+class GridIndex:
+    """
+    Uniform grid spatial hash mapping keys to their axis-aligned bounds.
+
+    Keys are bucketed into every cell their bounds touch, so inserting, moving
+    and removing a key only touches the cells it covers. Keys covering more
+    than max_cells cells are held separately and always returned as candidates
+    so very large faces don't flood the grid.
+
+    """
+
+    def __init__(self, cell_size: float, max_cells: int = 256):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self._cells = defaultdict(set)
+        self._key_to_cells = {}
+        self._key_to_bounds = {}
+        self._oversized = set()
+
+    def __len__(self):
+        return len(self._key_to_bounds)
+
+    def __contains__(self, key: Any):
+        return key in self._key_to_bounds
+
+    def _get_cell_range(self, bounds: Bounds) -> tuple[range, range]:
+        min_x, min_y, max_x, max_y = bounds
+        return (
+            range(math.floor(min_x / self.cell_size), math.floor(max_x / self.cell_size) + 1),
+            range(math.floor(min_y / self.cell_size), math.floor(max_y / self.cell_size) + 1),
+        )
+
+    def clear(self):
+        self._cells.clear()
+        self._key_to_cells.clear()
+        self._key_to_bounds.clear()
+        self._oversized.clear()
+
+    def insert(self, key: Any, bounds: Bounds):
+        if key in self._key_to_bounds:
+            self.remove(key)
+        self._key_to_bounds[key] = bounds
+        xs, ys = self._get_cell_range(bounds)
+        if len(xs) * len(ys) > self.max_cells:
+            self._oversized.add(key)
+            return
+        cells = [(x, y) for x in xs for y in ys]
+        for cell in cells:
+            self._cells[cell].add(key)
+        self._key_to_cells[key] = cells
+
+    def remove(self, key: Any):
+        if self._key_to_bounds.pop(key, None) is None:
+            return
+        self._oversized.discard(key)
+        for cell in self._key_to_cells.pop(key, ()):
+            keys = self._cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self._cells[cell]
+
+    def get_bounds(self, key: Any) -> Bounds:
+        return self._key_to_bounds[key]
+
+    def query(self, bounds: Bounds) -> Iterator[Any]:
+        """
+        Yield each key whose bounds overlap the given bounds.
+
+        """
+        min_x, min_y, max_x, max_y = bounds
+        seen = set()
+        xs, ys = self._get_cell_range(bounds)
+        if len(xs) * len(ys) > len(self._cells):
+            candidates = (key for keys in self._cells.values() for key in keys)
+        else:
+            candidates = (key for x in xs for y in ys for key in self._cells.get((x, y), ()))
+        for key in candidates:
+            if key in seen:
+                continue
+            seen.add(key)
+            key_min_x, key_min_y, key_max_x, key_max_y = self._key_to_bounds[key]
+            if key_min_x <= max_x and key_max_x >= min_x and key_min_y <= max_y and key_max_y >= min_y:
+                yield key
+        for key in self._oversized:
+            key_min_x, key_min_y, key_max_x, key_max_y = self._key_to_bounds[key]
+            if key_min_x <= max_x and key_max_x >= min_x and key_min_y <= max_y and key_max_y >= min_y:
+                yield key
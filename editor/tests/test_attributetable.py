@@ -0,0 +1,135 @@
+import numpy as np
+
+from editor.attributetable import AttributeTable
+from editor.tests.testcasebase import TestCaseBase
+from editor.texture import Texture
+
+
+class AttributeTableTestCase(TestCaseBase):
+
+    def test_add_row(self):
+        """
+        Test that values matching their column type are moved out of the
+        overrides dict and everything else is left in it.
+
+        """
+        # Set up test data.
+        table = AttributeTable({'x': 0.0, 'tag': 0, 'items': []})
+        overrides1 = {'x': 1.5, 'tag': 'foo', 'name': 'bar'}
+        overrides2 = {}
+
+        # Start test.
+        table.add_row('a', overrides1)
+        table.add_row('b', overrides2)
+
+        # Assert results.
+        self.assertDictEqual(overrides1, {'tag': 'foo', 'name': 'bar'})
+        self.assertDictEqual(table.get_values('a'), {'x': 1.5, 'tag': 'foo', 'items': [], 'name': 'bar'})
+        self.assertDictEqual(table.get_values('b'), {'x': 0.0, 'tag': 0, 'items': []})
+        self.assertIs(type(table.get_value('b', 'tag')), int)
+        self.assertIsNot(table.get_value('a', 'items'), table.get_value('b', 'items'))
+        self.assertIsNone(table.get_value('b', 'name'))
+
+    def test_set_value(self):
+
+        # Set up test data.
+        table = AttributeTable({'x': 0.0, 'tex': Texture(0)})
+        overrides = {}
+        table.add_row('a', overrides)
+
+        # Start test.
+        table.set_value('a', 'x', 2)
+        table.set_value('a', 'tex', Texture('FOO'))
+        overrides_after_int = dict(overrides)
+        table.set_value('a', 'x', 3.0)
+
+        # Assert results.
+        self.assertDictEqual(overrides_after_int, {'x': 2})
+        self.assertDictEqual(overrides, {})
+        self.assertEqual(table.get_value('a', 'x'), 3.0)
+        self.assertEqual(table.get_value('a', 'tex'), Texture('FOO'))
+
+    def test_remove_row(self):
+
+        # Set up test data.
+        table = AttributeTable({'x': 0.0})
+        for i in range(3):
+            table.add_row(i, {'x': float(i)})
+
+        # Start test.
+        table.remove_row(0)
+
+        # Assert results.
+        self.assertEqual(len(table), 2)
+        self.assertNotIn(0, table)
+        self.assertDictEqual(table.key_to_row, {2: 0, 1: 1})
+        self.assertEqual(table.get_value(2, 'x'), 2.0)
+        self.assertEqual(table.get_value(1, 'x'), 1.0)
+
+    def test_rebuild(self):
+        """
+        Test that rows whose overrides dict is unchanged keep their column
+        values and rows with new dicts are rebuilt from them.
+
+        """
+        # Set up test data.
+        table = AttributeTable({'x': 0.0})
+        overrides0 = {'x': 1.0}
+        table.add_row(0, overrides0)
+        table.add_row(1, {'x': 2.0})
+
+        # Start test.
+        table.rebuild(((2, {'x': 3.0}), (0, overrides0), (1, {})))
+
+        # Assert results.
+        self.assertDictEqual(table.key_to_row, {2: 0, 0: 1, 1: 2})
+        self.assertEqual(table.get_value(0, 'x'), 1.0)
+        self.assertEqual(table.get_value(1, 'x'), 0.0)
+        self.assertEqual(table.get_value(2, 'x'), 3.0)
+
+    def test_set_schema(self):
+        """
+        Test that changing a default's type keeps existing values and that
+        dropping a default moves its values into the overrides.
+
+        """
+        # Set up test data.
+        table = AttributeTable({'tag': 0, 'shade': 1.0})
+        overrides = {'tag': 5}
+        table.add_row('a', overrides)
+
+        # Start test.
+        table.set_schema({'tag': 'none'})
+        table.set_value('a', 'tag', 'foo')
+
+        # Assert results.
+        values, present = table.get_column('tag')
+        self.assertEqual(values.dtype, np.dtype(object))
+        self.assertListEqual(values.tolist(), ['foo'])
+        self.assertListEqual(present.tolist(), [True])
+        self.assertDictEqual(overrides, {'shade': 1.0})
+        self.assertDictEqual(table.get_values('a'), {'tag': 'foo', 'shade': 1.0})
+
+    def test_get_column_values(self):
+        """
+        Test that rows without a column value fall back to their overrides or
+        the default, and that the array only becomes objects if a fallback
+        value doesn't fit the column type.
+
+        """
+        # Set up test data.
+        table = AttributeTable({'z': 0})
+        table.add_row('a', {'z': 1, 'tag': 2})
+        table.add_row('b', {'z': 1.5})
+        table.add_row('c', {})
+        rows = table.get_rows(['c', 'b', 'a'])
+
+        # Start test.
+        z = table.get_column_values(rows, 'z')
+        tag = table.get_column_values(rows, 'tag', -1)
+
+        # Assert results.
+        self.assertListEqual(rows.tolist(), [2, 1, 0])
+        self.assertEqual(z.dtype, np.dtype(object))
+        self.assertListEqual(z.tolist(), [0, 1.5, 1])
+        self.assertListEqual(tag.tolist(), [-1, -1, 2])
@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from editor import binaryformat
+from editor.constants import ATTRIBUTES, EDGE_DEFAULT, FACES, IS_SELECTED
+from editor.graph import Graph
+from editor.tests.testcasebase import TestCaseBase
+from editor.texture import Texture
+
+
+class BinaryFormatTestCase(TestCaseBase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_data_dir_path = Path(__file__).parent.joinpath('data')
+
+    def setUp(self):
+        super().setUp()
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.binary_file_path = os.path.join(self.temp_dir.name, f'map{binaryformat.BINARY_FILE_SUFFIX}')
+        self.json_file_path = os.path.join(self.temp_dir.name, 'map.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+        super().tearDown()
+
+    def test_round_trip_json(self):
+        """
+        Test that converting JSON to binary and back again is lossless.
+
+        """
+        # Set up test data.
+        g1 = Graph()
+        g1.load(self.test_data_dir_path.joinpath('1_squares.json'))
+
+        # Start test.
+        g1.save(self.binary_file_path)
+        g2 = Graph()
+        g2.load(self.binary_file_path)
+        g2.save(self.json_file_path)
+
+        # Assert results.
+        self.assertTrue(binaryformat.is_binary(self.binary_file_path))
+        self.assertFalse(binaryformat.is_binary(self.json_file_path))
+        with open(self.test_data_dir_path.joinpath('1_squares.json'), 'r') as f:
+            expected = json.load(f)
+        with open(self.json_file_path, 'r') as f:
+            result = json.load(f)
+        self.assertDictEqual(result, expected)
+
+    def test_round_trip_types(self):
+
+        # Set up test data.
+        g1 = Graph(foo=True)
+        g1.add_edge_attribute_definition('low_tex', Texture(0))
+        g1.add_node(0, x=0.0, y=0.0, tag=1, name='zero')
+        g1.add_node(1, x=1.0, y=0.0, tag=2.5)
+        g1.add_node('two', x=1.0, y=1.0, tag=3, items=[1, 'a'])
+        g1.add_edge((0, 1), low_tex=Texture('STARTAN3'))
+        g1.add_edge((1, 'two'), low_tex=Texture(7))
+        g1.add_edge(('two', 0))
+        g1.add_face((0, 1, 'two', 0), floor_tex=Texture('FLOOR4_8'), shade=0.9)
+
+        # Start test.
+        g1.save(self.binary_file_path)
+        g2 = Graph()
+        g2.load(self.binary_file_path)
+
+        # Assert results.
+        self.assertDictEqual(g2.data.graph[EDGE_DEFAULT], {'low_tex': Texture(0)})
+        self.assertListEqual(list(g2.data.nodes), [0, 1, 'two'])
+        self.assertDictEqual(dict(g2.data.nodes(data=True)), dict(g1.data.nodes(data=True)))
+        self.assertListEqual(list(g2.data.edges(data=True)), list(g1.data.edges(data=True)))
+        self.assertDictEqual(g2.data.graph[FACES], g1.data.graph[FACES])
+        self.assertIs(type(g2.data.nodes[0][ATTRIBUTES]['tag']), int)
+        self.assertIs(type(g2.data.nodes[1][ATTRIBUTES]['tag']), float)
+        self.assertNotIn('name', g2.data.nodes[1][ATTRIBUTES])
+        self.assertEqual(g2.get_node(1).pos.to_tuple(), (1.0, 0.0))
+
+    def test_round_trip_private_data(self):
+        """
+        Test that per-element data besides the attributes, eg selection state,
+        survives a round trip as it does in JSON.
+
+        """
+        # Set up test data.
+        g1 = Graph()
+        g1.add_node(0, x=0.0, y=0.0)
+        g1.add_node(1, x=1.0, y=0.0)
+        g1.add_node(2, x=1.0, y=1.0)
+        g1.add_edge((0, 1))
+        g1.add_edge((1, 2))
+        g1.add_edge((2, 0))
+        g1.add_face((0, 1, 2, 0))
+        g1.data.nodes[1][IS_SELECTED] = True
+        g1.data.edges[1, 2][IS_SELECTED] = False
+        g1.data.graph[FACES][(0, 1, 2, 0)]['note'] = 'a'
+
+        # Start test.
+        g1.save(self.binary_file_path)
+        g2 = Graph()
+        g2.load(self.binary_file_path)
+
+        # Assert results.
+        self.assertDictEqual(dict(g2.data.nodes(data=True)), dict(g1.data.nodes(data=True)))
+        self.assertListEqual(list(g2.data.edges(data=True)), list(g1.data.edges(data=True)))
+        self.assertDictEqual(g2.data.graph[FACES], g1.data.graph[FACES])
+        self.assertNotIn(IS_SELECTED, g2.data.nodes[0])
+        self.assertTrue(g2.get_node(1).is_selected)
+
+    def test_empty(self):
+
+        # Set up test data.
+        g1 = Graph()
+
+        # Start test.
+        g1.save(self.binary_file_path)
+        g2 = Graph()
+        g2.load(self.binary_file_path)
+
+        # Assert results.
+        self.assertEqual(len(g2.data), 0)
+        self.assertDictEqual(g2.data.graph[FACES], {})
@@ -1,6 +1,8 @@
 import uuid
 from unittest.mock import patch
 
+from parameterized import parameterized
+
 from editor import commands
 from editor.tests.testcasebase import TestCaseBase
 
@@ -345,6 +347,23 @@ class CommandsTestCase(TestCaseBase):
     #     self.assertEqual(len(self.c.edges), 8)
     #     self.assertEqual(len(self.c.faces), 2)
 
+    @parameterized.expand([
+        ('near', 1.0, [((2, 3), (5, 4))]),
+        ('far', 0.5, []),
+    ])
+    def test_find_all_candidate_matches(self, name: str, max_distance: float, expected: list):
+
+        # Set up test data.
+        self.build_grid(self.c, 2, 2)
+        self.build_grid(self.c, 2, 2, offset_x=2)
+        edges = [self.c.get_edge(2, 3), self.c.get_edge(0, 2), self.c.get_edge(5, 4)]
+
+        # Start test.
+        candidates = commands.find_all_candidate_matches(edges, max_distance, 0)
+
+        # Assert results.
+        self.assertListEqual([(edge1.data, edge2.data) for _, edge1, edge2 in candidates], expected)
+
     def test_join_edges_single(self):
 
         # TODO: Test face / edge data is retained.
@@ -0,0 +1,57 @@
+import numpy as np
+import omg
+from parameterized import parameterized
+
+from editor.adaptors.doom import composite_texture, decode_patch
+from editor.tests.testcasebase import TestCaseBase
+
+
+class DoomAdaptorTestCase(TestCaseBase):
+
+    @parameterized.expand(((8, 16), (37, 128), (4, 300)))
+    def test_decode_patch(self, width: int, height: int):
+        """
+        Test that decoding a patch matches omgifol's per-pixel decoder,
+        including tall patches whose post offsets are relative.
+
+        """
+        # Set up test data.
+        rng = np.random.default_rng(0)
+        pixels = [
+            None if rng.random() < 0.3 else int(rng.integers(0, 255))
+            for _ in range(width * height)
+        ]
+        graphic = omg.Graphic()
+        graphic.from_pixels(pixels, width, height)
+
+        # Start test.
+        indices, mask = decode_patch(graphic.data)
+
+        # Assert results.
+        expected_mask = np.array([p is not None for p in graphic.to_pixels()]).reshape((height, width))
+        expected_indices = np.array([p or 0 for p in graphic.to_pixels()], dtype=np.uint8).reshape((height, width))
+        np.testing.assert_array_equal(mask, expected_mask)
+        np.testing.assert_array_equal(indices[mask], expected_indices[mask])
+
+    def test_composite_texture(self):
+
+        # Set up test data.
+        indices1 = np.full((2, 2), 1, dtype=np.uint8)
+        mask1 = np.ones((2, 2), dtype=bool)
+        indices2 = np.full((2, 2), 2, dtype=np.uint8)
+        mask2 = np.array([[True, False], [False, True]])
+
+        # Start test.
+        texture = composite_texture(3, 3, (
+            (0, 0, indices1, mask1),
+            (1, 1, indices2, mask2),
+            (-1, 2, indices2, mask2),
+            (5, 5, indices1, mask1),
+        ))
+
+        # Assert results.
+        np.testing.assert_array_equal(texture, [
+            [1, 1, 0],
+            [1, 2, 0],
+            [0, 0, 2],
+        ])
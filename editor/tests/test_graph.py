@@ -1,9 +1,14 @@
 import json
 import os
+import random
 import tempfile
 from pathlib import Path
 
-from editor.constants import ATTRIBUTES, EDGE_DEFAULT, FACE_DEFAULT, NODE_DEFAULT
+import numpy as np
+from PySide6.QtCore import QPointF, QRectF
+from parameterized import parameterized
+
+from editor.constants import ATTRIBUTES, EDGE_DEFAULT, FACE_DEFAULT, FACES, IS_SELECTED, NODE_DEFAULT
 from editor.graph import Graph
 from editor.tests.testcasebase import TestCaseBase
 
@@ -185,3 +190,386 @@ class GraphTestCase(TestCaseBase):
             self.assertDictEqual(data['graph'][FACE_DEFAULT], {'qux': 'four'})
         finally:
             os.remove(file_path)
+
+    def test_get_node_interned(self):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+
+        # Start test.
+        node = g.get_node(0)
+
+        # Assert results.
+        self.assertIs(node, g.get_node(0))
+        self.assertIs(node, g.get_edge(0, 1).head)
+        self.assertIs(node, g.get_face((0, 1, 2, 3, 0)).nodes[0])
+        self.assertIn(node, g.nodes)
+
+    def test_remove_node_invalidates_handles(self):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+        node = g.get_node(0)
+        edge = g.get_edge(0, 1)
+        g.remove_face((0, 1, 2, 3, 0))
+
+        # Start test.
+        g.remove_node(0)
+
+        # Assert results.
+        self.assertNotIn(node, g.nodes)
+        self.assertNotIn(edge, g.edges)
+        self.assertEqual(len(g.nodes), 3)
+        self.assertEqual(len(g.edges), 2)
+        self.assertEqual(len(g.faces), 0)
+        g.add_node(0)
+        self.assertIsNot(node, g.get_node(0))
+
+    def test_get_positions(self):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+        g.remove_face((0, 1, 2, 3, 0))
+        g.remove_node(1)
+
+        # Start test.
+        positions = g.get_positions((3, 0, 2))
+
+        # Assert results.
+        self.assertEqual(positions.tolist(), [[0, 1], [0, 0], [1, 1]])
+        self.assertEqual(g.positions.shape, (3, 2))
+
+    def test_set_positions(self):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+
+        # Start test.
+        g.set_positions((1, 2), ((5, 6), (7, 8)))
+        g.get_node(3).pos = QPointF(9, 10)
+
+        # Assert results.
+        self.assertEqual(g.get_positions((1, 2, 3)).tolist(), [[5, 6], [7, 8], [9, 10]])
+        self.assertEqual((g.get_node(1).get_attribute('x'), g.get_node(1).get_attribute('y')), (5, 6))
+        self.assertEqual((g.get_node(3).get_attribute('x'), g.get_node(3).get_attribute('y')), (9, 10))
+        self.assertEqual(g.get_node(2).pos, QPointF(7, 8))
+
+    @parameterized.expand([
+        ('node', [(0, 0)], None, None),
+        ('edge', [(0, 1), (1, 2), (2, 0)], [(0, 1), (1, 9)], None),
+        ('face', [(0, 0), (1, 0), (1, 1)], [(0, 1), (1, 2), (2, 0)], [(0, 2, 1, 0)]),
+        ('attrs', [(0, 0)], [], []),
+    ])
+    def test_add_from_validate(self, name: str, positions: list, edges: list | None, faces: list | None):
+
+        # Set up test data.
+        g = Graph()
+
+        # Start test.
+        with self.assertRaises(ValueError):
+            if name == 'attrs':
+                g.add_nodes_from((0, 1), attrs=({},))
+            g.add_nodes_from(range(2), positions=positions)
+            g.add_edges_from(edges or [])
+            g.add_faces_from(faces or [])
+
+        # Assert results.
+        self.assertNotIn((1, 9), g.data.edges)
+        self.assertNotIn(9, g.data.nodes)
+        self.assertDictEqual(g.data.graph[FACES], {})
+
+    @parameterized.expand([
+        (QPointF(0.1, 0.1), 0.5, 0),
+        (QPointF(0.9, 1.2), 0.5, 2),
+        (QPointF(0.5, 0.5), 0.5, None),
+        (QPointF(0.5, 0.5), 1, 0),
+    ])
+    def test_nearest_node(self, pos: QPointF, radius: float, expected: int | None):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+
+        # Start test.
+        node = g.nearest_node(pos, radius)
+
+        # Assert results.
+        self.assertEqual(node.data if node is not None else None, expected)
+
+    @parameterized.expand([
+        (QRectF(-0.5, -0.5, 1, 1), {0}),
+        (QRectF(0.25, 0.25, 0.5, 0.5), set()),
+        (QRectF(0, 0, 1, 1), {0, 1, 2, 3}),
+    ])
+    def test_nodes_in_rect(self, rect: QRectF, expected: set):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+
+        # Start test.
+        nodes = g.nodes_in_rect(rect)
+
+        # Assert results.
+        self.assertSetEqual({node.data for node in nodes}, expected)
+
+    @parameterized.expand([
+        (QRectF(-0.5, 0.25, 0.75, 0.5), {(3, 0)}),
+        (QRectF(0.25, 0.25, 0.5, 0.5), set()),
+        (QRectF(0.75, -0.5, 1, 1), {(0, 1), (1, 2)}),
+        (QRectF(-1, -1, 3, 3), {(0, 1), (1, 2), (2, 3), (3, 0)}),
+    ])
+    def test_edges_in_rect(self, rect: QRectF, expected: set[tuple]):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+
+        # Start test.
+        edges = g.edges_in_rect(rect)
+
+        # Assert results.
+        self.assertSetEqual({edge.data for edge in edges}, expected)
+
+    @parameterized.expand([
+        (QPointF(0.5, 0.5), None),
+        (QPointF(0.1, 0.1), (0, 1, 2, 3, 0, 4, 5, 6, 7, 4)),
+        (QPointF(2, 2), None),
+    ])
+    def test_face_at(self, pos: QPointF, expected: tuple | None):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)), ((0.25, 0.25), (0.25, 0.75), (0.75, 0.75), (0.75, 0.25)))
+
+        # Start test.
+        face = g.face_at(pos)
+
+        # Assert results.
+        self.assertEqual(face.data if face is not None else None, expected)
+
+    def test_spatial_index_follows_node_move(self):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+
+        # Start test.
+        g.get_node(2).pos = QPointF(5, 5)
+
+        # Assert results.
+        self.assertIsNone(g.nearest_node(QPointF(1, 1), 0.5))
+        self.assertEqual(g.nearest_node(QPointF(5, 5), 0.5), g.get_node(2))
+        self.assertSetEqual({edge.data for edge in g.edges_in_rect(QRectF(4, 4, 2, 2))}, {(1, 2), (2, 3)})
+        self.assertEqual(g.face_at(QPointF(3, 3)), g.get_face((0, 1, 2, 3, 0)))
+
+    def test_selection_index(self):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+        face = g.get_face((0, 1, 2, 3, 0))
+        for element in (g.get_node(0), g.get_node(1), g.get_edge(0, 1), face):
+            element.is_selected = True
+        g.reset_selection_delta()
+
+        # Start test.
+        g.get_node(1).is_selected = False
+        g.get_node(2).is_selected = True
+        g.get_node(2).is_selected = False
+        g.get_node(3).is_selected = True
+        g.remove_face(face.data)
+
+        # Assert results.
+        self.assertSetEqual(g.selected_nodes, {g.get_node(0), g.get_node(3)})
+        self.assertSetEqual(g.selected_edges, {g.get_edge(0, 1)})
+        self.assertSetEqual(g.selected_faces, set())
+        self.assertSetEqual(g.selection_delta.added, {g.get_node(3)})
+        self.assertSetEqual(g.selection_delta.removed, {g.get_node(1), face})
+
+    def test_selection_index_update(self):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+        g.data.nodes[2][IS_SELECTED] = True
+        g.data.edges[2, 3][IS_SELECTED] = True
+
+        # Start test.
+        g.update()
+
+        # Assert results.
+        self.assertSetEqual(g.selected_nodes, {g.get_node(2)})
+        self.assertSetEqual(g.selected_edges, {g.get_edge(2, 3)})
+        self.assertFalse(g.selection_delta)
+
+    def test_content_delta(self):
+
+        # Set up test data.
+        g = Graph()
+        self.create_polygon(g, ((0, 0), (1, 0), (1, 1), (0, 1)))
+        g.reset_content_delta()
+
+        # Start test.
+        g.get_node(1).pos = QPointF(2, 0)
+        g.get_face((0, 1, 2, 3, 0)).set_attribute('floorz', 1)
+        g.remove_face((0, 1, 2, 3, 0))
+        g.remove_node(3)
+        g.add_node(4)
+        g.add_edge((2, 4))
+        g.add_edge((4, 5))
+        g.remove_node(5)
+
+        # Assert results.
+        self.assertFalse(g.content_delta.rebuild)
+        self.assertSetEqual(g.content_delta.added, {g.get_node(4), g.get_edge(2, 4)})
+        self.assertSetEqual(
+            {element.data for element in g.content_delta.removed},
+            {(0, 1, 2, 3, 0), 3, (2, 3), (3, 0)},
+        )
+        self.assertSetEqual(g.content_delta.modified, {g.get_node(1)})
+
+    def test_content_delta_update(self):
+
+        # Set up test data.
+        g = Graph()
+        g.add_node(0)
+
+        # Start test.
+        g.update()
+
+        # Assert results.
+        self.assertTrue(g.content_delta.rebuild)
+
+
+class IncrementalUpdateTestCase(TestCaseBase):
+
+    MAP_NAMES = (
+        'node_to_edges',
+        'node_to_in_edges',
+        'node_to_out_edges',
+        'node_to_faces',
+        'edge_to_nodes',
+        'edge_to_face',
+        'ring_to_nodes',
+        'ring_to_edges',
+        'face_to_nodes',
+        'face_to_edges',
+        'face_to_rings',
+    )
+
+    def get_maps(self, g: Graph):
+
+        # Full rebuilds leave empty entries for isolated nodes, so ignore those.
+        return {
+            name: {k: v for k, v in getattr(g, name).items() if v}
+            for name in self.MAP_NAMES
+        }
+
+    def add_random_polygon(self, g: Graph, rng: random.Random):
+        x, y = rng.randint(0, 100), rng.randint(0, 100)
+        nodes = [len(g.data) + i for i in range(rng.randint(3, 6))]
+        while any(g.has_node(node) for node in nodes):
+            nodes = [node + len(nodes) for node in nodes]
+        for i, node in enumerate(nodes):
+            g.add_node(node, x=x + i, y=y + i % 2)
+        for i in range(len(nodes)):
+            g.add_edge((nodes[i], nodes[(i + 1) % len(nodes)]))
+        g.add_face(tuple(nodes + [nodes[0]]))
+
+    def remove_random_face(self, g: Graph, rng: random.Random):
+        g.remove_face(rng.choice(sorted(g.data.graph[FACES], key=str)))
+
+    def remove_random_edge(self, g: Graph, rng: random.Random):
+        edge = g.get_edge(*rng.choice(sorted(g.data.edges, key=str)))
+        for face in edge.faces:
+            g.remove_face(face.data)
+        g.remove_edge(edge.data)
+
+    def remove_random_node(self, g: Graph, rng: random.Random):
+        node = g.get_node(rng.choice(sorted(g.data.nodes, key=str)))
+        for face in node.faces:
+            g.remove_face(face.data)
+        g.remove_node(node.data)
+
+    def add_random_reversed_edge(self, g: Graph, rng: random.Random):
+        head, tail = rng.choice(sorted(g.data.edges, key=str))
+        g.add_edge((tail, head))
+
+    def test_add_from_matches_add(self):
+
+        # Set up test data.
+        g1 = Graph()
+        g1.add_edge_attribute_definition('shade', 1)
+        self.build_grid(g1, 3, 3)
+        g1.add_edge((0, 1), shade=0.5)
+        g2 = Graph()
+        g2.add_edge_attribute_definition('shade', 1)
+
+        # Start test.
+        g2.add_nodes_from(
+            np.array(list(g1.data.nodes)),
+            positions=g1.get_positions(list(g1.data.nodes)),
+        )
+        g2.add_edges_from(g1.data.edges, (g1.get_edge(*edge).get_attributes() for edge in g1.data.edges))
+        g2.add_faces_from(
+            g1.data.graph[FACES],
+            (g1.get_face(face).get_attributes() for face in g1.data.graph[FACES]),
+            validate=False,
+        )
+        g2.update()
+
+        # Assert results.
+        self.assertEqual(self.get_maps(g1), self.get_maps(g2))
+        self.assertEqual(g1.positions.tolist(), g2.positions.tolist())
+        self.assertIs(type(list(g2.data.nodes)[0]), int)
+        for node in g1.nodes:
+            self.assertDictEqual(node.get_attributes(), g2.get_node(node.data).get_attributes())
+        for edge in g1.edges:
+            self.assertDictEqual(edge.get_attributes(), g2.get_edge(*edge.data).get_attributes())
+        self.assertEqual(g2.get_edge(0, 1)['shade'], 0.5)
+        self.assertIs(type(g2.get_edge(1, 4)['shade']), int)
+
+    @parameterized.expand(range(10))
+    def test_incremental_matches_update(self, seed: int):
+
+        # Set up test data.
+        rng = random.Random(seed)
+        g = Graph()
+        self.build_grid(g, 3, 3)
+        ops = (
+            self.add_random_polygon,
+            self.remove_random_face,
+            self.remove_random_edge,
+            self.remove_random_node,
+            self.add_random_reversed_edge,
+        )
+
+        # Only ever update g incrementally, so that any drift accumulates over
+        # the whole sequence. Compare against a copy rebuilt from scratch.
+        for _ in range(50):
+
+            # Start test.
+            op = rng.choice(ops)
+            if op is not self.add_random_polygon and not g.data.graph[FACES]:
+                op = self.add_random_polygon
+            op(g, rng)
+            rebuilt = Graph()
+            rebuilt.data = g.copy_data()
+            rebuilt.update()
+
+            # Assert results.
+            nodes = list(g.data.nodes)
+            incremental_maps = self.get_maps(g)
+            rebuilt_maps = self.get_maps(rebuilt)
+            for name in self.MAP_NAMES:
+                self.assertEqual(incremental_maps[name], rebuilt_maps[name], name)
+            self.assertEqual(g.get_positions(nodes).tolist(), rebuilt.get_positions(nodes).tolist())
+            self.assertSetEqual(
+                set(g.edges_in_rect(QRectF(0, 0, 50, 50))),
+                set(rebuilt.edges_in_rect(QRectF(0, 0, 50, 50))),
+            )
@@ -0,0 +1,56 @@
+from editor.lazymapping import LazyMapping
+from editor.tests.testcasebase import TestCaseBase
+
+
+class LazyMappingTestCase(TestCaseBase):
+
+    def test_lazy(self):
+
+        # Set up test data.
+        calls = []
+        source = {'a': 1, 'b': 2, 'c': 3}
+
+        def factory(key):
+            calls.append(key)
+            return source[key] * 10
+
+        # Start test.
+        mapping = LazyMapping(source, factory)
+        num_calls = len(calls)
+        value1 = mapping['b']
+        value2 = mapping['b']
+
+        # Assert results.
+        self.assertEqual(num_calls, 0)
+        self.assertEqual(value1, 20)
+        self.assertEqual(value2, 20)
+        self.assertListEqual(calls, ['b'])
+        self.assertListEqual(list(mapping), ['a', 'b', 'c'])
+        self.assertEqual(len(mapping), 3)
+        self.assertIn('c', mapping)
+        self.assertNotIn('d', mapping)
+        with self.assertRaises(KeyError):
+            mapping['d']
+
+    def test_max_size(self):
+
+        # Set up test data.
+        calls = []
+        source = {'a': 1, 'b': 2, 'c': 3}
+
+        def factory(key):
+            calls.append(key)
+            return source[key]
+
+        # Start test.
+        mapping = LazyMapping(source, factory, max_size=2)
+        mapping['a']
+        mapping['b']
+        mapping['a']
+        mapping['c']
+        mapping['a']
+        mapping['b']
+
+        # Assert results.
+        self.assertListEqual(calls, ['a', 'b', 'c', 'b'])
+        self.assertEqual(mapping.num_cached, 2)
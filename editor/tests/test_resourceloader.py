@@ -0,0 +1,94 @@
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from editor.adaptors.base import AdaptorBase, report_progress
+from editor.adaptors.manager import ResourceLoader
+from editor.graph import Graph
+from editor.tests.testcasebase import TestCaseBase
+
+# noinspection PyUnresolvedReferences
+from __feature__ import snake_case
+
+
+class MockAdaptor(AdaptorBase):
+
+    name = 'mock'
+    icon_name = 'mock'
+    temp_map_name = 'mock'
+    subprocess_args = []
+
+    def __init__(self, num_textures: int, event: threading.Event | None = None):
+        self.num_textures = num_textures
+        self.num_built = 0
+        self.event = event
+        super().__init__()
+
+    @property
+    def settings_cls(self):
+        return lambda: None
+
+    def build_textures(self, cancel_event=None, progress=None):
+        textures = {}
+        for i in range(self.num_textures):
+            if self.event is not None:
+                self.event.wait(5)
+            textures[i] = np.zeros((2, 2, 3), dtype=np.uint8)
+            self.num_built += 1
+            report_progress(i + 1, self.num_textures, cancel_event, progress)
+        return textures
+
+    def export_temp_map(self, g: Graph, path: Path):
+        pass
+
+
+class ResourceLoaderTestCase(TestCaseBase):
+
+    def wait(self, loader: ResourceLoader, timeout: float = 5):
+        start = time.time()
+        while loader.is_loading and time.time() - start < timeout:
+            self.mock_app.process_events()
+            time.sleep(0.01)
+        self.mock_app.process_events()
+
+    def test_load(self):
+
+        # Set up test data.
+        adaptor = MockAdaptor(3)
+        loader = ResourceLoader()
+        progress = []
+        loader.progress.connect(lambda num_done, num_textures: progress.append((num_done, num_textures)))
+
+        # Start test.
+        loader.load(adaptor)
+        self.wait(loader)
+
+        # Assert results.
+        self.assertEqual(len(adaptor.textures), 3)
+        self.assertListEqual(progress, [(0, 0), (1, 3), (2, 3), (3, 3)])
+        loader.shutdown()
+
+    def test_cancel(self):
+
+        # Set up test data.
+        event = threading.Event()
+        adaptor1 = MockAdaptor(3, event)
+        adaptor2 = MockAdaptor(2)
+        loader = ResourceLoader()
+        cancelled = []
+        loader.cancelled.connect(cancelled.append)
+
+        # Start test.
+        loader.load(adaptor1)
+        loader.load(adaptor2)
+        event.set()
+        self.wait(loader)
+
+        # Assert results.
+        self.assertEqual(len(adaptor1.textures), 0)
+        self.assertLessEqual(adaptor1.num_built, 1)
+        self.assertEqual(len(adaptor2.textures), 2)
+        self.assertListEqual(cancelled, [adaptor1])
+        loader.shutdown()
@@ -0,0 +1,71 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from editor.tests.testcasebase import TestCaseBase
+from editor.texturecache import TextureCache
+
+
+class TextureCacheTestCase(TestCaseBase):
+
+    def test_round_trip(self):
+
+        # Set up test data.
+        textures = {
+            0: np.arange(2 * 3 * 3, dtype=np.uint8).reshape((2, 3, 3)),
+            'FLAT1': np.full((4, 4, 3), 7, dtype=np.uint8),
+        }
+
+        # Start test.
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TextureCache(temp_dir)
+            self.assertIsNone(cache.load('key'))
+            cache.save('key', textures)
+            results = cache.load('key')
+
+            # Assert results.
+            self.assertListEqual(list(results), [0, 'FLAT1'])
+            for id_, texture in textures.items():
+                self.assertEqual(results[id_].shape, texture.shape)
+                self.assertTrue(np.array_equal(results[id_], texture))
+            del results
+
+    def test_get_key(self):
+
+        # Set up test data.
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, 'source.wad')
+            path.write_bytes(b'foo')
+
+            # Start test.
+            key1 = TextureCache.get_key('doom', (path,))
+            key2 = TextureCache.get_key('build', (path,))
+            path.write_bytes(b'bar')
+            key3 = TextureCache.get_key('doom', (path,))
+            path.write_bytes(b'foo')
+            key4 = TextureCache.get_key('doom', (path,))
+
+        # Assert results.
+        self.assertEqual(len({key1, key2, key3}), 3)
+        self.assertEqual(key1, key4)
+
+    def test_load_stale(self):
+        """
+        Test that a data file that doesn't match its index is a cache miss
+        rather than an error.
+
+        """
+        # Set up test data.
+        textures = {0: np.zeros((4, 4, 3), dtype=np.uint8)}
+
+        # Start test.
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TextureCache(temp_dir)
+            cache.save('key', textures)
+            np.save(Path(temp_dir, 'key.npy'), np.zeros(5, dtype=np.uint8))
+            with self.assertLogs('editor.texturecache', 'WARNING'):
+                result = cache.load('key')
+
+        # Assert results.
+        self.assertIsNone(result)
@@ -0,0 +1,56 @@
+import logging
+import os
+from unittest import mock
+
+from editor import tracing
+from editor.tests.testcasebase import TestCaseBase
+
+
+class TracingTestCase(TestCaseBase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.level = tracing.logger.level
+        tracing.logger.setLevel(logging.NOTSET)
+
+    def tearDown(self):
+        tracing.logger.setLevel(self.level)
+
+        super().tearDown()
+
+    def test_disabled(self):
+
+        # Set up test data.
+        trace = tracing.Trace('foo')
+
+        # Start test.
+        trace.mark('bar')
+        trace.count('baz', 1)
+        with self.assertNoLogs(tracing.logger, logging.DEBUG):
+            trace.done()
+
+        # Assert results.
+        self.assertFalse(trace.enabled)
+        self.assertDictEqual(trace.phases, {})
+        self.assertDictEqual(trace.counts, {})
+
+    def test_configure(self):
+
+        # Start test.
+        with mock.patch.dict(os.environ, {tracing.ENV_VAR: '1'}):
+            tracing.configure()
+        trace = tracing.Trace('foo')
+        trace.mark('bar')
+        trace.mark('qux')
+        trace.mark('bar')
+        trace.count('baz', 1)
+        with self.assertLogs(tracing.logger, logging.DEBUG) as logs:
+            trace.done()
+
+        # Assert results.
+        self.assertTrue(trace.enabled)
+        self.assertListEqual(list(trace.phases), ['bar', 'qux'])
+        self.assertDictEqual(trace.counts, {'baz': 1})
+        self.assertEqual(len(logs.records), 1)
+        self.assertRegex(logs.records[0].getMessage(), r'^foo: [\d.]+s \(bar [\d.]+s, qux [\d.]+s\) \[baz=1\]$')
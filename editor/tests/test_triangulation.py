@@ -0,0 +1,57 @@
+import numpy as np
+from parameterized import parameterized
+
+from editor import triangulation
+from editor.tests.testcasebase import TestCaseBase
+
+
+class TriangulationTestCase(TestCaseBase):
+
+    def test_triangulate_rings(self):
+
+        # Set up test data.
+        vertices = np.array(((0, 0), (4, 0), (4, 4), (0, 4), (1, 1), (1, 3), (3, 3), (3, 1)), dtype=np.float32)
+
+        # Start test.
+        indices = triangulation.triangulate_rings(vertices, np.array((4, 8)))
+
+        # Assert results.
+        triangles = vertices[indices].reshape(-1, 3, 2)
+        areas = np.abs(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])) / 2
+        self.assertEqual(len(triangles), 8)
+        self.assertAlmostEqual(areas.sum(), 12)
+
+    def test_triangulate_rings_degenerate_hole(self):
+
+        # Set up test data.
+        vertices = np.array(((0, 0), (4, 0), (4, 4), (0, 4), (2, 2), (2, 3), (1, 1), (1, 3), (3, 3), (3, 1)), dtype=np.float32)
+
+        # Start test.
+        indices = triangulation.triangulate_rings(vertices, np.array((4, 6, 10)))
+
+        # Assert results.
+        triangles = vertices[indices].reshape(-1, 3, 2)
+        areas = np.abs(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])) / 2
+        self.assertNotIn(4, indices)
+        self.assertNotIn(5, indices)
+        self.assertAlmostEqual(areas.sum(), 12)
+
+    @parameterized.expand((False, True))
+    def test_triangulate_rings_batch(self, parallel: bool):
+
+        # Set up test data.
+        square = np.array(((0, 0), (1, 0), (1, 1), (0, 1)), dtype=np.float32)
+        polygons = [
+            (square, np.array((4,))),
+            (square[:2], np.array((2,))),
+            (square * 2, np.array((4,))),
+        ]
+        self.addCleanup(triangulation.shutdown)
+
+        # Start test.
+        results = triangulation.triangulate_rings_batch(polygons, parallel=parallel)
+
+        # Assert results.
+        self.assertEqual(len(results[0]), 6)
+        self.assertIsNone(results[1])
+        self.assertEqual(results[0].tolist(), results[2].tolist())
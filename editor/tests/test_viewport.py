@@ -0,0 +1,87 @@
+from unittest import mock
+
+from editor.texture import Texture
+from editor.tests.testcasebase import TestCaseBase
+from editor.updateflag import UpdateFlag
+from editor.viewport import MeshPool, TextureLayer, Viewport
+
+
+class ViewportTestCase(TestCaseBase):
+
+    def setUp(self):
+        super().setUp()
+        for attr_name in ('low_tex', 'mid_tex', 'top_tex'):
+            self.c.add_edge_attribute_definition(attr_name, Texture(0))
+        self.c.add_edge_attribute_definition('shade', 1)
+        for attr_name in ('floor_tex', 'ceiling_tex'):
+            self.c.add_face_attribute_definition(attr_name, Texture(0))
+        self.c.add_face_attribute_definition('floorz', 0)
+        self.c.add_face_attribute_definition('ceilingz', 1024)
+        self.c.add_face_attribute_definition('floorshade', 0.9)
+        self.c.add_face_attribute_definition('ceilingshade', 0.9)
+
+    def create_viewport(self) -> Viewport:
+        """
+        Create a viewport with the GL calls patched out, since there's no
+        context to upload to in tests.
+
+        """
+        patcher = mock.patch.object(self.mock_app, 'adaptor_manager', create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        viewport = Viewport()
+        self.addCleanup(viewport.delete_later)
+        viewport.program = mock.Mock()
+        viewport.default_texture = TextureLayer(mock.Mock(), 0)
+        for name in ('make_current', 'done_current', 'update', 'build_textures'):
+            patcher = mock.patch.object(viewport, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for name in ('allocate', 'delete'):
+            patcher = mock.patch.object(MeshPool, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return viewport
+
+    def test_update_event_resources(self):
+        """
+        Test that a resources-only update, which has an empty content delta,
+        still leaves a mesh for every face.
+
+        """
+        # Set up test data.
+        self.build_grid(self.c, 3, 3)
+        viewport = self.create_viewport()
+        viewport.update_event(self.mock_app.doc, UpdateFlag.CONTENT)
+        old_mesh_pool = viewport.mesh_pool
+        self.c.reset_content_delta()
+
+        # Start test.
+        viewport.update_event(self.mock_app.doc, UpdateFlag.ADAPTOR_RESOURCES)
+
+        # Assert results.
+        self.assertIsNot(viewport.mesh_pool, old_mesh_pool)
+        self.assertSetEqual(set(viewport.mesh_pool.entries), {face.data for face in self.c.faces})
+        for entry in viewport.mesh_pool.entries.values():
+            self.assertTrue(entry.meshes)
+
+    def test_update_event_remove_face(self):
+        """
+        Test that removing a face rebuilds the faces that shared a portal wall
+        with it, since those edges become solid walls.
+
+        """
+        # Set up test data.
+        self.build_grid(self.c, 3, 3)
+        viewport = self.create_viewport()
+        viewport.update_event(self.mock_app.doc, UpdateFlag.CONTENT)
+        self.c.reset_content_delta()
+        face = self.c.get_face((0, 3, 4, 1, 0))
+        neighbours = {edge.reversed_face for edge in face.edges} - {None}
+
+        # Start test.
+        self.c.remove_face(face.data)
+        dirty_faces = viewport.get_dirty_faces(self.c, self.c.content_delta)
+
+        # Assert results.
+        self.assertSetEqual(dirty_faces, neighbours)
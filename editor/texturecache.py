@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+from PySide6.QtCore import QStandardPaths
+
+# noinspection PyUnresolvedReferences
+from __feature__ import snake_case
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bump if the decoded texture format changes to invalidate existing caches.
+CACHE_VERSION = 2
+
+
+class TextureCache:
+
+    """
+    Content-addressed on-disk cache of decoded textures.
+
+    Each entry is a flat uint8 .npy holding every texture back to back, plus a
+    .json index of each texture's key, offset and shape. The .npy is memory
+    mapped on load so warm starts skip decoding entirely.
+
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        if root is None:
+            root = Path(QStandardPaths.writable_location(QStandardPaths.CacheLocation), 'textures')
+        self.root = Path(root)
+
+    @staticmethod
+    def get_key(name: str, paths: Iterable[str | Path]) -> str:
+        """
+        Hash the contents of all source files along with the adaptor name.
+
+        """
+        hasher = hashlib.sha1(f'{name}:{CACHE_VERSION}'.encode())
+        for path in paths:
+            with open(path, 'rb') as f:
+                while chunk := f.read(1 << 20):
+                    hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def _get_paths(self, key: str) -> tuple[Path, Path]:
+        return self.root.joinpath(f'{key}.npy'), self.root.joinpath(f'{key}.json')
+
+    def load(self, key: str) -> dict[Any, np.ndarray] | None:
+        data_path, index_path = self._get_paths(key)
+        if not data_path.exists() or not index_path.exists():
+            return None
+
+        # Treat a truncated or stale entry as a miss so the caller decodes.
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+            data = np.load(data_path, mmap_mode='c')
+            textures = {}
+            for id_, offset, shape in index:
+                size = int(np.prod(shape))
+                textures[id_] = data[offset:offset + size].reshape(shape)
+        except Exception as e:
+            logger.warning(f'Cannot load texture cache: {data_path}')
+            logger.exception(e)
+            return None
+        return textures
+
+    def save(self, key: str, textures: dict[Any, np.ndarray]):
+        data_path, index_path = self._get_paths(key)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        offset = 0
+        index = []
+        for id_, texture in textures.items():
+            index.append((id_, offset, texture.shape))
+            offset += texture.size
+        data = np.empty(offset, dtype=np.uint8)
+        for (_, offset, _), texture in zip(index, textures.values()):
+            data[offset:offset + texture.size] = texture.ravel()
+
+        # Write the data before the index so a partial write is never picked up.
+        tmp_data_path = data_path.with_suffix('.npy.tmp')
+        with open(tmp_data_path, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_data_path, data_path)
+        tmp_index_path = index_path.with_suffix('.json.tmp')
+        with open(tmp_index_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_index_path, index_path)
+        logger.info(f'Saved texture cache: {data_path}')
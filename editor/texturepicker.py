@@ -1,40 +1,96 @@
-from typing import Any
+from typing import Any, Mapping
 
-from PySide6.QtCore import QSize
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSize, Qt
 from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import QComboBox, QListView
+from PySide6.QtWidgets import QComboBox, QListView, QProxyStyle, QStyle
 
 # noinspection PyUnresolvedReferences
 from __feature__ import snake_case
 
 
+ICON_SIZE = 32
+
+
+class TextureListModel(QAbstractListModel):
+
+    """
+    Only fetches an icon when the view asks for it, ie when the item scrolls
+    into view, so icons can be built lazily.
+
+    """
+
+    def __init__(self, icons: Mapping[Any, QIcon], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.icons = icons
+        self.keys = list(icons.keys())
+
+    def row_count(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.is_valid() else len(self.keys)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.is_valid():
+            return None
+        if role == Qt.DecorationRole:
+            return self.icons[self.keys[index.row()]]
+        if role == Qt.DisplayRole:
+            return ''
+
+        # Answering the size hint directly stops the delegate building the
+        # icon just to measure it.
+        if role == Qt.SizeHintRole:
+            return QSize(ICON_SIZE, ICON_SIZE)
+        return None
+
+
+class TextureComboBoxStyle(QProxyStyle):
+
+    """
+    Menu style popups (eg Fusion) query every item's text and icon to size the
+    popup, so force a regular list popup instead.
+
+    """
+
+    def style_hint(self, hint, option=None, widget=None, return_data=None):
+        if hint == QStyle.SH_ComboBox_Popup:
+            return 0
+        return super().style_hint(hint, option, widget, return_data)
+
+
 class TextureComboBox(QComboBox):
 
-    def __init__(self, icons: dict[Any, QIcon], *args, **kwargs):
+    def __init__(self, icons: Mapping[Any, QIcon], *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.icons = icons
-        self.set_icon_size(QSize(32, 32))
+        self.set_icon_size(QSize(ICON_SIZE, ICON_SIZE))
 
-        # Add textures as items with icons.
-        for pid, icon in icons.items():
-            self.add_item(icon, '')
+        # Size to the icon rather than the contents, otherwise every icon is
+        # built to compute the size hint.
+        self.set_size_adjust_policy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self._style = TextureComboBoxStyle()
+        self.set_style(self._style)
 
         view = QListView()
-        icon_size = 32
         horizontal_padding = 1
-        view.set_grid_size(QSize(icon_size + horizontal_padding, icon_size))
+        view.set_grid_size(QSize(ICON_SIZE + horizontal_padding, ICON_SIZE))
 
+        # Uniform sizes stop the view querying every item's icon during layout.
+        view.set_uniform_item_sizes(True)
         view.set_view_mode(QListView.IconMode)
         view.set_resize_mode(QListView.ResizeMode.Adjust)
         self.set_view(view)
 
+        self.texture_model = TextureListModel(icons, self)
+        self.set_model(self.texture_model)
+        self._key_to_index = {key: i for i, key in enumerate(self.texture_model.keys)}
+
     def get_current_icon(self):
         index = self.current_index()
-        return list(self.icons.keys())[index]
+        return self.texture_model.keys[index]
 
     def set_current_icon(self, value):
-        if value not in self.icons.keys():
+        index = self._key_to_index.get(value)
+        if index is None:
             return
-        index = list(self.icons.keys()).index(value)
         self.set_current_index(index)
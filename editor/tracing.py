@@ -0,0 +1,80 @@
+"""
+Lightweight tracing for importers and exporters.
+
+A Trace records how long each phase of an import / export took along with
+counts of what was processed, and logs a one line summary when done. Tracing
+is off by default and costs next to nothing when off. It's enabled by the
+editor.tracing logger being enabled for DEBUG, ie by running with
+--log-level DEBUG, or by setting the EDITOR_TRACE environment variable.
+
+"""
+import logging
+import os
+import time
+
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = 'EDITOR_TRACE'
+
+
+def configure():
+    """
+    Enable tracing if the environment variable is set to anything other than
+    an empty string or 0. Call once logging has been configured.
+
+    """
+    if os.environ.get(ENV_VAR, '') not in ('', '0'):
+        logger.setLevel(logging.DEBUG)
+
+
+def is_enabled() -> bool:
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+class Trace:
+
+    """
+    Per-phase durations and counts for one operation. Each call to mark()
+    closes the current phase, so phases run back to back without needing to
+    indent the code being traced:
+
+        trace = Trace('import_build')
+        m = read_map(file_path)
+        trace.mark('read')
+        trace.count('walls', len(m.walls))
+        ...
+        trace.done()
+
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.enabled = is_enabled()
+        self.phases = {}
+        self.counts = {}
+        self._start = self._last = time.perf_counter() if self.enabled else 0.0
+
+    def mark(self, phase: str):
+        """
+        Record the time since the last mark as the given phase. Marking the same
+        phase more than once accumulates its duration.
+
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def count(self, name: str, value: int):
+        if self.enabled:
+            self.counts[name] = value
+
+    def done(self):
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self._start
+        phases = ', '.join(f'{phase} {duration:.3f}s' for phase, duration in self.phases.items())
+        counts = ', '.join(f'{name}={value}' for name, value in self.counts.items())
+        logger.debug(f'{self.name}: {total:.3f}s ({phases}) [{counts}]')
@@ -0,0 +1,114 @@
+"""
+Polygon triangulation. This module deliberately only imports numpy and
+earcut, since the worker processes that triangulate large batches import it
+fresh and shouldn't pull in Qt or the graph.
+
+"""
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence
+
+import mapbox_earcut as earcut
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+# Batches smaller than this aren't worth shipping to worker processes.
+PARALLEL_TRIANGULATE_THRESHOLD = 512
+
+# Triangulation is short-lived work, so there's no gain from a process per
+# core on large machines.
+MAX_WORKERS = 4
+
+_executor = None
+
+
+def triangulate_rings(vertices: np.ndarray, ring_end_indices: np.ndarray) -> np.ndarray:
+    """
+    Triangulate a polygon given as flattened (N, 2) ring vertices, the first
+    ring being the exterior and any others holes. Returns a flat index buffer
+    into vertices, three indices per triangle.
+
+    """
+    vertices = np.asarray(vertices, dtype=np.float32)
+    ring_end_indices = np.asarray(ring_end_indices, dtype=np.uint32)
+    counts = np.diff(ring_end_indices, prepend=0)
+    if not len(counts) or counts[0] < 3:
+        raise ValueError('Exterior ring has fewer than 3 points')
+
+    # Skip degenerate holes rather than losing the whole polygon, mapping the
+    # indices back onto the given vertices.
+    degenerate = counts < 3
+    if np.any(degenerate):
+        logger.debug(f'Skipping {np.count_nonzero(degenerate)} degenerate hole(s)')
+        keep = np.repeat(~degenerate, counts)
+        indices = earcut.triangulate_float32(vertices[keep], np.cumsum(counts[~degenerate], dtype=np.uint32))
+        return np.flatnonzero(keep).astype(np.uint32)[indices]
+
+    return earcut.triangulate_float32(vertices, ring_end_indices).astype(np.uint32)
+
+
+def _triangulate_rings_chunk(polygons: Sequence[tuple[np.ndarray, np.ndarray]]) -> list[np.ndarray | None]:
+    results = []
+    for vertices, ring_end_indices in polygons:
+        try:
+            results.append(triangulate_rings(vertices, ring_end_indices))
+        except Exception as e:
+            logger.warning(f'Failed to triangulate polygon: {e}')
+            results.append(None)
+    return results
+
+
+def get_num_workers() -> int:
+    return min(os.cpu_count() or 1, MAX_WORKERS)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+
+        # Spawn rather than fork so workers don't inherit Qt state.
+        _executor = ProcessPoolExecutor(get_num_workers(), mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+
+def shutdown():
+    """
+    Shut down the worker pool, if one was started. Called when the application
+    exits.
+
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def triangulate_rings_batch(
+    polygons: Sequence[tuple[np.ndarray, np.ndarray]],
+    parallel: bool | None = None,
+) -> list[np.ndarray | None]:
+    """
+    Triangulate many polygons at once, each given as a (vertices,
+    ring_end_indices) pair as per triangulate_rings. Returns an index buffer
+    per polygon, or None where the polygon could not be triangulated.
+
+    Large batches are split into chunks and run in a process pool as earcut
+    holds the GIL.
+
+    """
+    if parallel is None:
+        parallel = len(polygons) >= PARALLEL_TRIANGULATE_THRESHOLD and get_num_workers() > 1
+    if not parallel:
+        return _triangulate_rings_chunk(polygons)
+
+    executor = _get_executor()
+    num_chunks = get_num_workers() * 4
+    chunk_size = max(1, math.ceil(len(polygons) / num_chunks))
+    chunks = [polygons[i:i + chunk_size] for i in range(0, len(polygons), chunk_size)]
+    return [result for results in executor.map(_triangulate_rings_chunk, chunks) for result in results]
@@ -7,3 +7,4 @@ class UpdateFlag(Flag):
     SELECTION = auto()
     SETTINGS = auto()
     ADAPTOR_TEXTURES = auto()
+    ADAPTOR_RESOURCES = auto()
@@ -1,10 +1,14 @@
+import ctypes
 import logging
 import time
 import math
 import time
 import traceback
-from dataclasses import dataclass
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import pairwise
 from pathlib import Path
+from typing import Any
 
 import numpy as np
 from OpenGL.GL import (
@@ -16,18 +20,19 @@ from OpenGL.GL import (
     GL_FLOAT,
     GL_TEXTURE0,
     GL_TRIANGLES,
+    GL_UNSIGNED_INT,
+    glDrawElements,
 )
 from PySide6.QtCore import QCoreApplication, Qt, QPoint
 from PySide6.QtGui import QImage, QOpenGLFunctions, QMatrix4x4, QVector3D, QVector4D
 from PySide6.QtOpenGL import QOpenGLTexture, QOpenGLShaderProgram, QOpenGLBuffer, QOpenGLVertexArrayObject, QOpenGLShader
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
 from PySide6.QtWidgets import QApplication, QGraphicsItem
-from shapely import Polygon
 
 import editor
 from applicationframework.document import Document
-from editor import utils
-from editor.graph import Edge
+from editor import triangulation, utils
+from editor.graph import ContentDelta, Edge, Face, Graph
 from editor.updateflag import UpdateFlag
 
 # noinspection PyUnresolvedReferences
@@ -37,75 +42,285 @@ from __feature__ import snake_case
 logger = logging.getLogger(__name__)
 
 
+# Conservative; GL 3.3 guarantees at least 256 layers.
+MAX_TEXTURE_ARRAY_LAYERS = 256
+
+
+@dataclass
+class TextureLayer:
+
+    """
+    A single image within a texture array.
+
+    """
+
+    texture: QOpenGLTexture
+    layer: int
+
+
 @dataclass
 class Mesh:
 
     positions: np.ndarray
     texcoords: np.ndarray
-    texture: QOpenGLTexture
+    texture: TextureLayer
     shade: float = 1.0
 
 
+def pack_texture_arrays(images: dict[Any, QImage]) -> dict[Any, TextureLayer]:
+    """
+    Pack images into as few texture arrays as possible by grouping them by
+    size. Arrays are used over an atlas so that texcoords can still wrap.
+
+    """
+    sizes = defaultdict(list)
+    for key, img in images.items():
+        sizes[(img.width(), img.height())].append(key)
+
+    layers = {}
+    for (width, height), keys in sizes.items():
+        for i in range(0, len(keys), MAX_TEXTURE_ARRAY_LAYERS):
+            chunk = keys[i:i + MAX_TEXTURE_ARRAY_LAYERS]
+            texture = QOpenGLTexture(QOpenGLTexture.Target2DArray)
+            texture.set_size(width, height)
+            texture.set_layers(len(chunk))
+            texture.set_format(QOpenGLTexture.RGBA8_UNorm)
+            texture.set_minification_filter(QOpenGLTexture.Nearest)
+            texture.set_magnification_filter(QOpenGLTexture.Nearest)
+            texture.set_wrap_mode(QOpenGLTexture.Repeat)
+            texture.allocate_storage()
+            for layer, key in enumerate(chunk):
+                img = images[key].mirrored().convert_to_format(QImage.Format_RGBA8888)
+                texture.set_data(0, layer, QOpenGLTexture.RGBA, QOpenGLTexture.UInt8, img.const_bits())
+                layers[key] = TextureLayer(texture, layer)
+    return layers
+
+
+@dataclass
+class MeshEntry:
+
+    """
+    All meshes belonging to a single face, ie its floor, ceiling and walls,
+    along with a hash of the content they were built from.
+
+    """
+
+    key: int
+    meshes: list[Mesh]
+    vertices: np.ndarray | None = None
+    textures: dict[int, QOpenGLTexture] = field(default_factory=dict)
+    indices: dict[int, np.ndarray] = field(default_factory=dict)
+    offset: int = 0
+    size: int = 0
+
+
 class MeshPool:
 
+    """
+    Keeps per-face mesh entries in a single VBO. Each entry owns a range of
+    vertices which is patched in place when the entry is replaced, so editing
+    a face only uploads that face's vertices. The buffer is only reallocated
+    when it runs out of room.
+
+    Drawing goes through an index buffer sorted by texture array so there is
+    one draw call per array. Shade and array layer are vertex attributes so
+    meshes with different shades and images can share a draw call.
+
+    """
+
+    VERTEX_SIZE = 7  # Position (3), texcoord (2), shade (1), layer (1).
+
     def __init__(self):
-        self.meshes = []
+        self.entries = {}
+        self._dirty = set()
+        self._indices_dirty = False
+        self._batches = []
+        self._free = []
+        self._end = 0
+        self._capacity = 0
         self._vbo = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
         self._vbo.create()
+        self._ibo = QOpenGLBuffer(QOpenGLBuffer.IndexBuffer)
+        self._ibo.create()
         self._vao = QOpenGLVertexArrayObject()
         self._vao.create()
 
-    def allocate(self):
-
-        if not self.meshes:
+    def _alloc_range(self, size: int) -> int:
+
+        # First fit from the free list, otherwise off the end of the buffer.
+        for i, (offset, free_size) in enumerate(self._free):
+            if free_size >= size:
+                if free_size == size:
+                    del self._free[i]
+                else:
+                    self._free[i] = (offset + size, free_size - size)
+                return offset
+        offset = self._end
+        self._end += size
+        return offset
+
+    def _free_range(self, offset: int, size: int):
+        if not size:
             return
+        self._free.append((offset, size))
+        self._free.sort()
+        merged = [self._free[0]]
+        for offset, size in self._free[1:]:
+            last_offset, last_size = merged[-1]
+            if last_offset + last_size == offset:
+                merged[-1] = (last_offset, last_size + size)
+            else:
+                merged.append((offset, size))
+
+        # Give trailing free space back to the end of the buffer.
+        if merged and sum(merged[-1]) == self._end:
+            self._end = merged.pop()[0]
+        self._free = merged
+
+    def get_key(self, key: Any) -> int | None:
+        entry = self.entries.get(key)
+        return entry.key if entry is not None else None
+
+    def set_entry(self, key: Any, entry: MeshEntry):
+        entry.vertices = np.vstack([
+            np.hstack((
+                m.positions,
+                m.texcoords,
+                np.full((len(m.positions), 1), m.shade),
+                np.full((len(m.positions), 1), m.texture.layer),
+            ))
+            for m in entry.meshes
+        ]).astype(np.float32) if entry.meshes else np.zeros((0, self.VERTEX_SIZE), dtype=np.float32)
+        size = len(entry.vertices)
+
+        # Group the entry's vertex indices by texture array.
+        start = 0
+        indices = defaultdict(list)
+        for mesh in entry.meshes:
+            texture = mesh.texture.texture
+            entry.textures[id(texture)] = texture
+            indices[id(texture)].append(np.arange(start, start + len(mesh.positions), dtype=np.uint32))
+            start += len(mesh.positions)
+        entry.indices = {texture_id: np.concatenate(ranges) for texture_id, ranges in indices.items()}
+        old_entry = self.entries.get(key)
+        if old_entry is not None and old_entry.size >= size:
+
+            # Reuse the old range, returning any slack.
+            entry.offset = old_entry.offset
+            entry.size = size
+            self._free_range(old_entry.offset + size, old_entry.size - size)
+        else:
+            if old_entry is not None:
+                self._free_range(old_entry.offset, old_entry.size)
+            entry.offset = self._alloc_range(size)
+            entry.size = size
+        self.entries[key] = entry
+        self._dirty.add(key)
+        self._indices_dirty = True
+
+    def remove_entry(self, key: Any):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._free_range(entry.offset, entry.size)
+            self._indices_dirty = True
+        self._dirty.discard(key)
+
+    def _allocate_indices(self):
+        textures = {}
+        texture_indices = defaultdict(list)
+        for entry in self.entries.values():
+            textures.update(entry.textures)
+            for texture_id, indices in entry.indices.items():
+                texture_indices[texture_id].append(indices + entry.offset)
+
+        self._batches = []
+        offset = 0
+        all_indices = []
+        for texture_id, indices in texture_indices.items():
+            indices = np.concatenate(indices)
+            self._batches.append((textures[texture_id], offset, len(indices)))
+            all_indices.append(indices)
+            offset += len(indices)
+        all_indices = np.concatenate(all_indices) if all_indices else np.zeros(0, dtype=np.uint32)
+
+        self._ibo.bind()
+        self._ibo.allocate(all_indices.tobytes(), all_indices.nbytes)
+        self._ibo.release()
 
-        # TODO: Need to be able to derive len of vertices without writing to .vertices
-        self.vertices = np.vstack([
-            np.hstack((m.positions, m.texcoords))
-            for m in self.meshes
-        ])
+    def allocate(self):
+        """
+        Upload any new or changed entries. If the buffer has run out of room it
+        is reallocated with headroom and everything is packed and re-uploaded.
 
+        """
+        stride = self.VERTEX_SIZE * np.dtype(np.float32).itemsize
         self._vbo.bind()
-        self._vbo.allocate(self.vertices.tobytes(), self.vertices.nbytes)
+        if self._end > self._capacity:
+            offset = 0
+            for entry in self.entries.values():
+                entry.offset = offset
+                offset += entry.size
+            self._free.clear()
+            self._end = offset
+            self._capacity = max(1024, offset * 2)
+            vertices = np.zeros((self._capacity, self.VERTEX_SIZE), dtype=np.float32)
+            for entry in self.entries.values():
+                vertices[entry.offset:entry.offset + entry.size] = entry.vertices
+            self._vbo.allocate(vertices.tobytes(), vertices.nbytes)
+            self._indices_dirty = True
+        else:
+            for key in self._dirty:
+                entry = self.entries[key]
+                if entry.size:
+                    self._vbo.write(entry.offset * stride, entry.vertices.tobytes(), entry.vertices.nbytes)
         self._vbo.release()
+        self._dirty.clear()
 
-    def draw(self, gl, program):
+        if self._indices_dirty:
+            self._allocate_indices()
+            self._indices_dirty = False
 
-        if not self.meshes:
-            return
+    def draw(self, gl, program):
 
-        # TODO: Not sure who needs to know about program...
-        if not hasattr(self, 'vertices'):
-            print('NO VERTS')
+        if not self.entries or not self._capacity:
             return
 
         self._vao.bind()
         self._vbo.bind()
 
-        stride = 5 * self.vertices.itemsize  # 5 floats per vertex
+        itemsize = np.dtype(np.float32).itemsize
+        stride = self.VERTEX_SIZE * itemsize
 
         program.enable_attribute_array(0)
         program.set_attribute_buffer(0, GL_FLOAT, 0, 3, stride)
 
         program.enable_attribute_array(1)  # location 1
-        program.set_attribute_buffer(1, GL_FLOAT, 3 * self.vertices.itemsize, 2, stride)
+        program.set_attribute_buffer(1, GL_FLOAT, 3 * itemsize, 2, stride)
+
+        program.enable_attribute_array(2)  # location 2
+        program.set_attribute_buffer(2, GL_FLOAT, 5 * itemsize, 1, stride)
+
+        program.enable_attribute_array(3)  # location 3
+        program.set_attribute_buffer(3, GL_FLOAT, 6 * itemsize, 1, stride)
 
         self._vbo.release()
+        self._ibo.bind()
 
-        offset = 0
-        for mesh in self.meshes:
-            program.set_uniform_value1f(program.uniform_location('shade'), mesh.shade)
-            mesh.texture.bind()
-            program.set_uniform_value(program.uniform_location('tex'), 0)
-            gl.glDrawArrays(GL_TRIANGLES, offset, len(mesh.positions))
-            offset += len(mesh.positions)
-            mesh.texture.release()
+        program.set_uniform_value(program.uniform_location('tex'), 0)
+        index_size = np.dtype(np.uint32).itemsize
+        for texture, offset, count in self._batches:
+            texture.bind()
+            glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, ctypes.c_void_p(offset * index_size))
+            texture.release()
+
+        self._ibo.release()
         self._vao.release()
 
     def delete(self):
         if self._vbo.is_created():
             self._vbo.destroy()
+        if self._ibo.is_created():
+            self._ibo.destroy()
         if self._vao.is_created():
             self._vao.delete_later()  # or `.destroy()` depending on Qt version
 
@@ -152,16 +367,17 @@ class Viewport(QOpenGLWidget):
         self.textures = {}
 
         self.mesh_pool = None
+        self._content = None
         self.app().updated.connect(self.update_event)
 
     def app(self) -> QCoreApplication:
         return QApplication.instance()
 
-    def get_texture(self, name: str):
+    def get_texture(self, name: str) -> TextureLayer:
         return self.textures.get(name, self.default_texture)
 
     @staticmethod
-    def create_wall_mesh(xz1: tuple[float, float], y1: float, xz2: tuple[float, float], y2: float, texture: QOpenGLTexture, shade: float) -> Mesh:
+    def create_wall_mesh(xz1: tuple[float, float], y1: float, xz2: tuple[float, float], y2: float, texture: TextureLayer, shade: float) -> Mesh:
         x1, z1 = xz1
         x2, z2 = xz2
         positions = np.array([
@@ -190,7 +406,7 @@ class Viewport(QOpenGLWidget):
         ], dtype=np.float32)
         return Mesh(positions, texcoords, texture, shade=shade)
 
-    def build_wall(self, edge: Edge, y1: int, y2: int):
+    def build_wall(self, edge: Edge, y1: int, y2: int) -> list[Mesh]:
         """
         If there is no connected face, draw the wall from floor to ceiling.
         If there is a connected face and their floor is lower than ours, dont draw it.
@@ -205,34 +421,127 @@ class Viewport(QOpenGLWidget):
         mid_tex = self.get_texture(attrs['mid_tex'].value)
         top_tex = self.get_texture(attrs['top_tex'].value)
 
+        meshes = []
         reversed_face = edge.reversed_face
-        xz0 = edge.head.get_attribute('x'), edge.head.get_attribute('y')
-        xz1 = edge.tail.get_attribute('x'), edge.tail.get_attribute('y')
+        xz0, xz1 = edge.graph.get_positions(edge.nodes)
         if reversed_face is None:
-            self.mesh_pool.meshes.append(self.create_wall_mesh(xz0, y1, xz1, y2, mid_tex, attrs['shade']))
+            meshes.append(self.create_wall_mesh(xz0, y1, xz1, y2, mid_tex, attrs['shade']))
         else:
             y3 = reversed_face.get_attribute('floorz')
             y4 = reversed_face.get_attribute('ceilingz')
             if y1 < y3:
-                self.mesh_pool.meshes.append(self.create_wall_mesh(xz0, y1, xz1, y3, low_tex, attrs['shade']))
+                meshes.append(self.create_wall_mesh(xz0, y1, xz1, y3, low_tex, attrs['shade']))
             if y2 > y4:
-                self.mesh_pool.meshes.append(self.create_wall_mesh(xz0, y4, xz1, y2, top_tex, attrs['shade']))
+                meshes.append(self.create_wall_mesh(xz0, y4, xz1, y2, top_tex, attrs['shade']))
+        return meshes
+
+    @staticmethod
+    def get_face_key(face: Face) -> int:
+        """
+        Hash everything the face's meshes are built from: its ring positions,
+        sector attributes and wall attributes, including the heights of the
+        neighbouring faces the walls are clipped against.
+
+        """
+        attrs = face.get_attributes()
+        walls = []
+        for edge in face.edges:
+            edge_attrs = edge.get_attributes()
+            reversed_face = edge.reversed_face
+            walls.append((
+                edge_attrs['low_tex'].value,
+                edge_attrs['mid_tex'].value,
+                edge_attrs['top_tex'].value,
+                edge_attrs['shade'],
+                reversed_face.get_attribute('floorz') if reversed_face is not None else None,
+                reversed_face.get_attribute('ceilingz') if reversed_face is not None else None,
+            ))
+        return hash((
+            tuple(face.graph.get_positions(ring.nodes).tobytes() for ring in face.rings),
+            attrs['floor_tex'].value,
+            attrs['ceiling_tex'].value,
+            attrs['floorz'],
+            attrs['ceilingz'],
+            attrs['floorshade'],
+            attrs['ceilingshade'],
+            tuple(walls),
+        ))
+
+    @staticmethod
+    def get_face_rings(face: Face) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the face's flattened ring vertices and ring end indices, ready for
+        triangulation.
+
+        """
+        vertices = face.graph.get_positions(face.nodes).astype(np.float32)
+        ring_end_indices = np.cumsum([len(ring.nodes) for ring in face.rings], dtype=np.uint32)
+        return vertices, ring_end_indices
+
+    def build_sector(self, face: Face, positions: np.ndarray) -> list[Mesh]:
+        attrs = face.get_attributes()
+        floor_tex = self.get_texture(attrs['floor_tex'].value)
+        ceil_tex = self.get_texture(attrs['ceiling_tex'].value)
+        floor_positions = np.insert(positions, 1, attrs['floorz'], axis=1)
+        ceiling_positions = np.insert(positions, 1, attrs['ceilingz'], axis=1)[::-1]
+        return [
+            Mesh(floor_positions, positions / 1000, floor_tex, shade=attrs['floorshade']),
+            Mesh(ceiling_positions, positions[::-1] / 1000, ceil_tex, shade=attrs['ceilingshade']),
+        ]
+
+    def build_walls(self, face: Face) -> list[Mesh]:
+        attrs = face.get_attributes()
+        meshes = []
+        for ring in face.rings:
+            for edge in ring.edges:
+                meshes.extend(self.build_wall(edge, attrs['floorz'], attrs['ceilingz']))
+        return meshes
+
+    @staticmethod
+    def get_dirty_faces(content: Graph, delta: ContentDelta) -> set[Face]:
+        """
+        Return the faces whose meshes may be affected by the given delta. This
+        includes the faces on the other side of any affected walls, since their
+        walls are clipped against this face's floor and ceiling.
+
+        """
+        faces = set()
+        for element in delta.added | delta.modified:
+            faces.update(element.faces)
+        for element in delta.added | delta.removed:
+            if isinstance(element, Edge) and content.has_edge(element.data[1], element.data[0]):
+                faces.update(content.get_edge(element.data[1], element.data[0]).faces)
+        for face in list(faces):
+            for edge in face.edges:
+                reversed_face = edge.reversed_face
+                if reversed_face is not None:
+                    faces.add(reversed_face)
+
+        # A removed face's edges have already been unmapped, so walk its node
+        # pairs to find the faces that shared a portal wall with it. Only their
+        # own walls change, so they aren't expanded to their neighbours.
+        for element in delta.removed:
+            if isinstance(element, Face):
+                for head, tail in pairwise(element.data):
+                    if content.has_edge(tail, head):
+                        faces.update(content.get_edge(tail, head).faces)
+        return faces
 
     def build_textures(self):
         logger.info('Rebuilding OpenGL textures...')
         start = time.time()
-        self.textures.clear()
-        for key, img in self.app().adaptor_manager.current_adaptor.images.items():
-            texture = QOpenGLTexture(img.mirrored())
-            texture.set_minification_filter(QOpenGLTexture.Nearest)
-            texture.set_magnification_filter(QOpenGLTexture.Nearest)
-            self.textures[key] = texture
-        logger.info(f'Rebuilt OpenGL textures in {time.time() - start}s')
+        self.make_current()
+        for texture in {id(layer.texture): layer.texture for layer in self.textures.values()}.values():
+            texture.destroy()
+        self.textures = pack_texture_arrays(self.app().adaptor_manager.current_adaptor.images)
+        self.done_current()
+        num_arrays = len({id(layer.texture) for layer in self.textures.values()})
+        logger.info(f'Rebuilt OpenGL textures ({len(self.textures)} images in {num_arrays} arrays) in {time.time() - start}s')
 
     def update_event(self, doc: Document, flags: UpdateFlag):
 
         # TODO: Consider never setting adaptor to None but instead using a default adaptor to house the default texture?
-        if UpdateFlag.ADAPTOR_TEXTURES in flags and self.app().adaptor_manager.current_adaptor != None:
+        if UpdateFlag.ADAPTOR_RESOURCES in flags and self.app().adaptor_manager.current_adaptor != None:
             self.build_textures()
 
         if self.program is None:
@@ -242,66 +551,83 @@ class Viewport(QOpenGLWidget):
         #self.block_signals(True)
         if flags != UpdateFlag.SELECTION and flags != UpdateFlag.SETTINGS:
 
-            logger.info('Rebuilding OpenGL meshes...')
+            logger.info('Updating OpenGL meshes...')
             start = time.time()
+            dirty_faces = []
+
+            self.make_current()
+
+            # New textures invalidate every mesh, so drop the pool and rebuild
+            # every face. The content delta is empty on a resources-only update.
+            resources_changed = UpdateFlag.ADAPTOR_RESOURCES in flags
+            if resources_changed and self.mesh_pool is not None:
+                self.mesh_pool.delete()
+                self.mesh_pool = None
+            if self.mesh_pool is None:
+                self.mesh_pool = MeshPool()
+
+            delta = doc.content_delta
+            if delta.rebuild or resources_changed or doc.content is not self._content:
+                faces = set(doc.content.faces)
+                for key in set(self.mesh_pool.entries) - {face.data for face in faces}:
+                    self.mesh_pool.remove_entry(key)
+            else:
+                faces = self.get_dirty_faces(doc.content, delta)
+                for element in delta.removed:
+                    if isinstance(element, Face):
+                        self.mesh_pool.remove_entry(element.data)
+            self._content = doc.content
+
+            hash_duration = 0
             poly_duration = 0
             triangulate_duration = 0
             wall_duration = 0
             sector_duration = 0
             allocate_duration = 0
 
-            self.make_current()
-
-            mesh_pool_start = time.time()
-            if self.mesh_pool is not None:
-                self.mesh_pool.delete()
-            self.mesh_pool = MeshPool()
-            mesh_pool_duration = time.time() - mesh_pool_start
-
             try:
 
-                for face in doc.content.faces:
-
-                    poly_start = time.time()
+                # Skip faces whose content hasn't changed.
+                hash_start = time.time()
+                dirty_faces = []
+                for face in faces:
 
-                    ring_positions = [
-                        [node.pos.to_tuple() for node in ring.nodes]
-                        for ring in face.rings
-                    ]
+                    # Faces can be left dangling by node removal.
                     try:
-                        sector = Polygon(ring_positions[0], [list(reversed(ring)) for ring in ring_positions[1:]])
+                        key = self.get_face_key(face)
                     except Exception as e:
                         traceback.print_exc()
+                        self.mesh_pool.remove_entry(face.data)
+                        continue
+
+                    if self.mesh_pool.get_key(face.data) != key:
+                        dirty_faces.append((face, key))
+                hash_duration += time.time() - hash_start
+
+                poly_start = time.time()
+                polygons = [self.get_face_rings(face) for face, _ in dirty_faces]
+                poly_duration += time.time() - poly_start
 
-                    poly_duration += time.time() - poly_start
+                tri_start = time.time()
+                indices = triangulation.triangulate_rings_batch(polygons)
+                triangulate_duration += time.time() - tri_start
+
+                for (face, key), (vertices, _), face_indices in zip(dirty_faces, polygons, indices):
 
                     # TODO: Still some invalid polys.
-                    try:
-                        tri_start = time.time()
-                        tris = utils.triangulate_polygon(sector)
-                        triangulate_duration += time.time() - tri_start
-                    except Exception as e:
-                        traceback.print_exc()
-                        continue
+                    meshes = []
+                    if face_indices is None:
+                        logger.warning(f'Failed to triangulate face: {face}')
+                    else:
+                        sector_start = time.time()
+                        meshes.extend(self.build_sector(face, vertices[face_indices]))
+                        sector_duration += time.time() - sector_start
+
+                        wall_start = time.time()
+                        meshes.extend(self.build_walls(face))
+                        wall_duration += time.time() - wall_start
 
-                    sector_start = time.time()
-
-                    attrs = face.get_attributes()
-                    floor_tex = self.get_texture(attrs['floor_tex'].value)
-                    ceil_tex = self.get_texture(attrs['ceiling_tex'].value)
-                    positions = np.array([coord for tri in tris for coord in tri.exterior.coords[:-1]], dtype=np.float32)
-                    floor_positions = np.insert(positions, 1, attrs['floorz'], axis=1)
-                    ceiling_positions = np.insert(positions, 1, attrs['ceilingz'], axis=1)[::-1]
-                    self.mesh_pool.meshes.append(Mesh(floor_positions, positions / 1000, floor_tex, shade=attrs['floorshade']))
-                    self.mesh_pool.meshes.append(Mesh(ceiling_positions, positions[::-1] / 1000, ceil_tex, shade=attrs['ceilingshade']))
-                    sector_duration += time.time() - sector_start
-
-                    # Build walls.
-                    wall_start = time.time()
-                    for ring in face.rings:
-                        for edge in ring.edges:
-                            self.build_wall(edge, attrs['floorz'], attrs['ceilingz'])
-                    wall_duration += time.time() - wall_start
+                    self.mesh_pool.set_entry(face.data, MeshEntry(key, meshes))
 
                 allocate_start = time.time()
                 self.mesh_pool.allocate()
@@ -312,14 +638,14 @@ class Viewport(QOpenGLWidget):
 
             self.done_current()
 
-            logger.info(f'Rebuilt OpenGL meshes in {time.time() - start}s')
-            logger.debug(f'    Polygon: {poly_duration}s')
+            logger.info(f'Updated OpenGL meshes for {len(dirty_faces)} of {len(self.mesh_pool.entries)} faces in {time.time() - start}s')
+            logger.debug(f'    Hash: {hash_duration}s')
+            logger.debug(f'    Rings: {poly_duration}s')
             logger.debug(f'    Triangulate: {triangulate_duration}s')
             logger.debug(f'    Walls: {wall_duration}s')
             logger.debug(f'    Sectors: {sector_duration}s')
             logger.debug(f'    Allocate: {allocate_duration}s')
-            logger.debug(f'    Mesh pool destroy: {mesh_pool_duration}s')
-            logger.debug(f'    Total: {poly_duration + triangulate_duration + wall_duration + sector_duration + allocate_duration + mesh_pool_duration}s')
+            logger.debug(f'    Total: {hash_duration + poly_duration + triangulate_duration + wall_duration + sector_duration + allocate_duration}s')
 
             self.update()
 
@@ -336,8 +662,8 @@ class Viewport(QOpenGLWidget):
 
         # Load texture.
         # TODO: Expose via preferences.
-        default_img = QImage(Path(editor.__file__).parent.joinpath('data/textures/grid_blue_512x512.png')).mirrored()
-        self.default_texture = QOpenGLTexture(default_img)
+        default_img = QImage(Path(editor.__file__).parent.joinpath('data/textures/grid_blue_512x512.png'))
+        self.default_texture = pack_texture_arrays({None: default_img})[None]
 
         self.program = QOpenGLShaderProgram()
         self.program.add_shader_from_source_code(QOpenGLShader.Vertex, """
@@ -345,30 +671,34 @@ class Viewport(QOpenGLWidget):
 
             layout(location = 0) in vec3 position;   // vertex position
             layout(location = 1) in vec2 texcoord;   // texture coordinates
+            layout(location = 2) in float shade;     // tint / multiplier
+            layout(location = 3) in float layer;     // texture array layer
             
             uniform mat4 mvp;                        // model-view-projection matrix
             
-            out vec2 texcoord_out;                   // pass to fragment shader
+            out vec3 texcoord_out;                   // pass to fragment shader
+            out float shade_out;
             
             void main()
             {
                 gl_Position = mvp * vec4(position, 1.0);
-                texcoord_out = texcoord;
+                texcoord_out = vec3(texcoord, layer);
+                shade_out = shade;
             }
         """)
         self.program.add_shader_from_source_code(QOpenGLShader.Fragment, """
             #version 330 core
 
-            in vec2 texcoord_out;         // interpolated texcoords from vertex shader
+            in vec3 texcoord_out;         // interpolated texcoords + layer from vertex shader
+            in float shade_out;           // tint / multiplier
             out vec4 frag_color;           // final fragment output
             
-            uniform sampler2D tex;        // bound texture
-            uniform float shade;      // tint / multiplier
+            uniform sampler2DArray tex;   // bound texture array
             
             void main()
             {
                 vec4 sampled = texture(tex, texcoord_out);
-                frag_color = sampled * shade;
+                frag_color = sampled * shade_out;
             }
         """)
         self.program.link()